@@ -1,5 +1,5 @@
 """Game configuration settings."""
-from typing import Tuple
+from typing import Dict, Tuple
 import os
 
 # === Display Settings ===
@@ -7,24 +7,92 @@ SCREEN_WIDTH: int = 1280
 SCREEN_HEIGHT: int = 720
 GAME_TITLE: str = "Fantasy Falls"
 
+# === Diagnostics ===
+TRACE_STARTUP: bool = os.environ.get("TRACE_STARTUP") == "1"       # Print a startup timing report
+
 # === Asset Directories ===
-SOUNDS_DIR: str = "assets/audio"
-IMAGES_DIR: str = "assets/images"
+ASSETS_DIR: str = "assets"
+SOUNDS_DIR: str = os.path.join(ASSETS_DIR, "audio")
+IMAGES_DIR: str = os.path.join(ASSETS_DIR, "Images")
+ASSET_MANIFEST_PATH: str = os.path.join(ASSETS_DIR, "manifest.json")
+ASSET_CACHE_DIR: str = os.path.join("cache", "assets")                # Output of python -m engine.asset_cache
+
+# === Asset Loading ===
+ASSET_LOADER_THREADS: int = 2                                       # Worker threads for background decoding
+ASSET_FINALIZE_BUDGET_MS: float = 4.0                               # Main-thread handoff time per frame
+ATLAS_MAX_SIZE: int = 2048                                          # Largest texture atlas sheet, per side
+SPRITE_MAX_SIZE: int = 512                                          # Images with alpha up to this size are packed into sprite sheets
+
+# === Dialogue Scripts ===
+SCRIPT_DIR: str = os.path.join("data", "script")
+SCRIPT_EXTENSION: str = ".story"
+SCRIPT_CACHE_DIR: str = os.path.join("cache", "script")              # Compiled bytecode, keyed by source hash
+SCRIPT_START_LABEL: str = "start"
+SCRIPT_PREFETCH_CHAPTERS: int = 3                                   # Chapters compiled ahead of the one being played
+SCRIPT_MEMORY_BUDGET: int = 8 * 1024 * 1024                         # Compiled chapters kept in memory, in bytes
+SCRIPT_IMAGE_LOOKAHEAD: int = 40                                    # Statements scanned ahead for images to preload
+SCRIPT_IMAGE_BUDGET: int = 64 * 1024 * 1024                         # Scaled script images kept in memory, in bytes
+ROLLBACK_MAX_STEPS: int = 500                                       # Interactions the player can roll back through
+ROLLBACK_MEMORY_BUDGET: int = 1024 * 1024                           # Rollback history kept in memory, in bytes
+CHARACTERS_DIR: str = os.path.join(ASSETS_DIR, "characters")         # One folder of layer images per character
+CHARACTER_ATLAS_DIR: str = os.path.join("cache", "characters")       # Output of python -m engine.layered_image
+PORTRAIT_CACHE_BUDGET: int = 32 * 1024 * 1024                       # Composited character portraits kept in memory, in bytes
+
+# === Save Games ===
+SAVE_DIR: str = "saves"                                             # Save slots and their index
+SAVE_COMPRESSION_LEVEL: int = 6                                     # zlib level for save files
+SAVE_THUMBNAIL_SIZE: Tuple[int, int] = (160, 90)                    # Screenshot stored with each slot, at most this size
+SAVE_THUMBNAIL_CACHE: int = 4 * 1024 * 1024                         # Decoded thumbnails kept by the load screen, in bytes
 
 # === Specific Asset Paths ===
 BG_IMAGE_PATH: str = os.path.join(IMAGES_DIR, "MainMenuBackground.png")
 CLICK_SOUND_PATH: str = os.path.join(SOUNDS_DIR, "click.wav")
 HOVER_SOUND_PATH: str = os.path.join(SOUNDS_DIR, "hover.wav")
+INTRO_ANIMATION_PATH: str = os.path.join(IMAGES_DIR, "intro_ball.gif")
 BACKGROUND_MUSIC_PATH: str = os.path.join(SOUNDS_DIR, "background_music.mp3")
 
+# === Audio Settings ===
+# Mixer presets applied before pygame.mixer.init(). A smaller buffer means
+# less delay between a click and hearing it, at the cost of more CPU wakeups.
+AUDIO_PROFILES: Dict[str, Dict[str, int]] = {
+    "low_latency": {"frequency": 44100, "size": -16, "channels": 2, "buffer": 256},
+    "balanced": {"frequency": 44100, "size": -16, "channels": 2, "buffer": 512},
+    "power_saver": {"frequency": 22050, "size": -16, "channels": 2, "buffer": 2048},
+}
+DEFAULT_AUDIO_PROFILE: str = "balanced"
+SOUND_CATEGORY_CHANNELS: Dict[str, int] = {"ui": 4, "sfx": 8, "voice": 2}  # Reserved mixer channels per category
+MUSIC_DECK_CHANNELS: int = 2                                        # Music channels crossfaded between
+MUSIC_CROSSFADE_MS: int = 1000                                      # Default crossfade when switching tracks
+UNRESERVED_SOUND_CHANNELS: int = 4                                  # Left free for plain Sound.play() calls
+MAX_SOUND_INSTANCES: int = 2                                        # Concurrent voices of one sound per category
+SOUND_REPEAT_WINDOW_MS: int = 40                                    # Ignore replays of a sound within this window
+VOICE_STEAL_POLICY: str = "oldest"                                  # "oldest" or "quietest"
+
 # === Font Settings ===
 DEFAULT_FONT_SIZE: int = 60
 BUTTON_FONT_SIZE: int = 32
 SMALL_FONT_SIZE: int = 24
 TITLE_FONT_SIZE: int = 48
 
+# === Animation ===
+BUTTON_HOVER_FADE_MS: int = 120                                     # Hover highlight fade at animation_speed 5
+TOOLTIP_FADE_MS: int = 280                                          # Tooltip fade-in at animation_speed 5
+CLICK_FLASH_MS: int = 200                                           # Click flash decay at animation_speed 5
+TYPEWRITER_CHARS_PER_SECOND: int = 45                               # Dialogue text reveal speed
+IDLE_WAIT_MS: int = 100                                             # Longest an idle menu sleeps between frames
+SCREEN_TRANSITION: str = "dissolve"                                 # "dissolve", "fade", "slide_left", "slide_right" or "" for none
+SCREEN_TRANSITION_MS: int = 250                                     # Length of a change between menu screens
+SCROLL_FRICTION: float = 6.0                                        # Kinetic scroll slowdown rate, per second
+SCROLL_DRAG_THRESHOLD: int = 8                                      # Pixels a press moves before it drags a list
+ANIMATION_CACHE_BUDGET: int = 16 * 1024 * 1024                      # Decoded animation frames kept in bytes; larger animations stream
+SPRITE_SHEET_FRAME_MS: int = 100                                    # Frame length of sprite sheet animations
+PARTICLE_CAPACITY: int = 2000                                       # Hard cap on live particles per system; the excess is dropped
+MENU_SPARKLES_PER_SECOND: float = 12.0                              # Ambient sparkles over the menu background; 0 turns them off
+MENU_SPARKLE_FPS: int = 20                                          # Frame rate an otherwise idle menu wakes at to move sparkles
+
 # === UI Colors ===
 BACKGROUND_COLOR: Tuple[int, int, int] = (40, 44, 52)               # Menu background color
 TEXT_COLOR: Tuple[int, int, int] = (220, 220, 220)                  # Regular text color
 HOVER_COLOR: Tuple[int, int, int, int] = (100, 100, 150, 180)       # Button hover overlay color (RGBA)
+SPARKLE_COLOR: Tuple[int, int, int] = (255, 230, 170)               # Ambient sparkles over the menu background
 HOVER_TEXT_COLOR: Tuple[int, int, int] = (255, 255, 0)              # Text color on hover
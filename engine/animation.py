@@ -0,0 +1,427 @@
+"""Animations: GIFs and sprite sheets decoded once into display-ready frames shared by every player.
+
+A sprite sheet is a grid of equal frames read left to right, top to bottom;
+its frame size defaults to square frames as tall as the sheet (one row).
+GIFs are decoded here, frame by frame, since pygame only loads their first
+frame.
+"""
+import os
+import struct
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+import pygame
+
+from config import ANIMATION_CACHE_BUDGET, SPRITE_SHEET_FRAME_MS
+from engine.image_predictor import to_display_format
+from engine.resource_manager import AssetHandle, resource_manager
+
+# GIF delays below this are played at 100 ms, as browsers do
+GIF_MIN_DELAY_MS = 20
+GIF_DEFAULT_DELAY_MS = 100
+
+# (path, scale, frame size, frame length)
+AnimationKey = Tuple[str, float, Optional[Tuple[int, int]], int]
+
+
+def _lzw_decode(data: bytes, min_code_size: int, pixel_count: int) -> bytes:
+    """Expand a GIF image's LZW data into `pixel_count` palette indices."""
+    clear = 1 << min_code_size
+    end = clear + 1
+    table: List[bytes] = [bytes((i,)) for i in range(clear)] + [b"", b""]
+    code_size = min_code_size + 1
+    mask = (1 << code_size) - 1
+    out = bytearray()
+    previous: Optional[bytes] = None
+    buffer = bits = position = 0
+    while True:
+        while bits < code_size:
+            if position >= len(data):
+                return bytes(out[:pixel_count]).ljust(pixel_count, b"\0")
+            buffer |= data[position] << bits
+            bits += 8
+            position += 1
+        code = buffer & mask
+        buffer >>= code_size
+        bits -= code_size
+
+        if code == clear:
+            del table[end + 1:]
+            code_size = min_code_size + 1
+            mask = (1 << code_size) - 1
+            previous = None
+            continue
+        if code == end:
+            break
+        if code < len(table):
+            entry = table[code]
+            if previous is not None:
+                table.append(previous + entry[:1])
+        elif previous is not None:
+            entry = previous + previous[:1]
+            table.append(entry)
+        else:
+            raise ValueError("corrupt GIF image data")
+        out += entry
+        previous = entry
+        if len(table) == mask + 1 and code_size < 12:
+            code_size += 1
+            mask = (1 << code_size) - 1
+    return bytes(out[:pixel_count]).ljust(pixel_count, b"\0")
+
+
+def _deinterlace(pixels: bytes, width: int, height: int) -> bytes:
+    """Put the rows of an interlaced GIF image back in order."""
+    rows = [pixels[y * width:(y + 1) * width] for y in range(height)]
+    order = list(range(0, height, 8)) + list(range(4, height, 8)) + list(range(2, height, 4)) + list(range(1, height, 2))
+    ordered = [b""] * height
+    for row, y in zip(rows, order):
+        ordered[y] = row
+    return b"".join(ordered)
+
+
+class GifDecoder:
+    """
+    The frames of a GIF. Its block structure is read up front, which is
+    cheap, so the frame count and size are known before any pixels are
+    decoded; `frames()` then decodes them one at a time.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        if data[:6] not in (b"GIF87a", b"GIF89a"):
+            raise ValueError("not a GIF file")
+        width, height, flags = struct.unpack("<HHB", data[6:11])
+        self.size = (width, height)
+        position = 13
+        global_palette = None
+        if flags & 0x80:
+            length = 3 << ((flags & 7) + 1)
+            global_palette = data[position:position + length]
+            position += length
+
+        # (rect, palette, transparent index, disposal, delay, interlaced, min code size, LZW data)
+        self._frames: List[tuple] = []
+        transparent, disposal, delay = None, 0, GIF_DEFAULT_DELAY_MS
+        while position < len(data):
+            block = data[position]
+            position += 1
+            if block == 0x21:  # Extension
+                label = data[position]
+                position += 1
+                chunks, position = self._sub_blocks(data, position)
+                if label == 0xF9 and chunks and len(chunks[0]) >= 4:  # Graphic control
+                    packed, centiseconds, index = struct.unpack("<BHB", chunks[0][:4])
+                    transparent = index if packed & 1 else None
+                    disposal = (packed >> 2) & 7
+                    delay = centiseconds * 10 if centiseconds * 10 >= GIF_MIN_DELAY_MS else GIF_DEFAULT_DELAY_MS
+            elif block == 0x2C:  # Image
+                x, y, w, h, packed = struct.unpack("<HHHHB", data[position:position + 9])
+                position += 9
+                palette = global_palette
+                if packed & 0x80:
+                    length = 3 << ((packed & 7) + 1)
+                    palette = data[position:position + length]
+                    position += length
+                min_code_size = data[position]
+                chunks, position = self._sub_blocks(data, position + 1)
+                self._frames.append((pygame.Rect(x, y, w, h), palette, transparent, disposal, delay,
+                                     bool(packed & 0x40), min_code_size, b"".join(chunks)))
+                transparent, disposal, delay = None, 0, GIF_DEFAULT_DELAY_MS
+            else:  # Trailer, or trailing junk
+                break
+        if not self._frames:
+            raise ValueError("GIF has no frames")
+
+    @staticmethod
+    def _sub_blocks(data: bytes, position: int) -> Tuple[List[bytes], int]:
+        chunks = []
+        while position < len(data) and data[position]:
+            length = data[position]
+            chunks.append(data[position + 1:position + 1 + length])
+            position += 1 + length
+        return chunks, position + 1
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def frames(self) -> Iterator[Tuple[pygame.Surface, int]]:
+        """Yield each frame, composited as it is shown, and its length in ms."""
+        canvas = pygame.Surface(self.size, pygame.SRCALPHA)
+        for rect, palette, transparent, disposal, delay, interlaced, min_code_size, data in self._frames:
+            pixels = _lzw_decode(data, min_code_size, rect.width * rect.height)
+            if interlaced:
+                pixels = _deinterlace(pixels, rect.width, rect.height)
+            image = pygame.image.frombuffer(pixels, rect.size, "P")
+            colors = palette or bytes(768)
+            image.set_palette([tuple(colors[i:i + 3]) for i in range(0, len(colors), 3)])
+            if transparent is not None:
+                image.set_colorkey(transparent)  # A palette index, so duplicate colours stay opaque
+
+            previous = canvas.copy() if disposal == 3 else None
+            canvas.blit(image, rect)
+            yield canvas.copy(), delay
+            if disposal == 2:
+                canvas.fill((0, 0, 0, 0), rect)
+            elif disposal == 3:
+                canvas = previous
+
+
+class AnimationSource:
+    """
+    Where an animation's frames come from, before scaling or conversion: a
+    GIF's bytes, or a sprite sheet loaded through the resource manager.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        frame_size: Optional[Tuple[int, int]] = None,
+        frame_ms: int = SPRITE_SHEET_FRAME_MS,
+    ) -> None:
+        self.path = path
+        self.frame_ms = frame_ms
+        self._gif: Optional[GifDecoder] = None
+        self._sheet_handle: Optional[AssetHandle] = None
+        self._sheet: Optional[pygame.Surface] = None
+        if path.lower().endswith(".gif"):
+            with open(path, "rb") as f:
+                self._gif = GifDecoder(f.read())
+            self.size = self._gif.size
+            self.count = len(self._gif)
+        else:
+            self._sheet_handle = resource_manager.acquire_image(path)
+            self._sheet = self._sheet_handle.get()
+            if self._sheet is None:
+                raise FileNotFoundError(f"could not load sprite sheet '{path}'")
+            sheet_width, sheet_height = self._sheet.get_size()
+            self.size = frame_size or (sheet_height, sheet_height)
+            self.count = max(1, sheet_width // self.size[0]) * max(1, sheet_height // self.size[1])
+
+    def frames(self) -> Iterator[Tuple[pygame.Surface, int]]:
+        """Yield (frame, length in ms) in order. Safe to run on a loader thread."""
+        if self._gif is not None:
+            yield from self._gif.frames()
+            return
+        width, height = self.size
+        columns = max(1, self._sheet.get_width() // width)
+        for index in range(self.count):
+            rect = pygame.Rect(index % columns * width, index // columns * height, width, height)
+            yield self._sheet.subsurface(rect.clip(self._sheet.get_rect())), self.frame_ms
+
+    def release(self) -> None:
+        if self._sheet_handle is not None:
+            self._sheet_handle.release()
+            self._sheet_handle = None
+            self._sheet = None
+
+
+class FrameSet:
+    """
+    One animation at one scale, decoded in order on a loader thread and
+    converted for the display on the main thread as players ask for frames.
+
+    A resident set keeps every frame once decoded and is shared by all
+    players of that animation at that scale. A streaming set, handed out
+    when the whole animation would not fit in the cache's budget, belongs
+    to one player and keeps only the frame shown and the one after it,
+    decoding the next while the current one is on screen and starting
+    again from the source after the last.
+    """
+
+    def __init__(self, cache: "AnimationCache", key: AnimationKey, source: AnimationSource, streaming: bool) -> None:
+        self.cache = cache
+        self.key = key
+        self.source = source
+        self.streaming = streaming
+        scale = key[1]
+        self.size = (max(1, round(source.size[0] * scale)), max(1, round(source.size[1] * scale)))
+        self.count = source.count
+        self.frames: List[Optional[pygame.Surface]] = [None] * self.count
+        self.durations: List[int] = [source.frame_ms] * self.count
+        self.refcount = 0
+        self.failed = False
+
+        self._iterator: Optional[Iterator[Tuple[pygame.Surface, int]]] = None
+        # Index of the frame the decoder produces next
+        self._next = 0
+        self._future: Optional[Future] = None
+        self._decode()
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.size[0] * self.size[1] * 4
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(1 for frame in self.frames if frame is not None) * self.frame_bytes
+
+    # ----- Decoding (loader thread) -----
+    def _decode(self) -> None:
+        if self._future is None and not self.failed:
+            work = self._decode_next if self.streaming else self._decode_all
+            self._future = self.cache.executor.submit(work)
+
+    def _scaled(self, image: pygame.Surface) -> pygame.Surface:
+        if image.get_size() == self.size:
+            return image  # Converting on the main thread makes the copy
+        return pygame.transform.smoothscale(image, self.size)
+
+    def _decode_all(self) -> List[Tuple[pygame.Surface, int]]:
+        return [(self._scaled(image), duration) for image, duration in self.source.frames()]
+
+    def _decode_next(self) -> List[Tuple[pygame.Surface, int]]:
+        if self._iterator is None:
+            self._iterator = self.source.frames()
+        try:
+            image, duration = next(self._iterator)
+        except StopIteration:
+            self._iterator = self.source.frames()
+            image, duration = next(self._iterator)
+        return [(self._scaled(image), duration)]
+
+    # ----- Handoff (main thread) -----
+    def pump(self) -> None:
+        """Convert whatever the loader thread has finished since the last call."""
+        if self._future is None or not self._future.done():
+            return
+        future, self._future = self._future, None
+        try:
+            decoded = future.result()
+        except Exception as e:
+            logging.exception(f"Error decoding animation '{self.source.path}': {e}")
+            self.failed = True
+            return
+        for image, duration in decoded:
+            self.frames[self._next] = to_display_format(image)
+            self.durations[self._next] = duration
+            self._next = (self._next + 1) % self.count
+        if self.streaming:
+            self.cache.stats["streamed"] += len(decoded)
+        else:
+            self.cache.stats["decoded"] += len(decoded)
+
+    def ready(self, index: int) -> bool:
+        """True once frame `index` can be shown."""
+        self.pump()
+        return self.frames[index] is not None
+
+    def frame(self, index: int) -> Optional[pygame.Surface]:
+        return self.frames[index]
+
+    def showing(self, index: int) -> None:
+        """
+        A player moved to frame `index`. A streaming set drops the frames
+        before it and starts decoding the one after.
+        """
+        if not self.streaming:
+            return
+        following = (index + 1) % self.count
+        for other in range(self.count):
+            if other != index and other != following:
+                self.frames[other] = None
+        if self.frames[following] is None and self._next == following:
+            self._decode()
+
+    def release(self) -> None:
+        """Drop the frames and the source; the cache calls this when the set is evicted."""
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+        self.frames = [None] * self.count
+        self.source.release()
+
+
+class AnimationCache:
+    """
+    Frame sets for every animation in play, keyed by file and scale.
+
+    Acquiring an animation that is already cached shares its frames, so ten
+    players of one GIF decode it once. Resident sets are kept after their
+    last player releases them, least recently used first out, until the
+    budget needs the room. An animation whose frames would not fit in the
+    budget next to those in use is streamed instead.
+    """
+
+    def __init__(self, budget: int = ANIMATION_CACHE_BUDGET, max_workers: int = 1) -> None:
+        self.budget = budget
+        self.max_workers = max_workers
+        self.sets: "OrderedDict[AnimationKey, FrameSet]" = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {"shared": 0, "decoded": 0, "streamed": 0, "evicted": 0}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="animation-decoder")
+        return self._executor
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(frame_set.count * frame_set.frame_bytes for frame_set in self.sets.values())
+
+    def acquire(
+        self,
+        path: str,
+        scale: float = 1.0,
+        frame_size: Optional[Tuple[int, int]] = None,
+        frame_ms: int = SPRITE_SHEET_FRAME_MS,
+    ) -> FrameSet:
+        """
+        The frames of the animation in `path` at `scale`, starting to decode
+        in the background if they aren't cached. Give the set back with
+        `release()`.
+        """
+        key = (os.path.normpath(path).replace(os.sep, "/"), scale, frame_size, frame_ms)
+        frame_set = self.sets.get(key)
+        if frame_set is not None:
+            self.sets.move_to_end(key)
+            self.stats["shared"] += 1
+        else:
+            source = AnimationSource(path, frame_size, frame_ms)
+            scaled = (max(1, round(source.size[0] * scale)), max(1, round(source.size[1] * scale)))
+            needed = source.count * scaled[0] * scaled[1] * 4
+            self._trim(self.budget - needed)
+            streaming = self.resident_bytes + needed > self.budget
+            if streaming:
+                logging.info(f"Streaming animation '{path}': {needed / 1024:.0f} KB of frames won't fit the cache")
+            frame_set = FrameSet(self, key, source, streaming)
+            if not streaming:
+                self.sets[key] = frame_set
+        frame_set.refcount += 1
+        return frame_set
+
+    def release(self, frame_set: FrameSet) -> None:
+        frame_set.refcount -= 1
+        if frame_set.streaming and frame_set.refcount <= 0:
+            frame_set.release()
+
+    def _trim(self, target: int) -> None:
+        """Evict unused sets, oldest first, until at most `target` bytes are cached."""
+        for key in list(self.sets):
+            if self.resident_bytes <= target:
+                break
+            if self.sets[key].refcount <= 0:
+                self.sets.pop(key).release()
+                self.stats["evicted"] += 1
+
+    def clear(self) -> None:
+        """Drop every set no player is using."""
+        self._trim(0)
+
+    def shutdown(self) -> None:
+        """Stop the decoder thread, abandoning queued work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def report(self) -> str:
+        """A human-readable summary of the animation cache."""
+        return (f"Animations: {len(self.sets)} cached, {self.resident_bytes / 1024:.0f} KB of "
+                f"{self.budget / 1024:.0f} KB budget; "
+                + ", ".join(f"{name} {count}" for name, count in self.stats.items()))
+
+
+# Create a global instance for easy access
+animation_cache = AnimationCache()
@@ -0,0 +1,311 @@
+"""Offline asset cache: pre-decoded pixels and PCM that load without decoding.
+
+Build it with:
+
+    python -m engine.asset_cache
+
+Images are stored as raw pixel dumps ready for `pygame.image.frombuffer`,
+with any colorkey kept in the index and set again on load, and sounds as
+PCM already resampled to the mixer's format. Every file is keyed by the
+source's content hash from the asset manifest, and is memory-mapped at
+runtime rather than read and decoded.
+
+Small images with alpha (icons, sprites) are also packed together into a
+few sheets, `sprites_<n>.raw`. The resource manager cuts such an image out
+of its sheet, so all of them cost one file and one surface per sheet.
+"""
+import os
+import json
+import mmap
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import pygame
+
+from config import (
+    ASSETS_DIR, ASSET_CACHE_DIR, ASSET_MANIFEST_PATH, ATLAS_MAX_SIZE, AUDIO_PROFILES, DEFAULT_AUDIO_PROFILE,
+    SPRITE_MAX_SIZE,
+)
+
+INDEX_FILENAME = "index.json"
+CACHE_VERSION = 2
+SPRITE_SHEET_PREFIX = "sprites"
+
+
+def sound_key(source_hash: str, mixer_format: Tuple[int, int, int]) -> str:
+    """Cache key for a sound: PCM depends on the mixer's format too."""
+    frequency, size, channels = mixer_format
+    return f"{source_hash}-{frequency}-{size}-{channels}"
+
+
+def _source_stamp(path: str) -> Dict[str, int]:
+    """Cheap identity check for a source file, so stale entries are skipped."""
+    stat = os.stat(path)
+    return {"source_bytes": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+class AssetCache:
+    """
+    Read side of the asset cache. Safe to use from loader threads; the index
+    is only read after construction.
+
+    Each cache file is mapped once and the mapping is shared by every load of
+    it, until `close()`.
+    """
+
+    def __init__(self, cache_dir: str = ASSET_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Source path -> {"sheet", "rect"} for images packed into a sprite sheet
+        self.sprites: Dict[str, Dict[str, Any]] = {}
+        # Sheet key -> {"size", "format"}
+        self.sheets: Dict[str, Dict[str, Any]] = {}
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._maps_lock = threading.Lock()
+        self.load_index()
+
+    def load_index(self) -> None:
+        """Load the cache index if the cache has been built."""
+        index_path = os.path.join(self.cache_dir, INDEX_FILENAME)
+        try:
+            if os.path.exists(index_path):
+                with open(index_path, "r") as f:
+                    index = json.load(f)
+                if index.get("version") == CACHE_VERSION:
+                    self.entries = index.get("entries", {})
+                    self.sprites = index.get("sprites", {})
+                    self.sheets = index.get("sheets", {})
+        except Exception as e:
+            logging.exception(f"Error loading asset cache index: {e}")
+            self.entries, self.sprites, self.sheets = {}, {}, {}
+
+    @staticmethod
+    def _fresh(info: Dict[str, Any], source_path: str) -> bool:
+        """False if the source was edited since the cache was built."""
+        try:
+            return _source_stamp(source_path) == {k: info[k] for k in ("source_bytes", "source_mtime_ns")}
+        except OSError:
+            return False
+
+    def _lookup(self, key: str, source_path: str) -> Optional[Dict[str, Any]]:
+        info = self.entries.get(key)
+        if info is None or not self._fresh(info, source_path):
+            return None
+        return info
+
+    def _map(self, key: str) -> mmap.mmap:
+        with self._maps_lock:
+            mapping = self._maps.get(key)
+            if mapping is None or mapping.closed:
+                with open(os.path.join(self.cache_dir, f"{key}.raw"), "rb") as f:
+                    mapping = self._maps[key] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return mapping
+
+    def close(self) -> None:
+        """
+        Let go of every mapping. One no longer backing a surface is unmapped
+        now; one that still is goes with its last surface, since pygame
+        surfaces reference the mapping but don't lock it against close().
+        """
+        with self._maps_lock:
+            self._maps.clear()
+
+    def load_image(self, source_path: str, source_hash: Optional[str]) -> Optional[pygame.Surface]:
+        """Return a surface backed by the mapped pixel dump, or None on a miss."""
+        info = self._lookup(source_hash, source_path) if source_hash else None
+        if info is None:
+            return None
+        # The surface shares the mapping's memory; convert() makes the copy
+        surface = pygame.image.frombuffer(self._map(source_hash), tuple(info["size"]), info["format"])
+        if info.get("colorkey") is not None:
+            surface.set_colorkey(info["colorkey"])
+        return surface
+
+    def sprite(self, source_path: str) -> Optional[Tuple[str, Tuple[int, int, int, int]]]:
+        """The sheet key and rect an image is packed at, or None if it isn't packed (or has changed since)."""
+        info = self.sprites.get(source_path)
+        if info is None or info["sheet"] not in self.sheets or not self._fresh(info, source_path):
+            return None
+        return info["sheet"], tuple(info["rect"])
+
+    def load_sheet(self, key: str) -> Optional[pygame.Surface]:
+        """Return a sprite sheet backed by its mapped pixel dump, or None if there is no such sheet."""
+        info = self.sheets.get(key)
+        if info is None:
+            return None
+        return pygame.image.frombuffer(self._map(key), tuple(info["size"]), info["format"])
+
+    def load_sound(self, source_path: str, source_hash: Optional[str]) -> Optional[pygame.mixer.Sound]:
+        """Return a sound built from mapped PCM, or None on a miss or format mismatch."""
+        mixer_format = pygame.mixer.get_init()
+        if not source_hash or not mixer_format:
+            return None
+        key = sound_key(source_hash, mixer_format)
+        if self._lookup(key, source_path) is None:
+            return None
+        return pygame.mixer.Sound(buffer=self._map(key))
+
+
+def build_cache(
+    assets_dir: str = ASSETS_DIR,
+    cache_dir: str = ASSET_CACHE_DIR,
+    manifest_path: str = ASSET_MANIFEST_PATH,
+    mixer_format: Optional[Tuple[int, int, int]] = None,
+) -> Dict[str, Any]:
+    """
+    Refresh the manifest and write display-ready copies of every image and
+    sound into `cache_dir`. Entries whose source is unchanged are kept.
+
+    Args:
+        mixer_format: (frequency, size, channels) to resample sounds to.
+            Defaults to the format of the default audio profile.
+
+    Returns:
+        The new cache index.
+    """
+    from engine.resource_manager import IMAGE, SOUND, write_manifest
+
+    manifest = write_manifest(manifest_path, assets_dir)["assets"]
+    os.makedirs(cache_dir, exist_ok=True)
+
+    old_entries = AssetCache(cache_dir).entries
+    entries: Dict[str, Dict[str, Any]] = {}
+
+    if mixer_format is None:
+        profile = AUDIO_PROFILES[DEFAULT_AUDIO_PROFILE]
+        mixer_format = (profile["frequency"], profile["size"], profile["channels"])
+    pygame.mixer.quit()
+    pygame.mixer.init(*mixer_format)
+    mixer_format = pygame.mixer.get_init()
+
+    for path, info in manifest.items():
+        if info["type"] == IMAGE:
+            key = info["hash"]
+        elif info["type"] == SOUND:
+            key = sound_key(info["hash"], mixer_format)
+        else:
+            continue
+
+        stamp = _source_stamp(path)
+        raw_path = os.path.join(cache_dir, f"{key}.raw")
+        cached = old_entries.get(key)
+        if cached and os.path.exists(raw_path):
+            # Same content hash, so the dump is still valid
+            entries[key] = dict(cached, source=path, **stamp)
+            continue
+
+        try:
+            if info["type"] == IMAGE:
+                surface = pygame.image.load(path)
+                pixel_format = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+                data = pygame.image.tobytes(surface, pixel_format)
+                colorkey = surface.get_colorkey()
+                entry = {"type": IMAGE, "size": list(surface.get_size()), "format": pixel_format,
+                         "colorkey": list(colorkey[:3]) if colorkey else None}
+            else:
+                data = pygame.mixer.Sound(path).get_raw()
+                entry = {"type": SOUND, "mixer_format": list(mixer_format)}
+        except Exception as e:
+            logging.exception(f"Could not cache '{path}': {e}")
+            continue
+
+        with open(raw_path, "wb") as f:
+            f.write(data)
+        entry.update(source=path, bytes=len(data), **stamp)
+        entries[key] = entry
+        print(f"Cached {path} -> {key}.raw ({len(data) / 1024:.1f} KB)")
+
+    sprites, sheets = build_sprite_sheets(entries, cache_dir)
+
+    # Drop files that no longer belong to any source
+    for filename in os.listdir(cache_dir):
+        if filename.endswith(".raw") and filename[:-4] not in entries and filename[:-4] not in sheets:
+            os.remove(os.path.join(cache_dir, filename))
+
+    index = {"version": CACHE_VERSION, "entries": entries, "sprites": sprites, "sheets": sheets}
+    with open(os.path.join(cache_dir, INDEX_FILENAME), "w") as f:
+        json.dump(index, f, indent=4)
+    return index
+
+
+def build_sprite_sheets(
+    entries: Dict[str, Dict[str, Any]],
+    cache_dir: str = ASSET_CACHE_DIR,
+    max_image_size: int = SPRITE_MAX_SIZE,
+    max_size: int = ATLAS_MAX_SIZE,
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Pack every cached image with alpha no larger than `max_image_size` on
+    either side into RGBA sheets in `cache_dir`. Animated GIFs are left out.
+
+    Returns:
+        The "sprites" and "sheets" parts of the cache index.
+    """
+    from engine.atlas import build_atlas
+    from engine.resource_manager import IMAGE
+
+    images: Dict[str, pygame.Surface] = {}
+    for entry in entries.values():
+        path = entry["source"]
+        if (entry["type"] != IMAGE or entry["format"] != "RGBA" or max(entry["size"]) > max_image_size
+                or path.lower().endswith(".gif")):
+            continue
+        try:
+            images[path] = pygame.image.load(path)
+        except Exception as e:
+            logging.exception(f"Could not pack '{path}': {e}")
+
+    sprites: Dict[str, Dict[str, Any]] = {}
+    sheets: Dict[str, Dict[str, Any]] = {}
+    if not images:
+        return sprites, sheets
+    # Packed whole, so a cut-out image is the same size as its file
+    surfaces, placements = build_atlas(images, max_size, trim_images=False)
+    for number, surface in enumerate(surfaces):
+        key = f"{SPRITE_SHEET_PREFIX}_{number}"
+        data = pygame.image.tobytes(surface, "RGBA")
+        with open(os.path.join(cache_dir, f"{key}.raw"), "wb") as f:
+            f.write(data)
+        sheets[key] = {"size": list(surface.get_size()), "format": "RGBA", "bytes": len(data)}
+    for path, placement in placements.items():
+        sprites[path] = {
+            "sheet": f"{SPRITE_SHEET_PREFIX}_{placement['sheet']}",
+            "rect": placement["rect"],
+            **_source_stamp(path),
+        }
+    print(f"Packed {len(sprites)} image(s) into {len(sheets)} sprite sheet(s)")
+    return sprites, sheets
+
+
+def main() -> None:
+    # Only needed for the command line; kept out of the game's import path
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-decode assets into the runtime asset cache.")
+    parser.add_argument("--assets", default=ASSETS_DIR, help="asset source directory")
+    parser.add_argument("--cache", default=ASSET_CACHE_DIR, help="cache output directory")
+    parser.add_argument("--profile", default=DEFAULT_AUDIO_PROFILE, choices=sorted(AUDIO_PROFILES),
+                        help="audio profile whose mixer format sounds are resampled to")
+    parser.add_argument("--frequency", type=int, help="override the profile's mixer frequency")
+    parser.add_argument("--size", type=int, help="override the profile's sample size, e.g. -16")
+    parser.add_argument("--channels", type=int, help="override the profile's channel count")
+    args = parser.parse_args()
+
+    profile = AUDIO_PROFILES[args.profile]
+    mixer_format = (
+        args.frequency or profile["frequency"],
+        args.size or profile["size"],
+        args.channels or profile["channels"],
+    )
+
+    # Building needs no audio device
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    index = build_cache(args.assets, args.cache, mixer_format=mixer_format)
+    total = sum(entry["bytes"] for entry in list(index["entries"].values()) + list(index["sheets"].values()))
+    print(f"Asset cache: {len(index['entries'])} entries and {len(index['sheets'])} sprite sheet(s), "
+          f"{total / 1024:.1f} KB in {args.cache}")
+
+
+if __name__ == "__main__":
+    main()
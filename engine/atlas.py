@@ -0,0 +1,213 @@
+"""Texture atlases: many small images packed into a few sheets, with a JSON index."""
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import pygame
+
+from config import ATLAS_MAX_SIZE
+from engine.resource_manager import AssetHandle, resource_manager
+
+ATLAS_VERSION = 1
+# Transparent pixels kept between packed images, so scaling a sheet doesn't bleed neighbours together
+ATLAS_PADDING = 2
+
+
+def trim(image: pygame.Surface) -> Tuple[pygame.Surface, Tuple[int, int]]:
+    """
+    Crop the fully transparent border off an image.
+
+    Returns:
+        The cropped image (a subsurface) and its top-left within the original.
+    """
+    bounds = image.get_bounding_rect()
+    if not bounds.width or not bounds.height:
+        bounds = pygame.Rect(0, 0, 1, 1)
+    return image.subsurface(bounds), bounds.topleft
+
+
+def pack_rects(
+    sizes: Dict[str, Tuple[int, int]],
+    max_size: int = ATLAS_MAX_SIZE,
+    padding: int = ATLAS_PADDING,
+) -> List[Dict[str, pygame.Rect]]:
+    """
+    Place rects of the given sizes on as few `max_size` square sheets as
+    shelf packing manages: tallest first, left to right along shelves.
+    A rect larger than a sheet gets a sheet of its own size.
+
+    Returns:
+        For each sheet, name -> where that rect goes on it.
+    """
+    sheets: List[Dict[str, pygame.Rect]] = []
+    x = y = shelf_height = 0
+    for name, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0], item[0])):
+        if width > max_size or height > max_size:
+            sheets.append({name: pygame.Rect(0, 0, width, height)})
+            x = y = shelf_height = max_size  # The oversized sheet is full
+            continue
+        if not sheets or x + width > max_size:
+            x, y, shelf_height = 0, y + shelf_height + padding, 0
+        if not sheets or y + height > max_size:
+            sheets.append({})
+            x = y = shelf_height = 0
+        sheets[-1][name] = pygame.Rect(x, y, width, height)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+    return sheets
+
+
+def build_atlas(
+    images: Dict[str, pygame.Surface],
+    max_size: int = ATLAS_MAX_SIZE,
+    trim_images: bool = True,
+) -> Tuple[List[pygame.Surface], Dict[str, Dict[str, Any]]]:
+    """
+    Trim and pack images into sheets. With `trim_images` off, images are
+    packed whole, so each rect is the image at its original size.
+
+    Returns:
+        The sheets, and name -> {"sheet", "rect", "offset", "size"}, where
+        `offset` is where the trimmed rect sat in the original image and
+        `size` is the original image's size.
+    """
+    trimmed = {name: trim(image) if trim_images else (image, (0, 0)) for name, image in images.items()}
+    layout = pack_rects({name: image.get_size() for name, (image, _) in trimmed.items()}, max_size)
+
+    sheets: List[pygame.Surface] = []
+    index: Dict[str, Dict[str, Any]] = {}
+    for sheet_number, placements in enumerate(layout):
+        bounds = pygame.Rect(0, 0, 1, 1).unionall(list(placements.values()))
+        sheet = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        for name, rect in placements.items():
+            image, offset = trimmed[name]
+            sheet.blit(image, rect)
+            index[name] = {
+                "sheet": sheet_number,
+                "rect": list(rect),
+                "offset": list(offset),
+                "size": list(images[name].get_size()),
+            }
+        sheets.append(sheet)
+    return sheets, index
+
+
+def write_atlas(
+    out_dir: str,
+    name: str,
+    sheets: List[pygame.Surface],
+    index: Dict[str, Dict[str, Any]],
+    sources: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Save sheets as `<name>_<n>.png` and the index as `<name>.json` in `out_dir`.
+    `sources` is stored as is, for telling later whether the atlas is stale.
+
+    Returns:
+        The index path.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    sheet_files = []
+    for number, sheet in enumerate(sheets):
+        sheet_files.append(f"{name}_{number}.png")
+        pygame.image.save(sheet, os.path.join(out_dir, sheet_files[-1]))
+    index_path = os.path.join(out_dir, f"{name}.json")
+    with open(index_path, "w") as f:
+        json.dump({"version": ATLAS_VERSION, "sheets": sheet_files, "sources": sources or {}, "images": index}, f, indent=4)
+    return index_path
+
+
+def read_atlas_index(index_path: str) -> Optional[Dict[str, Any]]:
+    """An atlas index, or None if it is missing or from another version."""
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable atlas index '{index_path}': {e}")
+        return None
+    return index if index.get("version") == ATLAS_VERSION else None
+
+
+class TextureAtlas:
+    """
+    The images of one atlas, served as subsurfaces of their sheet.
+
+    Built either from an index written by `write_atlas`, whose sheets are
+    loaded through the resource manager (shared, reference counted, and
+    decoded in the background after `prefetch()`), or from surfaces packed
+    in memory with `from_images`. `get()` returns the trimmed image;
+    `offset()` and `size()` say where it goes within the original.
+    """
+
+    def __init__(self, images: Dict[str, Dict[str, Any]], sheet_paths: List[str] = ()) -> None:
+        self.images = images
+        self.handles: List[AssetHandle] = [resource_manager.acquire_image(path) for path in sheet_paths]
+        self._sheets: List[Optional[pygame.Surface]] = [None] * len(self.handles)
+        self._subsurfaces: Dict[str, pygame.Surface] = {}
+
+    @classmethod
+    def load(cls, index_path: str) -> Optional["TextureAtlas"]:
+        """The atlas an index file describes, or None if there is no usable index."""
+        index = read_atlas_index(index_path)
+        if index is None:
+            return None
+        directory = os.path.dirname(index_path)
+        return cls(index["images"], [os.path.join(directory, sheet) for sheet in index["sheets"]])
+
+    @classmethod
+    def from_images(cls, images: Dict[str, pygame.Surface], max_size: int = ATLAS_MAX_SIZE) -> "TextureAtlas":
+        """Pack surfaces that are already loaded."""
+        sheets, index = build_atlas(images, max_size)
+        atlas = cls(index)
+        atlas._sheets = [sheet.convert_alpha() if pygame.display.get_surface() else sheet for sheet in sheets]
+        return atlas
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.images
+
+    def prefetch(self) -> "TextureAtlas":
+        """Start decoding the sheets in the background; returns self."""
+        for handle in self.handles:
+            handle.prefetch()
+        return self
+
+    def ready(self) -> bool:
+        """True once `get()` can return without waiting on the disk."""
+        return all(handle.ready() for handle in self.handles)
+
+    def _sheet(self, number: int) -> Optional[pygame.Surface]:
+        sheet = self._sheets[number]
+        if sheet is None and self.handles:
+            sheet = self._sheets[number] = self.handles[number].get()
+        return sheet
+
+    def get(self, name: str) -> Optional[pygame.Surface]:
+        """The trimmed image `name`, loading its sheet first if needed."""
+        image = self._subsurfaces.get(name)
+        if image is None:
+            info = self.images.get(name)
+            sheet = self._sheet(info["sheet"]) if info else None
+            if sheet is None:
+                return None
+            image = self._subsurfaces[name] = sheet.subsurface(info["rect"])
+        return image
+
+    def offset(self, name: str) -> Tuple[int, int]:
+        return tuple(self.images[name]["offset"])
+
+    def size(self, name: str) -> Tuple[int, int]:
+        return tuple(self.images[name]["size"])
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(sheet.get_pitch() * sheet.get_height() for sheet in self._sheets if sheet is not None)
+
+    def release(self) -> None:
+        """Drop the sheets. Subsurfaces handed out keep theirs alive until they go too."""
+        for handle in self.handles:
+            handle.release()
+        self._sheets = [None] * len(self._sheets)
+        self._subsurfaces.clear()
@@ -0,0 +1,130 @@
+"""Headless harness measuring UI sound latency for each audio profile.
+
+Run with:
+
+    python -m engine.audio_latency [--driver dummy|disk] [--runs 100]
+
+For every profile in AUDIO_PROFILES this re-initialises the mixer, builds a
+real Button with click/hover sounds and a MusicManager, and fires its
+shortcut key through `Button.handle_event`. It times the path from the
+event reaching the button to the sound being queued on a mixer channel, and
+adds the profile's buffer length, which is how long SDL can hold the sound
+before it reaches the device.
+"""
+import os
+import time
+import statistics
+from typing import Any, Dict, List, Optional
+
+import pygame
+
+from config import AUDIO_PROFILES, CLICK_SOUND_PATH, HOVER_SOUND_PATH
+
+
+def measure_profile(profile: str, runs: int = 100) -> Dict[str, Any]:
+    """
+    Measure click latency for one profile. Expects pygame.display/font to be
+    initialised and SDL_AUDIODRIVER to be set already.
+    """
+    from engine.music import MusicManager, init_mixer
+    from ui.builders.button_builder import ButtonBuilder
+
+    settings = init_mixer(profile)
+    music_manager = MusicManager()
+    # Measure dispatch, not the replay debounce
+    music_manager.voices.repeat_window_ms = 0
+
+    queued_at: List[float] = []
+    play = music_manager.voices.play
+
+    def timed_play(sound: pygame.mixer.Sound, category: str) -> Optional[pygame.mixer.Channel]:
+        channel = play(sound, category)
+        queued_at.append(time.perf_counter())
+        return channel
+
+    music_manager.voices.play = timed_play
+
+    screen = pygame.Surface((800, 600))
+    button = (
+        ButtonBuilder(screen, pygame.font.Font(None, 32), text="Latency")
+        .set_sounds(CLICK_SOUND_PATH, HOVER_SOUND_PATH)
+        .set_music_manager(music_manager)
+        .set_shortcut_key(pygame.K_SPACE)
+        .set_on_click(lambda: None)
+        .build()
+    )
+    event = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0, unicode=" ", scancode=0)
+
+    def click() -> float:
+        queued_at.clear()
+        start = time.perf_counter()
+        button.handle_event(event)
+        return (queued_at[0] - start) * 1000 if queued_at else float("nan")
+
+    # The first click includes finishing the sound's load; report it apart
+    cold_ms = click()
+    samples = []
+    for _ in range(runs):
+        samples.append(click())
+        time.sleep(0.002)
+
+    button.release_resources()
+    music_manager.stop_music()
+
+    samples.sort()
+    buffer_ms = settings["buffer"] / settings["frequency"] * 1000
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        "profile": profile,
+        "buffer": settings["buffer"],
+        "frequency": settings["frequency"],
+        "cold_ms": cold_ms,
+        "median_ms": statistics.median(samples),
+        "p95_ms": p95,
+        "max_ms": samples[-1],
+        "buffer_ms": buffer_ms,
+        "total_p95_ms": p95 + buffer_ms,
+    }
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'profile':<12} {'buffer':>6} {'freq':>6} {'cold':>8} {'median':>8} {'p95':>8} {'max':>8} {'+buffer':>8} {'total':>8}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r['profile']:<12} {r['buffer']:>6} {r['frequency']:>6} {r['cold_ms']:>8.3f} {r['median_ms']:>8.3f} "
+            f"{r['p95_ms']:>8.3f} {r['max_ms']:>8.3f} {r['buffer_ms']:>8.2f} {r['total_p95_ms']:>8.2f}"
+        )
+    lines.append("All times in ms. total = p95 dispatch + one mixer buffer.")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure UI sound latency for each audio profile.")
+    parser.add_argument("--driver", default="dummy", choices=["dummy", "disk"], help="SDL audio driver")
+    parser.add_argument("--runs", type=int, default=100, help="clicks measured per profile")
+    parser.add_argument("--profile", action="append", choices=sorted(AUDIO_PROFILES),
+                        help="profile to measure (repeatable; default: all)")
+    args = parser.parse_args()
+
+    os.environ["SDL_AUDIODRIVER"] = args.driver
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    if args.driver == "disk":
+        os.environ.setdefault("SDL_DISKAUDIOFILE", os.devnull)
+
+    pygame.display.init()
+    pygame.font.init()
+    try:
+        results = [measure_profile(name, args.runs) for name in (args.profile or AUDIO_PROFILES)]
+    finally:
+        from engine.resource_manager import resource_manager
+        resource_manager.shutdown()
+        pygame.quit()
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    main()
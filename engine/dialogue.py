@@ -0,0 +1,501 @@
+"""Dialogue runtime: runs compiled story bytecode one interaction at a time."""
+import os
+import json
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import (
+    SCRIPT_CACHE_DIR, SCRIPT_DIR, SCRIPT_MEMORY_BUDGET, SCRIPT_PREFETCH_CHAPTERS, SCRIPT_START_LABEL,
+)
+from engine.script_compiler import (
+    CALL, CHOICE, END, GOTO, HIDE, JUMP, JUMP_IF_NOT, MENU, NO_OPERAND, RETURN, SAY, SCENE, SET, SHOW,
+    CompiledScript, ScriptError, find_scripts, linked_labels, load_script, scan_labels,
+)
+from engine.layered_image import character_library
+from engine.rollback import MISSING, RollbackLog
+
+# Statements run without reaching a say or menu before giving up
+MAX_STEPS_PER_INTERACTION = 100_000
+# Label index written next to the bytecode cache
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+
+# What script expressions may call; everything else comes from story variables
+SCRIPT_BUILTINS: Dict[str, Any] = {
+    "abs": abs, "len": len, "max": max, "min": min, "round": round,
+    "int": int, "float": float, "str": str, "bool": bool,
+}
+
+
+class ScriptLibrary:
+    """
+    The story's chapters (one per script file) and the label index over them.
+
+    Startup only scans the files for label names, so `labels` maps every
+    label to its chapter without compiling anything. A chapter is compiled,
+    or read from the bytecode cache, when the story enters it; the chapters
+    after it and the ones it jumps to are compiled ahead on a worker thread.
+    Once the compiled chapters outgrow the memory budget, the least recently
+    entered ones are dropped, except the current chapter and any the call
+    stack will return to.
+    """
+
+    def __init__(
+        self,
+        script_dir: str = SCRIPT_DIR,
+        cache_dir: str = SCRIPT_CACHE_DIR,
+        prefetch_chapters: int = SCRIPT_PREFETCH_CHAPTERS,
+        memory_budget: int = SCRIPT_MEMORY_BUDGET,
+    ) -> None:
+        self.script_dir = script_dir
+        self.cache_dir = cache_dir
+        self.prefetch_chapters = prefetch_chapters
+        self.memory_budget = memory_budget
+
+        self.chapters: List[str] = []
+        self.labels: Dict[str, str] = {}
+        self.scanned = False
+        # Compiled chapters, least recently entered first
+        self.loaded: "OrderedDict[str, CompiledScript]" = OrderedDict()
+        self.stats: Dict[str, int] = {"rescanned": 0, "loaded": 0, "prefetched": 0, "evicted": 0}
+
+        self._chapter_order: Dict[str, int] = {}
+        self._links: Dict[str, List[str]] = {}
+        self._pinned: Set[str] = set()
+        self._futures: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ----- Label index -----
+    def scan(self) -> None:
+        """
+        Index every label in the story. Files whose size and mtime match the
+        saved index are not even read.
+        """
+        index_path = os.path.join(self.cache_dir, INDEX_FILENAME)
+        previous: Dict[str, Any] = {}
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                previous = index.get("files", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable script index '{index_path}': {e}")
+
+        files: Dict[str, Any] = {}
+        labels: Dict[str, str] = {}
+        rescanned = 0
+        for path in find_scripts(self.script_dir):
+            stat = os.stat(path)
+            stamp = [stat.st_size, stat.st_mtime_ns]
+            entry = previous.get(path)
+            if entry is None or entry.get("stamp") != stamp:
+                entry = {"stamp": stamp, "labels": scan_labels(path)}
+                rescanned += 1
+            files[path] = entry
+            for label in entry["labels"]:
+                if label in labels:
+                    raise ScriptError(path, 0, f"label '{label}' is also defined in {labels[label]}")
+                labels[label] = path
+
+        self.chapters = list(files)
+        self._chapter_order = {path: order for order, path in enumerate(self.chapters)}
+        self.labels = labels
+        self.scanned = True
+        self.stats["rescanned"] += rescanned
+        if rescanned or files.keys() != previous.keys():
+            self._write_index(index_path, files)
+        logging.info(f"Indexed {len(labels)} labels in {len(files)} chapters ({rescanned} rescanned)")
+
+    def _write_index(self, index_path: str, files: Dict[str, Any]) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"version": INDEX_VERSION, "files": files}, f)
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            logging.warning(f"Could not save script index: {e}")
+
+    def ensure_scanned(self) -> None:
+        if not self.scanned:
+            self.scan()
+
+    # ----- Chapters -----
+    def script(self, path: str) -> CompiledScript:
+        """A chapter's compiled script, waiting for or doing the compile if it is not in memory."""
+        script = self.loaded.get(path)
+        if script is not None:
+            self.loaded.move_to_end(path)
+            return script
+
+        future = self._futures.pop(path, None)
+        if future is not None and not future.cancelled():
+            script = future.result()  # Re-raises the worker's ScriptError
+            self.stats["prefetched"] += 1
+        else:
+            script = load_script(path, self.cache_dir)
+            self.stats["loaded"] += 1
+        self.loaded[path] = script
+        return script
+
+    def resolve(self, label: str) -> Tuple[CompiledScript, int]:
+        """The chapter holding `label` and the label's instruction index."""
+        path = self.labels.get(label)
+        if path is None:
+            raise KeyError(label)
+        script = self.script(path)
+        if label not in script.labels:
+            raise KeyError(label)  # The file changed since it was scanned
+        return script, script.labels[label]
+
+    def peek(self, label: str) -> Optional[Tuple[CompiledScript, int]]:
+        """Like `resolve`, but only for chapters already compiled; never waits on a compile."""
+        self._collect()
+        script = self.loaded.get(self.labels.get(label, ""))
+        if script is None or label not in script.labels:
+            return None
+        return script, script.labels[label]
+
+    def enter(self, path: str, pinned: Iterable[str] = ()) -> CompiledScript:
+        """
+        Make `path` the chapter being played: load it, start compiling the
+        chapters that may follow it, and drop far-away chapters if over budget.
+
+        Args:
+            pinned: Chapters that must stay loaded, e.g. those on the call stack.
+        """
+        script = self.script(path)
+        window = self.prefetch_window(path)
+        self._pinned = {path, *pinned}
+        for upcoming in window:
+            self._prefetch(upcoming)
+        self._collect()
+        self._trim(self._pinned.union(window))
+        return script
+
+    def prefetch_window(self, path: str) -> List[str]:
+        """Chapters the story can reach next from `path`: its jump targets, then the files after it."""
+        if path not in self._links:
+            script = self.loaded[path]
+            targets = (self.labels.get(label) for label in linked_labels(script))
+            self._links[path] = [target for target in dict.fromkeys(targets) if target and target != path]
+        order = self._chapter_order.get(path, len(self.chapters))
+        following = self.chapters[order + 1:order + 1 + self.prefetch_chapters]
+        window = list(dict.fromkeys(self._links[path] + following))
+        return window[:self.prefetch_chapters]
+
+    def _prefetch(self, path: str) -> None:
+        if path in self.loaded or path in self._futures:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="script-loader")
+        self._futures[path] = self._executor.submit(load_script, path, self.cache_dir)
+
+    def _collect(self) -> None:
+        """Move chapters the worker has finished into the loaded set."""
+        for path, future in list(self._futures.items()):
+            if not future.done():
+                continue
+            del self._futures[path]
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                # Left for the synchronous load to raise if the story gets there
+                logging.warning(f"Could not compile chapter ahead: {error}")
+                continue
+            self.loaded[path] = future.result()
+            self.stats["prefetched"] += 1
+
+    def _trim(self, keep: Set[str]) -> None:
+        usage = self.memory_usage()
+        for path in list(self.loaded):
+            if usage <= self.memory_budget:
+                break
+            if path in keep:
+                continue
+            usage -= self.loaded.pop(path).nbytes()
+            self.stats["evicted"] += 1
+
+    def shutdown(self) -> None:
+        """Stop the loader thread, abandoning queued compiles."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._futures.clear()
+
+    # ----- Reporting -----
+    def memory_usage(self) -> int:
+        """Bytes held by the compiled chapters in memory."""
+        return sum(script.nbytes() for script in self.loaded.values())
+
+    def report(self) -> str:
+        """A human-readable summary of the chapters in memory."""
+        lines = [f"Script chapters: {len(self.loaded)}/{len(self.chapters)} loaded, "
+                 f"{len(self._futures)} compiling, {len(self.labels)} labels"]
+        for path, script in reversed(self.loaded.items()):
+            marker = "*" if path in self._pinned else " "
+            lines.append(f"  {marker} {script.nbytes() / 1024:>9.1f} KB  {path}")
+        lines.append(f"  total: {self.memory_usage() / 1024:.1f} KB of {self.memory_budget / 1024:.0f} KB budget")
+        lines.append("  " + ", ".join(f"{name} {count}" for name, count in self.stats.items()))
+        return "\n".join(lines)
+
+
+class DialogueRunner:
+    """
+    Executes a story from a label until the next interaction.
+
+    After `advance()` returns True, the runner is either showing a line
+    (`speaker`/`text`) or waiting on a menu (`choices`, answered with
+    `choose()`). `background` and `shown` describe the images the script
+    has put on screen; each shown image is its tag and any attributes,
+    e.g. "eileen happy uniform". Every interaction is checkpointed into `history`,
+    so `rollback()` can return to any recent one.
+    """
+
+    def __init__(self, library: ScriptLibrary, variables: Optional[Dict[str, Any]] = None) -> None:
+        self.library = library
+        self.variables: Dict[str, Any] = variables if variables is not None else {}
+        self.script: Optional[CompiledScript] = None
+        self.pc = 0
+        self.call_stack: List[Tuple[str, int]] = []
+
+        self.speaker: Optional[str] = None
+        self.text: Optional[str] = None
+        self.choices: List[Tuple[str, int]] = []
+        self.background: Optional[str] = None
+        self.shown: List[str] = []
+        self.finished = False
+        self.history = RollbackLog()
+
+    def start(self, label: str = SCRIPT_START_LABEL) -> bool:
+        """Jump to `label` and run to the first interaction."""
+        self.library.ensure_scanned()
+        self.call_stack.clear()
+        self.history.clear()
+        self.finished = False
+        self._goto(label)
+        return self.advance()
+
+    def choose(self, index: int) -> bool:
+        """Answer the current menu with one of `choices` and run on."""
+        _, target = self.choices[index]
+        self.choices = []
+        self.pc = target
+        return self.advance()
+
+    def _goto(self, label: str) -> None:
+        caller, caller_pc = self.script, self.pc
+        path = self.library.labels.get(label)
+        script = self._enter(path) if path is not None else None
+        if script is None or label not in script.labels:
+            where = caller.name if caller else self.library.script_dir
+            raise ScriptError(where, caller.lineno(caller_pc - 1) if caller else 0, f"unknown label '{label}'")
+        self.pc = script.labels[label]
+
+    def _enter(self, path: str) -> CompiledScript:
+        """Switch to another chapter; jumps within the current one cost nothing extra."""
+        if self.script is None or self.script.name != path:
+            self.script = self.library.enter(path, (caller for caller, _ in self.call_stack))
+        return self.script
+
+    def upcoming_images(self, lookahead: int) -> List[Tuple[int, str]]:
+        """
+        Images the next `lookahead` statements may put on screen, nearest
+        first, as (SCENE or SHOW, name). Both sides of every `if` and every
+        menu choice are followed; jumps into chapters not yet in memory are not.
+        """
+        if self.script is None or self.finished:
+            return []
+        starts = [target for _, target in self.choices] if self.choices else [self.pc]
+        queue = deque((self.script, pc, tuple(self.call_stack)) for pc in starts)
+        seen: Set[Tuple[str, int]] = set()
+        found: List[Tuple[int, str]] = []
+        while queue and len(seen) < lookahead:
+            script, pc, stack = queue.popleft()
+            if (script.name, pc) in seen or pc >= len(script):
+                continue
+            seen.add((script.name, pc))
+            op, a, b, _ = script.fetch(pc)
+            if op == SCENE or op == SHOW:
+                found.append((op, script.consts[a]))
+            if op == JUMP:
+                queue.append((script, a, stack))
+            elif op == JUMP_IF_NOT:
+                queue.extend(((script, pc + 1, stack), (script, b, stack)))
+            elif op == MENU:
+                queue.extend((script, script.fetch(pc + 1 + offset)[3], stack) for offset in range(a))
+            elif op == GOTO or op == CALL:
+                target = self.library.peek(script.consts[a])
+                if target is not None:
+                    if op == CALL:
+                        stack = stack + ((script.name, pc + 1),)
+                    queue.append((target[0], target[1], stack))
+            elif op == RETURN:
+                caller = self.library.loaded.get(stack[-1][0]) if stack else None
+                if caller is not None:
+                    queue.append((caller, stack[-1][1], stack[:-1]))
+            elif op != END:
+                queue.append((script, pc + 1, stack))
+        return list(dict.fromkeys(found))
+
+    def _eval(self, index: int) -> Any:
+        try:
+            return eval(self.script.exprs[index], {"__builtins__": SCRIPT_BUILTINS}, self.variables)
+        except Exception as e:
+            raise ScriptError(self.script.name, self.script.lineno(self.pc - 1), f"{type(e).__name__}: {e}") from None
+
+    def advance(self) -> bool:
+        """
+        Run until the next line or menu.
+
+        Returns:
+            False once the story has ended.
+        """
+        interacting = self._run()
+        if interacting:
+            self.history.checkpoint(self.state())
+        return interacting
+
+    def _run(self) -> bool:
+        if self.choices:
+            raise ScriptError(self.script.name, self.script.lineno(self.pc), "waiting for a menu choice")
+        if self.finished or self.script is None:
+            return False
+        prompt = (self.speaker, self.text)
+        self.speaker = self.text = None
+
+        for _ in range(MAX_STEPS_PER_INTERACTION):
+            script = self.script
+            op, a, b, c = script.fetch(self.pc)
+            self.pc += 1
+
+            if op == SAY:
+                self.speaker = script.consts[a] if a != NO_OPERAND else None
+                self.text = script.consts[b]
+                return True
+            elif op == MENU:
+                first = self.pc
+                self.pc = first + a
+                for offset in range(a):
+                    _, text, condition, target = script.fetch(first + offset)
+                    if condition == NO_OPERAND or self._eval(condition):
+                        self.choices.append((script.consts[text], target))
+                if self.choices:
+                    # The line before a menu stays up as its prompt
+                    self.speaker, self.text = prompt
+                    return True
+                self.pc = b  # Nothing to choose from: skip the menu
+            elif op == JUMP:
+                self.pc = a
+            elif op == JUMP_IF_NOT:
+                if not self._eval(a):
+                    self.pc = b
+            elif op == SET:
+                self.variables[script.consts[a]] = self._eval(b)
+            elif op == GOTO:
+                self._goto(script.consts[a])
+            elif op == CALL:
+                self.call_stack.append((script.name, self.pc))
+                self._goto(script.consts[a])
+            elif op == RETURN and self.call_stack:
+                path, self.pc = self.call_stack.pop()
+                self._enter(path)
+            elif op in (RETURN, END):
+                # Returning from the entry label, or running off a file, ends the story
+                self.finished = True
+                return False
+            elif op == SCENE:
+                self.background = script.consts[a]
+                self.shown = []
+            elif op == SHOW:
+                self._show(script.consts[a])
+            elif op == HIDE:
+                self.shown = [image for image in self.shown if image.split()[0] != script.consts[a]]
+            elif op == CHOICE:
+                raise ScriptError(script.name, script.lineno(self.pc - 1), "CHOICE outside a menu")
+
+        raise ScriptError(self.script.name, self.script.lineno(self.pc),
+                          f"no line or menu after {MAX_STEPS_PER_INTERACTION} statements; is there a loop?")
+
+    def _show(self, image: str) -> None:
+        """
+        Put an image on screen in place of any with the same tag, its first
+        word. A layered character keeps the attributes the new ones don't replace.
+        """
+        tag, *attributes = image.split()
+        for position, shown in enumerate(self.shown):
+            shown_tag, *current = shown.split()
+            if shown_tag == tag:
+                self.shown[position] = " ".join((tag,) + character_library.merge(tag, current, attributes))
+                return
+        self.shown.append(" ".join((tag,) + character_library.merge(tag, (), attributes)))
+
+    # ----- Rollback and saves -----
+    def state(self) -> Dict[Any, Any]:
+        """
+        Everything an interaction depends on, flattened for `RollbackLog`.
+        Story variables are keyed ("var", name) so each is diffed on its own.
+        """
+        state: Dict[Any, Any] = {("var", name): value for name, value in self.variables.items()}
+        state.update(
+            script=self.script.name if self.script else None,
+            pc=self.pc,
+            call_stack=tuple(self.call_stack),
+            speaker=self.speaker,
+            text=self.text,
+            choices=tuple(self.choices),
+            background=self.background,
+            shown=tuple(self.shown),
+            finished=self.finished,
+        )
+        return state
+
+    def rollback(self, steps: int = 1) -> bool:
+        """
+        Return to the interaction `steps` before the current one, or the
+        oldest one kept. Only what changed since then is restored.
+
+        Returns:
+            False if there is nothing to roll back to.
+        """
+        # The current state counts as a step if it is not checkpointed yet,
+        # e.g. after the story ended
+        self.history.checkpoint(self.state())
+        if not self.history:
+            return False
+
+        self._apply(self.history.rollback(steps))
+        return True
+
+    def restore(self, state: Dict[Any, Any]) -> None:
+        """Continue from a `state()` taken earlier, e.g. by a save; rollback history starts over."""
+        self.library.ensure_scanned()
+        self.variables.clear()
+        self.script = None
+        self._apply(dict(state))
+        self.history.clear()
+        self.history.checkpoint(self.state())
+
+    def _apply(self, changes: Dict[Any, Any]) -> None:
+        path = changes.pop("script", MISSING)
+        for key, value in changes.items():
+            if isinstance(key, tuple):
+                if value is MISSING:
+                    self.variables.pop(key[1], None)
+                else:
+                    self.variables[key[1]] = value
+            elif key in ("call_stack", "choices", "shown"):
+                setattr(self, key, list(value))
+            elif key in ("pc", "speaker", "text", "background", "finished"):
+                setattr(self, key, value)
+        if path is not MISSING and path is not None:
+            self._enter(path)
+
+
+# Create a global instance for easy access
+script_library = ScriptLibrary()
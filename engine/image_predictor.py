@@ -0,0 +1,240 @@
+"""Scaled-image cache that loads the images a dialogue script is about to show."""
+import os
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import pygame
+
+from config import ASSET_FINALIZE_BUDGET_MS, ASSET_LOADER_THREADS, IMAGES_DIR, SCRIPT_IMAGE_BUDGET
+from engine.resource_manager import resource_manager
+
+# How an image is fitted to its target size
+COVER = "cover"            # Fill (width, height), cropping the overflow; backgrounds
+FIT_HEIGHT = "fit_height"  # Shrink to at most `height` tall; portraits
+
+# (image name, fit, target size)
+ImageKey = Tuple[str, str, Tuple[int, int]]
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+
+
+def image_path(name: str, images_dir: str = IMAGES_DIR) -> Optional[str]:
+    """Map a script image name (`scene Forest`) to a file in the images directory."""
+    for extension in IMAGE_EXTENSIONS:
+        path = os.path.join(images_dir, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def scale_to_cover(image: pygame.Surface, size: Tuple[int, int]) -> Tuple[pygame.Surface, Tuple[int, int]]:
+    """
+    Scale an image to cover `size` while keeping its aspect ratio.
+
+    Returns:
+        The scaled surface and the position that centres it.
+    """
+    screen_width, screen_height = size
+    bg_width, bg_height = image.get_size()
+    scale_factor = max(screen_width / bg_width, screen_height / bg_height)
+    new_width = int(bg_width * scale_factor)
+    new_height = int(bg_height * scale_factor)
+    scaled = pygame.transform.scale(image, (new_width, new_height))
+    return scaled, ((screen_width - new_width) // 2, (screen_height - new_height) // 2)
+
+
+def scale_to_height(image: pygame.Surface, max_height: int) -> pygame.Surface:
+    """Shrink an image to at most `max_height` tall, keeping its aspect ratio."""
+    width, height = image.get_size()
+    if height <= max_height:
+        return image
+    return pygame.transform.smoothscale(image, (max(1, width * max_height // height), max_height))
+
+
+def scale_image(image: pygame.Surface, fit: str, size: Tuple[int, int]) -> pygame.Surface:
+    """Apply one of the fits above."""
+    if fit == COVER:
+        return scale_to_cover(image, size)[0]
+    return scale_to_height(image, size[1])
+
+
+def load_scaled(path: str, fit: str, size: Tuple[int, int]) -> pygame.Surface:
+    """
+    Decode and scale an image without touching the display, so it can run
+    on a worker thread. Pre-decoded pixels from the asset cache are used
+    when the cache has them.
+    """
+    source = resource_manager.cache.load_image(path, resource_manager.get_hash(path))
+    if source is None:
+        source = pygame.image.load(path)
+    return scale_image(source, fit, size)
+
+
+def to_display_format(image: pygame.Surface) -> pygame.Surface:
+    """Match the display's pixel format so blits don't convert every frame."""
+    if pygame.display.get_surface() is None:
+        return image
+    return image.convert_alpha() if image.get_alpha() is not None else image.convert()
+
+
+class ImagePredictor:
+    """
+    Display-ready, scaled copies of the images a story is about to show.
+
+    `predict()` takes the images upcoming statements may need, nearest
+    first. Each one is decoded and scaled on a worker thread, and the scaled
+    result converted to the display format on the main thread by `pump()`,
+    so the full-size source never costs the frame loop anything. Finished
+    images are kept in an LRU capped at `budget` bytes, so `get()` at show
+    time is usually a lookup. Images pinned as on screen are never evicted.
+    """
+
+    def __init__(
+        self,
+        images_dir: str = IMAGES_DIR,
+        budget: int = SCRIPT_IMAGE_BUDGET,
+        max_workers: int = ASSET_LOADER_THREADS,
+    ) -> None:
+        self.images_dir = images_dir
+        self.budget = budget
+        self.max_workers = max_workers
+        # Scaled images, least recently used or predicted first
+        self.images: "OrderedDict[ImageKey, pygame.Surface]" = OrderedDict()
+        self.resident_bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "waits": 0, "misses": 0, "loaded": 0, "evicted": 0}
+
+        self._loading: Dict[ImageKey, Future] = {}
+        self._pinned: Set[ImageKey] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ----- Prediction -----
+    def predict(self, keys: Iterable[ImageKey]) -> None:
+        """
+        Start loading the images that may be shown next, nearest first.
+        Queued loads for images that are no longer reachable are dropped.
+        """
+        wanted = list(dict.fromkeys(keys))
+        wanted_set = set(wanted)
+        for key in list(self._loading):
+            if key not in wanted_set and self._loading[key].cancel():
+                del self._loading[key]
+
+        # Nearest predictions end up most recently used, so they are evicted last
+        for key in reversed(wanted):
+            if key in self.images:
+                self.images.move_to_end(key)
+        for key in wanted:
+            if key in self.images or key in self._loading:
+                continue
+            path = image_path(key[0], self.images_dir)
+            if path is not None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="image-loader")
+                self._loading[key] = self._executor.submit(load_scaled, path, key[1], key[2])
+
+    def pump(self, budget_ms: float = ASSET_FINALIZE_BUDGET_MS) -> bool:
+        """
+        Convert finished loads on the main thread, stopping once `budget_ms`
+        has been spent. Call once per frame.
+
+        Returns:
+            True while images are still loading.
+        """
+        start = time.perf_counter()
+        for key, future in list(self._loading.items()):
+            if not future.done():
+                continue
+            del self._loading[key]
+            try:
+                self._store(key, to_display_format(future.result()))
+            except Exception as e:
+                logging.warning(f"Could not load script image '{key[0]}': {e}")
+            if (time.perf_counter() - start) * 1000 >= budget_ms:
+                break
+        return bool(self._loading)
+
+    # ----- Lookup -----
+    def get(self, key: ImageKey) -> Optional[pygame.Surface]:
+        """The scaled image, finishing (or doing) its load now if it is not ready yet."""
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.stats["hits"] += 1
+            return image
+
+        future = self._loading.pop(key, None)
+        try:
+            if future is not None and not future.cancelled():
+                self.stats["waits"] += 1
+                image = future.result()
+            else:
+                path = image_path(key[0], self.images_dir)
+                if path is None:
+                    logging.warning(f"Script image '{key[0]}' not found")
+                    return None
+                self.stats["misses"] += 1
+                image = load_scaled(path, key[1], key[2])
+        except Exception as e:
+            logging.warning(f"Could not load script image '{key[0]}': {e}")
+            return None
+        image = to_display_format(image)
+        self._store(key, image)
+        return image
+
+    def peek(self, key: ImageKey) -> Optional[pygame.Surface]:
+        """The scaled image if it is ready; never loads or waits."""
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+        return image
+
+    def pin(self, keys: Iterable[ImageKey]) -> None:
+        """Mark the images currently on screen; they stay cached whatever the budget."""
+        self._pinned = set(keys)
+
+    # ----- Memory -----
+    def _store(self, key: ImageKey, image: pygame.Surface) -> None:
+        if key in self.images:
+            self.resident_bytes -= self._measure(self.images[key])
+        self.images[key] = image
+        self.resident_bytes += self._measure(image)
+        self.stats["loaded"] += 1
+        self._trim()
+
+    def _trim(self) -> None:
+        for key in list(self.images):
+            if self.resident_bytes <= self.budget:
+                break
+            if key in self._pinned:
+                continue
+            self.resident_bytes -= self._measure(self.images.pop(key))
+            self.stats["evicted"] += 1
+
+    @staticmethod
+    def _measure(image: pygame.Surface) -> int:
+        return image.get_pitch() * image.get_height()
+
+    def clear(self) -> None:
+        """Forget every scaled image and drop queued loads, e.g. after a resize."""
+        for future in self._loading.values():
+            future.cancel()
+        self._loading.clear()
+        self.images.clear()
+        self._pinned.clear()
+        self.resident_bytes = 0
+
+    def shutdown(self) -> None:
+        """Clear, and stop the loader threads."""
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def report(self) -> str:
+        """A human-readable summary of the cache."""
+        return (f"Script images: {len(self.images)} scaled, {self.resident_bytes / 1024:.0f} KB of "
+                f"{self.budget / 1024:.0f} KB budget, {len(self._loading)} loading; "
+                + ", ".join(f"{name} {count}" for name, count in self.stats.items()))
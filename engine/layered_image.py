@@ -0,0 +1,302 @@
+"""Layered character portraits: body, outfit, expression and effect layers composited once and cached.
+
+A character is a folder in `assets/characters`:
+
+    assets/characters/eileen/
+        character.json          {"groups": ["body", "outfit", "expression", "effect"],
+                                 "defaults": {"body": "base", "outfit": "casual", "expression": "neutral"}}
+        body/base.png
+        outfit/casual.png
+        outfit/uniform.png
+        expression/neutral.png
+        expression/happy.png
+        effect/blush.png
+
+Every layer is drawn on a canvas of the same size; groups are drawn in the
+order listed, and an attribute name picks one image from its group. In a
+script, `show eileen happy uniform` shows the character with those
+attributes in place of the ones already shown, keeping the rest. Pack each
+character's layers into an atlas with:
+
+    python -m engine.layered_image
+
+Characters without a built (or with a stale) atlas are packed in memory
+from their layer files when first shown.
+"""
+import os
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pygame
+
+from config import CHARACTER_ATLAS_DIR, CHARACTERS_DIR, PORTRAIT_CACHE_BUDGET
+from engine.atlas import TextureAtlas, read_atlas_index, write_atlas
+from engine.image_predictor import IMAGE_EXTENSIONS, scale_to_height, to_display_format
+
+CHARACTER_FILENAME = "character.json"
+
+# (character, attributes in group order, maximum height)
+PortraitKey = Tuple[str, Tuple[str, ...], int]
+
+
+class Character:
+    """One layered character's definition: its groups, their attributes and the defaults."""
+
+    def __init__(self, name: str, directory: str, groups: List[str], defaults: Dict[str, str]) -> None:
+        self.name = name
+        self.directory = directory
+        self.groups = groups
+        self.defaults = defaults
+        # attribute -> (group, layer file)
+        self.attributes: Dict[str, Tuple[str, str]] = {}
+        for group in groups:
+            group_dir = os.path.join(directory, group)
+            if not os.path.isdir(group_dir):
+                continue
+            for filename in sorted(os.listdir(group_dir)):
+                attribute, extension = os.path.splitext(filename)
+                if extension.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                if attribute in self.attributes:
+                    logging.warning(f"Character '{name}': attribute '{attribute}' is in more than one group")
+                    continue
+                self.attributes[attribute] = (group, os.path.join(group_dir, filename))
+
+    @classmethod
+    def load(cls, directory: str) -> "Character":
+        with open(os.path.join(directory, CHARACTER_FILENAME), "r") as f:
+            definition = json.load(f)
+        return cls(os.path.basename(directory), directory, list(definition["groups"]), dict(definition.get("defaults", {})))
+
+    @staticmethod
+    def layer_name(group: str, attribute: str) -> str:
+        """The layer's name within the character's atlas."""
+        return f"{group}/{attribute}"
+
+    def merge(self, current: Sequence[str], new: Sequence[str]) -> Tuple[str, ...]:
+        """
+        `current` attributes with `new` ones taking the place of any in the
+        same group, in group order. Unknown attributes are left out.
+        """
+        chosen: Dict[str, str] = {}
+        for attribute in list(current) + list(new):
+            layer = self.attributes.get(attribute)
+            if layer is None:
+                logging.warning(f"Character '{self.name}' has no attribute '{attribute}'")
+                continue
+            chosen[layer[0]] = attribute
+        return tuple(chosen[group] for group in self.groups if group in chosen)
+
+    def layers(self, attributes: Sequence[str]) -> List[str]:
+        """Atlas names of the layers to draw for `attributes`, defaults filling the gaps, back to front."""
+        chosen = dict(self.defaults)
+        for attribute in attributes:
+            if attribute in self.attributes:
+                chosen[self.attributes[attribute][0]] = attribute
+        return [self.layer_name(group, chosen[group]) for group in self.groups
+                if group in chosen and chosen[group] in self.attributes]
+
+    def sources(self) -> Dict[str, Any]:
+        """An identity for the layer files, stored in the atlas to tell when it is stale."""
+        stamps = {}
+        for group, path in sorted(self.attributes.values()):
+            stat = os.stat(path)
+            stamps[os.path.relpath(path, self.directory).replace(os.sep, "/")] = [stat.st_size, stat.st_mtime_ns]
+        return stamps
+
+    def load_layers(self) -> Dict[str, pygame.Surface]:
+        """Every layer image, decoded from its own file."""
+        return {self.layer_name(group, attribute): pygame.image.load(path)
+                for attribute, (group, path) in self.attributes.items()}
+
+
+class CharacterLibrary:
+    """
+    The layered characters in `characters_dir`, found on first use, and
+    their atlases, loaded when a character is first prefetched or shown.
+    """
+
+    def __init__(self, characters_dir: str = CHARACTERS_DIR, atlas_dir: str = CHARACTER_ATLAS_DIR) -> None:
+        self.characters_dir = characters_dir
+        self.atlas_dir = atlas_dir
+        self.characters: Optional[Dict[str, Character]] = None
+        self.atlases: Dict[str, TextureAtlas] = {}
+
+    def scan(self) -> Dict[str, Character]:
+        if self.characters is None:
+            self.characters = {}
+            if os.path.isdir(self.characters_dir):
+                for name in sorted(os.listdir(self.characters_dir)):
+                    directory = os.path.join(self.characters_dir, name)
+                    if os.path.isfile(os.path.join(directory, CHARACTER_FILENAME)):
+                        try:
+                            self.characters[name] = Character.load(directory)
+                        except Exception as e:
+                            logging.error(f"Could not load character '{name}': {e}")
+        return self.characters
+
+    def get(self, name: str) -> Optional[Character]:
+        return self.scan().get(name)
+
+    def merge(self, name: str, current: Sequence[str], new: Sequence[str]) -> Tuple[str, ...]:
+        """
+        The attributes `show name <new>` leaves a shown image with. For a
+        plain image, which has no groups, the new attributes replace the old.
+        """
+        character = self.get(name)
+        return character.merge(current, new) if character else tuple(new)
+
+    def _built_atlas(self, character: Character) -> Optional[TextureAtlas]:
+        """The atlas `python -m engine.layered_image` wrote, if the layer files haven't changed since."""
+        index = read_atlas_index(os.path.join(self.atlas_dir, f"{character.name}.json"))
+        if index is None or index["sources"] != character.sources():
+            return None
+        return TextureAtlas(index["images"], [os.path.join(self.atlas_dir, sheet) for sheet in index["sheets"]])
+
+    def atlas(self, name: str) -> Optional[TextureAtlas]:
+        """The character's layers, from its built atlas if that is up to date, else packed now."""
+        atlas = self.atlases.get(name)
+        if atlas is None:
+            character = self.get(name)
+            if character is None:
+                return None
+            atlas = self._built_atlas(character)
+            if atlas is None:
+                logging.info(f"Packing character '{name}' in memory; build its atlas with python -m engine.layered_image")
+                atlas = TextureAtlas.from_images(character.load_layers())
+            self.atlases[name] = atlas
+        return atlas
+
+    def prefetch(self, name: str) -> None:
+        """Start loading a character's atlas in the background, e.g. a few lines before it appears."""
+        character = self.get(name)
+        if character is not None and name not in self.atlases:
+            atlas = self._built_atlas(character)
+            if atlas is not None:
+                self.atlases[name] = atlas.prefetch()
+
+    def release(self) -> None:
+        """Drop every loaded atlas."""
+        for atlas in self.atlases.values():
+            atlas.release()
+        self.atlases.clear()
+
+
+class PortraitCompositor:
+    """
+    Finished portraits of layered characters, one surface per combination
+    of attributes and height.
+
+    A portrait is built once, by blitting its layers from the character's
+    atlas onto one canvas and scaling that to the height shown, then kept in
+    an LRU capped at `budget` bytes. Showing a combination again, e.g. a
+    character going back to a previous expression, is a lookup, and drawing
+    it is one blit however many layers it has.
+    """
+
+    def __init__(self, library: "CharacterLibrary", budget: int = PORTRAIT_CACHE_BUDGET) -> None:
+        self.library = library
+        self.budget = budget
+        self.portraits: "OrderedDict[PortraitKey, pygame.Surface]" = OrderedDict()
+        self.resident_bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "composited": 0, "evicted": 0}
+
+    def get(self, name: str, attributes: Sequence[str], max_height: int) -> Optional[pygame.Surface]:
+        """The portrait of character `name` with `attributes`, at most `max_height` tall."""
+        character = self.library.get(name)
+        if character is None:
+            return None
+        key = (name, tuple(character.merge((), attributes)), max_height)
+        portrait = self.portraits.get(key)
+        if portrait is not None:
+            self.portraits.move_to_end(key)
+            self.stats["hits"] += 1
+            return portrait
+
+        portrait = self.composite(character, key[1], max_height)
+        if portrait is not None:
+            self.portraits[key] = portrait
+            self.resident_bytes += portrait.get_pitch() * portrait.get_height()
+            self.stats["composited"] += 1
+            self._trim(keep=key)
+        return portrait
+
+    def composite(self, character: Character, attributes: Sequence[str], max_height: int) -> Optional[pygame.Surface]:
+        """Blit the layers onto one canvas and scale it; returns None if nothing could be drawn."""
+        atlas = self.library.atlas(character.name)
+        layers = [layer for layer in character.layers(attributes) if atlas is not None and layer in atlas]
+        if not layers:
+            return None
+        canvas = pygame.Surface(atlas.size(layers[0]), pygame.SRCALPHA)
+        canvas.blits([(atlas.get(layer), atlas.offset(layer)) for layer in layers], doreturn=False)
+        return to_display_format(scale_to_height(canvas, max_height))
+
+    def _trim(self, keep: PortraitKey) -> None:
+        while self.resident_bytes > self.budget and len(self.portraits) > 1:
+            key = next(iter(self.portraits))
+            if key == keep:
+                break
+            portrait = self.portraits.pop(key)
+            self.resident_bytes -= portrait.get_pitch() * portrait.get_height()
+            self.stats["evicted"] += 1
+
+    def clear(self) -> None:
+        self.portraits.clear()
+        self.resident_bytes = 0
+
+    def report(self) -> str:
+        """A human-readable summary of the portrait cache."""
+        return (f"Portraits: {len(self.portraits)} composited, {self.resident_bytes / 1024:.0f} KB of "
+                f"{self.budget / 1024:.0f} KB budget; "
+                + ", ".join(f"{name} {count}" for name, count in self.stats.items()))
+
+
+# Create a global instance for easy access
+character_library = CharacterLibrary()
+
+
+def build_atlases(
+    characters_dir: str = CHARACTERS_DIR,
+    atlas_dir: str = CHARACTER_ATLAS_DIR,
+    names: Iterable[str] = (),
+) -> List[str]:
+    """
+    Pack each character's layers (or just those named) into an atlas in
+    `atlas_dir`.
+
+    Returns:
+        The index files written.
+    """
+    from engine.atlas import build_atlas
+
+    library = CharacterLibrary(characters_dir, atlas_dir)
+    written = []
+    for name, character in library.scan().items():
+        if names and name not in names:
+            continue
+        layers = character.load_layers()
+        sheets, index = build_atlas(layers)
+        written.append(write_atlas(atlas_dir, name, sheets, index, character.sources()))
+        source_bytes = sum(os.path.getsize(path) for _, path in character.attributes.values())
+        print(f"Packed {name}: {len(layers)} layers from {source_bytes / 1024:.1f} KB "
+              f"into {len(sheets)} sheet(s) of {', '.join('%dx%d' % sheet.get_size() for sheet in sheets)}")
+    return written
+
+
+def main() -> None:
+    # Only needed for the command line; kept out of the game's import path
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack layered character images into texture atlases.")
+    parser.add_argument("names", nargs="*", help="characters to pack (default: all)")
+    parser.add_argument("--characters", default=CHARACTERS_DIR, help="character source directory")
+    parser.add_argument("--out", default=CHARACTER_ATLAS_DIR, help="atlas output directory")
+    args = parser.parse_args()
+    written = build_atlases(args.characters, args.out, args.names)
+    print(f"Character atlases: {len(written)} written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,39 @@
 """Module for managing game audio."""
 import os
 import json
+import time
 import pygame
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from engine.resource_manager import AssetHandle, resource_manager
+from config import (
+    SOUND_CATEGORY_CHANNELS,
+    MUSIC_DECK_CHANNELS,
+    MUSIC_CROSSFADE_MS,
+    UNRESERVED_SOUND_CHANNELS,
+    MAX_SOUND_INSTANCES,
+    SOUND_REPEAT_WINDOW_MS,
+    VOICE_STEAL_POLICY,
+    AUDIO_PROFILES,
+    DEFAULT_AUDIO_PROFILE,
+)
+
+
+def init_mixer(profile: str = DEFAULT_AUDIO_PROFILE) -> Dict[str, int]:
+    """
+    (Re)initialise the mixer with a preset from AUDIO_PROFILES. Unknown names
+    fall back to the default profile. Returns the settings used.
+    """
+    if profile not in AUDIO_PROFILES:
+        print(f"Unknown audio profile '{profile}', using '{DEFAULT_AUDIO_PROFILE}'")
+        profile = DEFAULT_AUDIO_PROFILE
+    settings = AUDIO_PROFILES[profile]
+
+    if pygame.mixer.get_init():
+        pygame.mixer.quit()
+    pygame.mixer.pre_init(**settings)
+    pygame.mixer.init()
+    return settings
 
 class SettingsManager:
     """Manages persistent game settings."""
@@ -41,20 +72,258 @@ class SettingsManager:
         self.settings[key] = value
         return self.save_settings()
 
+class VoicePool:
+    """
+    Hands out reserved mixer channels per sound category (UI, SFX, voice).
+
+    Each category owns a fixed block of channels, so a burst of hover sounds
+    can never starve other sounds. When a category is full, or a sound already
+    has `max_instances` voices playing, an existing voice is stolen according
+    to `steal_policy`. Replays of the same sound inside `repeat_window_ms`
+    are dropped.
+    """
+
+    def __init__(
+        self,
+        category_channels: Dict[str, int] = SOUND_CATEGORY_CHANNELS,
+        max_instances: int = MAX_SOUND_INSTANCES,
+        repeat_window_ms: int = SOUND_REPEAT_WINDOW_MS,
+        steal_policy: str = VOICE_STEAL_POLICY,
+        music_channels: int = MUSIC_DECK_CHANNELS,
+    ) -> None:
+        self.max_instances = max_instances
+        self.repeat_window_ms = repeat_window_ms
+        self.steal_policy = steal_policy
+
+        # Reserved channels are never picked by a plain Sound.play()
+        reserved = sum(category_channels.values()) + music_channels
+        pygame.mixer.set_num_channels(reserved + UNRESERVED_SOUND_CHANNELS)
+        pygame.mixer.set_reserved(reserved)
+
+        self.channels: Dict[str, List[pygame.mixer.Channel]] = {}
+        first = 0
+        for category, count in category_channels.items():
+            self.channels[category] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            first += count
+
+        # Handed to the MusicScheduler rather than used for sound effects
+        self.music_channels = [pygame.mixer.Channel(i) for i in range(first, first + music_channels)]
+
+        self.started: Dict[pygame.mixer.Channel, int] = {}
+        # Sounds started within the last repeat window -> ms; holding the sound keeps its identity unique
+        self.last_played: Dict[pygame.mixer.Sound, int] = {}
+
+    def set_volume(self, category: str, volume: float) -> None:
+        """Apply a volume to every channel in a category. Sticks across plays."""
+        for channel in self.channels[category]:
+            channel.set_volume(volume)
+
+    def play(self, sound: pygame.mixer.Sound, category: str) -> Optional[pygame.mixer.Channel]:
+        """Play a sound on one of the category's channels. Returns None if skipped."""
+        now = int(time.perf_counter() * 1000)
+        last = self.last_played.get(sound)
+        if last is not None and now - last < self.repeat_window_ms:
+            return None
+        # Forget sounds whose window has passed, so the table stays as small as the window
+        self.last_played = {s: ms for s, ms in self.last_played.items() if now - ms < self.repeat_window_ms}
+
+        channels = self.channels[category]
+        instances = [c for c in channels if c.get_busy() and c.get_sound() is sound]
+        if len(instances) >= self.max_instances:
+            channel = self._pick_victim(instances)
+        else:
+            channel = next((c for c in channels if not c.get_busy()), None) or self._pick_victim(channels)
+
+        channel.play(sound)
+        self.started[channel] = now
+        self.last_played[sound] = now
+        return channel
+
+    def _pick_victim(self, channels: List[pygame.mixer.Channel]) -> pygame.mixer.Channel:
+        """Choose which playing voice to cut off."""
+        if self.steal_policy == "quietest":
+            def loudness(channel: pygame.mixer.Channel) -> float:
+                playing = channel.get_sound()
+                return channel.get_volume() * (playing.get_volume() if playing else 0.0)
+            return min(channels, key=lambda c: (loudness(c), self.started.get(c, 0)))
+        return min(channels, key=lambda c: self.started.get(c, 0))
+
+    def stop(self, category: Optional[str] = None) -> None:
+        """Stop every voice in a category, or in all categories."""
+        for name, channels in self.channels.items():
+            if category is None or name == category:
+                for channel in channels:
+                    channel.stop()
+
+
+class _Deck:
+    """One music channel, plus what is needed to know where playback is."""
+
+    def __init__(self, channel: pygame.mixer.Channel) -> None:
+        self.channel = channel
+        self.path: Optional[str] = None
+        self.sound: Optional[pygame.mixer.Sound] = None
+        self.offset = 0.0              # Seconds into the track when started
+        self.started_at = 0.0          # perf_counter() when started or unpaused
+        self.paused_at: Optional[float] = None
+        self.requeue: Optional[int] = None  # Full plays still to queue after a resumed tail; -1 = forever, None = none
+
+    def position(self) -> float:
+        """Seconds into the current loop of the track."""
+        if self.sound is None:
+            return 0.0
+        now = self.paused_at if self.paused_at is not None else time.perf_counter()
+        length = self.sound.get_length()
+        return (self.offset + now - self.started_at) % length if length else 0.0
+
+
+class MusicScheduler:
+    """
+    Plays music as fully decoded sounds on two reserved channels, so switching
+    tracks never blocks on the disk and the outgoing track can fade out while
+    the next one fades in. Fades run inside SDL_mixer, not the game loop.
+
+    Tracks are decoded in the background by the resource manager; `preload()`
+    starts that ahead of time. The playback position of every track that was
+    stopped or switched away from is remembered and resumed.
+
+    Whole tracks are kept decoded as PCM: at 44.1 kHz 16-bit stereo that is
+    about 10 MB per minute of music, for the playing track, one fading out
+    and every preloaded one. Resuming part way also copies the rest of the
+    track into a separate sound while it plays.
+    """
+
+    def __init__(self, channels: List[pygame.mixer.Channel], crossfade_ms: int = MUSIC_CROSSFADE_MS) -> None:
+        self.decks = [_Deck(channel) for channel in channels]
+        self.crossfade_ms = crossfade_ms
+        self.active: Optional[_Deck] = None
+        self.handles: Dict[str, AssetHandle] = {}
+        self.positions: Dict[str, float] = {}
+        self.pending: Optional[Tuple[str, int, int]] = None
+
+    def preload(self, path: str) -> None:
+        """Start decoding a track so a later play() starts instantly."""
+        if path not in self.handles:
+            self.handles[path] = resource_manager.acquire_sound(path).prefetch()
+
+    def play(self, path: str, loops: int = -1, fade_ms: Optional[int] = None) -> None:
+        """Switch to a track, crossfading from the current one once it is decoded."""
+        self.preload(path)
+        self.pending = (path, loops, self.crossfade_ms if fade_ms is None else fade_ms)
+        self.update()
+
+    def update(self) -> None:
+        """Start a pending track when ready and keep resumed tracks looping. Call every frame."""
+        if self.pending and self.handles[self.pending[0]].ready():
+            pending, self.pending = self.pending, None
+            self._start(*pending)
+
+        deck = self.active
+        if deck and deck.requeue is not None and deck.paused_at is None and deck.channel.get_queue() is None:
+            # The resumed tail (or previous loop) is playing; line up the next full play
+            deck.channel.queue(deck.sound)
+            if deck.requeue > 0:
+                deck.requeue -= 1
+                if deck.requeue == 0:
+                    deck.requeue = None
+
+    def _start(self, path: str, loops: int, fade_ms: int) -> None:
+        sound = self.handles[path].get()
+        if sound is None:
+            return
+
+        outgoing = self.active
+        if outgoing and outgoing.path == path and outgoing.channel.get_busy():
+            self.resume()
+            return
+        if outgoing:
+            self._park(outgoing, fade_ms)
+
+        deck = next(d for d in self.decks if d is not outgoing)
+        deck.channel.stop()  # May still be fading out from an earlier switch
+        offset = self.positions.pop(path, 0.0)
+        if offset > 0:
+            # The tail stands in for the first play; `loops` more follow it
+            deck.channel.play(self._tail(sound, offset), 0, fade_ms=fade_ms)
+            deck.requeue = loops or None
+        else:
+            deck.channel.play(sound, loops, fade_ms=fade_ms)
+            deck.requeue = None
+        deck.path, deck.sound, deck.offset = path, sound, offset
+        deck.started_at, deck.paused_at = time.perf_counter(), None
+        self.active = deck
+
+        # Keep only the playing track and anything preloaded for later; the
+        # outgoing deck's channel holds its own reference while it fades
+        if outgoing and outgoing.path != path and outgoing.path in self.handles:
+            self.handles.pop(outgoing.path).release()
+
+    @staticmethod
+    def _tail(sound: pygame.mixer.Sound, offset: float) -> pygame.mixer.Sound:
+        """A new sound holding a copy of the PCM from `offset` seconds to the end."""
+        frequency, size, channels = pygame.mixer.get_init()
+        frame_bytes = channels * abs(size) // 8
+        data = memoryview(sound).cast("B")
+        start = min(int(offset * frequency) * frame_bytes, len(data) - frame_bytes)
+        return pygame.mixer.Sound(buffer=data[start:])
+
+    def _park(self, deck: _Deck, fade_ms: int) -> None:
+        """Remember where a deck was and stop it."""
+        self.positions[deck.path] = deck.position()
+        if fade_ms and deck.paused_at is None:
+            deck.channel.fadeout(fade_ms)
+        else:
+            deck.channel.stop()
+        deck.requeue = None
+
+    def stop(self, fade_ms: int = 0) -> None:
+        """Stop the music, remembering where it was."""
+        self.pending = None
+        if self.active:
+            self._park(self.active, fade_ms)
+            self.active = None
+
+    def pause(self) -> None:
+        deck = self.active
+        if deck and deck.paused_at is None:
+            deck.channel.pause()
+            deck.paused_at = time.perf_counter()
+
+    def resume(self) -> None:
+        deck = self.active
+        if deck and deck.paused_at is not None:
+            deck.channel.unpause()
+            deck.started_at += time.perf_counter() - deck.paused_at
+            deck.paused_at = None
+
+    def set_volume(self, volume: float) -> None:
+        for deck in self.decks:
+            deck.channel.set_volume(volume)
+
+
 class MusicManager:
     """Manages background music and sound effects."""
 
-    def __init__(self):
+    def __init__(self, settings_manager: Optional[SettingsManager] = None):
+        self.settings_manager = settings_manager or SettingsManager()
+
         # Ensure mixer is initialized
         if not pygame.mixer.get_init():
-            pygame.mixer.init()
+            init_mixer(self.settings_manager.get_setting("audio_profile", DEFAULT_AUDIO_PROFILE))
         
         # Volume settings (0.0 to 1.0)
-        self.settings_manager = SettingsManager()
         self.music_volume = self.settings_manager.get_setting("music_volume", 0.5)
         self.sound_volume = self.settings_manager.get_setting("sound_volume", 0.7)
         self.current_music = None
-        pygame.mixer.music.set_volume(self.music_volume)
+
+        # Sound effects play through per-category channel pools
+        self.voices = VoicePool()
+        self.category_volumes: Dict[str, float] = {category: 1.0 for category in self.voices.channels}
+        self._apply_sound_volumes()
+
+        # Music crossfades between two channels of its own
+        self.music = MusicScheduler(self.voices.music_channels)
+        self.music.set_volume(self.music_volume)
 
     def play_music(self, music_path: str, loops: int = -1) -> None:
         """Play background music. Loops forever by default."""
@@ -62,38 +331,53 @@ class MusicManager:
             print(f"Music file not found: {music_path}")
             return
 
-        try:
-            pygame.mixer.music.load(music_path)
-            pygame.mixer.music.play(loops)
-            self.current_music = music_path
-        except Exception as e:
-            print(f"Error playing music: {e}")
+        self.music.play(music_path, loops)
+        self.current_music = music_path
+
+    def queue_music(self, music_path: str) -> None:
+        """Decode a track in the background so switching to it is instant."""
+        if music_path and os.path.exists(music_path):
+            self.music.preload(music_path)
+
+    def update(self) -> None:
+        """Advance music scheduling. Call every frame."""
+        self.music.update()
 
     def stop_music(self) -> None:
         """Stop currently playing music."""
-        pygame.mixer.music.stop()
+        self.music.stop()
         
     def pause_music(self) -> None:
         """Pause currently playing music."""
-        pygame.mixer.music.pause()
+        self.music.pause()
         
     def resume_music(self) -> None:
         """Resume paused music."""
-        pygame.mixer.music.unpause()
+        self.music.resume()
 
     def set_music_volume(self, volume: float) -> None:
         """Set music volume (0.0 to 1.0) and save to settings."""
         self.music_volume = max(0.0, min(1.0, volume))
-        pygame.mixer.music.set_volume(self.music_volume)
+        self.music.set_volume(self.music_volume)
         self.settings_manager.set_setting("music_volume", self.music_volume)
 
     def set_sound_volume(self, volume: float) -> None:
         """Set sound effect volume (0.0 to 1.0) and save to settings."""
         self.sound_volume = max(0.0, min(1.0, volume))
         self.settings_manager.set_setting("sound_volume", self.sound_volume)
+        self._apply_sound_volumes()
+
+    def set_category_volume(self, category: str, volume: float) -> None:
+        """Set the volume (0.0 to 1.0) of one sound category, relative to the sound volume."""
+        self.category_volumes[category] = max(0.0, min(1.0, volume))
+        self.voices.set_volume(category, self.sound_volume * self.category_volumes[category])
+
+    def _apply_sound_volumes(self) -> None:
+        for category, volume in self.category_volumes.items():
+            self.voices.set_volume(category, self.sound_volume * volume)
 
-    def play_sound(self, sound: pygame.mixer.Sound) -> None:
-        """Play a sound effect."""
+    def play_sound(self, sound: pygame.mixer.Sound, category: str = "ui") -> Optional[pygame.mixer.Channel]:
+        """Play a sound effect in a category. Returns the channel, or None if skipped."""
         if sound:
-            sound.set_volume(self.sound_volume)
-            sound.play()
+            return self.voices.play(sound, category)
+        return None
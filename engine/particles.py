@@ -0,0 +1,221 @@
+"""Particle effects: every live particle moved in one vectorised NumPy step and drawn in one batched blit.
+
+NumPy is optional. Without it `ParticleSystem.available` is False, emitting
+does nothing, and screens look as they did before particles existed.
+"""
+import math
+import time
+import logging
+from itertools import repeat
+from typing import Dict, List, Optional, Set, Tuple
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # Effects are decoration; the game runs without them
+    np = None
+
+from config import PARTICLE_CAPACITY
+
+# Brightness steps a particle fades through over its life
+FADE_LEVELS = 8
+
+Color = Tuple[int, int, int]
+Range = Tuple[float, float]
+
+
+def glow_sprite(color: Color, radius: int, brightness: float = 1.0) -> pygame.Surface:
+    """A soft dot, bright in the middle, on black: drawn additively, black adds nothing."""
+    size = radius * 2 + 1
+    surface = pygame.Surface((size, size))
+    for r in range(radius, 0, -1):
+        # Brighter towards the centre
+        falloff = brightness * (1 - (r - 1) / radius)
+        pygame.draw.circle(surface, tuple(int(c * falloff) for c in color), (radius, radius), r)
+    return surface
+
+
+class ParticleSystem:
+    """
+    Up to `capacity` particles, stored as columns of NumPy arrays: position,
+    velocity, acceleration, age, lifetime and which sprite to draw.
+
+    `update(dt)` moves every live particle with a handful of whole-array
+    operations and drops the expired ones by compacting the arrays, so live
+    particles are always the first `count` rows. `draw()` picks each
+    particle's sprite by how far through its life it is, pre-rendered at
+    `FADE_LEVELS` brightnesses, and hands those inside the clip rect to one
+    `Surface.blits` call with additive blending. No Python code runs per
+    particle.
+
+    The cap is hard: particles emitted past it are dropped and counted in
+    `stats["dropped"]`. `frame_ms` is what the last whole frame's update and
+    draws cost.
+    """
+
+    available = np is not None
+
+    def __init__(self, capacity: int = PARTICLE_CAPACITY) -> None:
+        self.capacity = capacity
+        self.count = 0
+        # (color, radius) -> sprite id; sprite id * FADE_LEVELS + level indexes `_sprites`
+        self._sprite_ids: Dict[Tuple[Color, int], int] = {}
+        self._sprites: List[pygame.Surface] = []
+        self._radius: List[int] = []
+        self.stats = {"emitted": 0, "dropped": 0}
+        self.update_ms = 0.0
+        self.draw_ms = 0.0
+        self.frame_ms = 0.0
+        if not self.available:
+            return
+        self.position = np.zeros((capacity, 2), np.float32)
+        self.velocity = np.zeros((capacity, 2), np.float32)
+        self.acceleration = np.zeros((capacity, 2), np.float32)
+        self.age = np.zeros(capacity, np.float32)
+        self.life = np.ones(capacity, np.float32)
+        self.sprite = np.zeros(capacity, np.int32)
+        self._rng = np.random.default_rng()
+        self._sprite_table = np.empty(0, object)
+        self._half = np.zeros(0, np.int32)
+        self._placed: Optional[tuple] = None
+
+    def sprite_id(self, color: Color, radius: int) -> int:
+        """The id of a glowing dot sprite, rendering its fade levels the first time."""
+        key = (tuple(color), radius)
+        sprite_id = self._sprite_ids.get(key)
+        if sprite_id is None:
+            sprite_id = self._sprite_ids[key] = len(self._radius)
+            self._radius.append(radius)
+            for level in range(FADE_LEVELS):
+                self._sprites.append(glow_sprite(color, radius, (level + 1) / FADE_LEVELS))
+            if self.available:
+                self._sprite_table = np.empty(len(self._sprites), object)
+                self._sprite_table[:] = self._sprites
+                self._half = np.array(self._radius, np.int32)
+        return sprite_id
+
+    def emit(
+        self,
+        count: int,
+        sprite: int,
+        center: Tuple[float, float] = (0, 0),
+        area: Optional[pygame.Rect] = None,
+        speed: Range = (0.0, 50.0),
+        angle: Range = (0.0, 2 * math.pi),
+        life: Range = (0.5, 1.0),
+        acceleration: Tuple[float, float] = (0.0, 0.0),
+    ) -> int:
+        """
+        Start `count` particles at `center`, or spread over `area`, heading
+        off at a random angle and speed (pixels per second) within the
+        ranges, each living a random number of seconds within `life`.
+
+        Returns:
+            How many were started; the rest would have passed the cap.
+        """
+        if not self.available or count <= 0:
+            return 0
+        started = min(count, self.capacity - self.count)
+        self.stats["dropped"] += count - started
+        if started <= 0:
+            return 0
+        rows = slice(self.count, self.count + started)
+        rng = self._rng
+        if area is not None:
+            self.position[rows, 0] = rng.uniform(area.left, area.right, started)
+            self.position[rows, 1] = rng.uniform(area.top, area.bottom, started)
+        else:
+            self.position[rows] = center
+        headings = rng.uniform(angle[0], angle[1], started)
+        speeds = rng.uniform(speed[0], speed[1], started)
+        self.velocity[rows, 0] = np.cos(headings) * speeds
+        self.velocity[rows, 1] = np.sin(headings) * speeds
+        self.acceleration[rows] = acceleration
+        self.age[rows] = 0.0
+        self.life[rows] = rng.uniform(life[0], life[1], started)
+        self.sprite[rows] = sprite
+        self.count += started
+        self.stats["emitted"] += started
+        self._placed = None
+        return started
+
+    def update(self, dt: float) -> None:
+        """Move every particle on by `dt` seconds and drop those past their lifetime."""
+        start = time.perf_counter()
+        # The last frame's draws are done by now
+        self.frame_ms = self.update_ms + self.draw_ms
+        self.draw_ms = 0.0
+        n = self.count
+        if n:
+            self.velocity[:n] += self.acceleration[:n] * dt
+            self.position[:n] += self.velocity[:n] * dt
+            self.age[:n] += dt
+            alive = self.age[:n] < self.life[:n]
+            live = int(np.count_nonzero(alive))
+            if live < n:
+                for column in (self.position, self.velocity, self.acceleration, self.age, self.life, self.sprite):
+                    column[:live] = column[:n][alive]
+                self.count = live
+        self._placed = None
+        self.update_ms = (time.perf_counter() - start) * 1000
+
+    def bounds(self) -> Optional[pygame.Rect]:
+        """The screen area the live particles cover, or None if there are none."""
+        n = self.count
+        if not n:
+            return None
+        low = self.position[:n].min(axis=0)
+        high = self.position[:n].max(axis=0)
+        pad = int(self._half.max()) + 1
+        return pygame.Rect(int(low[0]) - pad, int(low[1]) - pad,
+                           int(high[0] - low[0]) + 2 * pad + 1, int(high[1] - low[1]) + 2 * pad + 1)
+
+    def _placement(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Each live particle's sprite, for how far through its life it is, and
+        the top-left and bottom-right corners it is drawn between. Worked out
+        once a frame, however many clipped parts of the screen are drawn.
+        """
+        if self._placed is None:
+            n = self.count
+            sprites = self.sprite[:n]
+            half = self._half[sprites][:, None]
+            center = self.position[:n].astype(np.int32)
+            # Brightest when new, fading to the dimmest level as they expire
+            remaining = 1.0 - self.age[:n] / self.life[:n]
+            levels = np.clip((remaining * FADE_LEVELS).astype(np.int32), 0, FADE_LEVELS - 1)
+            self._placed = (self._sprite_table[sprites * FADE_LEVELS + levels], center - half, center + half)
+        return self._placed
+
+    def covered_tiles(self, tile: int) -> Set[Tuple[int, int]]:
+        """The (column, row) of every `tile`-sized square a live particle's sprite touches."""
+        if not self.count:
+            return set()
+        _, top_left, bottom_right = self._placement()
+        # A sprite no larger than a tile touches at most the tiles its four corners are in
+        low = top_left // tile
+        high = bottom_right // tile
+        corners = np.concatenate([low, high, np.stack([low[:, 0], high[:, 1]], 1), np.stack([high[:, 0], low[:, 1]], 1)])
+        return set(map(tuple, np.unique(corners, axis=0).tolist()))
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """Blit the particles that fall within the surface's clip rect."""
+        start = time.perf_counter()
+        if self.count:
+            images, top_left, bottom_right = self._placement()
+            clip = surface.get_clip()
+            if clip != surface.get_rect():
+                inside = np.flatnonzero(((bottom_right >= clip.topleft) & (top_left < clip.bottomright)).all(axis=1))
+                images, top_left = images[inside], top_left[inside]
+            surface.blits(zip(images, top_left.tolist(), repeat(None), repeat(pygame.BLEND_RGB_ADD)), doreturn=False)
+        # A scene may draw several clipped parts a frame; update() starts the count again
+        self.draw_ms += (time.perf_counter() - start) * 1000
+
+    def clear(self) -> None:
+        self.count = 0
+        self._placed = None
+
+
+if np is None:
+    logging.info("NumPy is not installed; particle effects are off")
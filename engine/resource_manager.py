@@ -0,0 +1,416 @@
+"""Lazy, reference-counted loading of images, sounds and fonts."""
+import io
+import os
+import json
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pygame
+
+from config import ASSETS_DIR, ASSET_MANIFEST_PATH, ASSET_LOADER_THREADS, ASSET_CACHE_DIR
+from engine.asset_cache import AssetCache
+
+IMAGE = "image"
+SOUND = "sound"
+FONT = "font"
+# A sprite sheet from the asset cache; packed images are cut from it
+SHEET = "sheet"
+
+# File extensions recognised when building a manifest
+ASSET_EXTENSIONS: Dict[str, str] = {
+    ".png": IMAGE,
+    ".jpg": IMAGE,
+    ".jpeg": IMAGE,
+    ".bmp": IMAGE,
+    ".gif": IMAGE,
+    ".wav": SOUND,
+    ".ogg": SOUND,
+    ".mp3": SOUND,
+    ".ttf": FONT,
+    ".otf": FONT,
+}
+
+
+def hash_file(path: str, chunk_size: int = 1 << 16) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    import hashlib  # Only needed when building manifests
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(assets_dir: str = ASSETS_DIR) -> Dict[str, Any]:
+    """
+    Scan an asset directory and describe every known asset file.
+
+    Returns:
+        {"version": 1, "assets": {path: {"type", "hash", "bytes"}}} with
+        paths relative to the working directory, using forward slashes.
+    """
+    assets: Dict[str, Dict[str, Any]] = {}
+    for dirpath, _, filenames in os.walk(assets_dir):
+        for filename in sorted(filenames):
+            asset_type = ASSET_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+            if not asset_type:
+                continue
+            path = os.path.join(dirpath, filename)
+            assets[_normalize(path)] = {
+                "type": asset_type,
+                "hash": hash_file(path),
+                "bytes": os.path.getsize(path),
+            }
+    return {"version": 1, "assets": dict(sorted(assets.items()))}
+
+
+def write_manifest(manifest_path: str = ASSET_MANIFEST_PATH, assets_dir: str = ASSETS_DIR) -> Dict[str, Any]:
+    """Build a manifest for `assets_dir` and save it as JSON."""
+    manifest = build_manifest(assets_dir)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+def _normalize(path: str) -> str:
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+class AssetHandle:
+    """
+    A counted reference to one asset.
+
+    The asset is loaded on the first `get()` and shared with every other
+    handle for the same key. Call `release()` when the owner is done with it.
+    """
+
+    def __init__(self, manager: "ResourceManager", key: Tuple[Any, ...]) -> None:
+        self._manager = manager
+        self.key = key
+        self.released = False
+
+    def get(self) -> Any:
+        """
+        Return the loaded asset (None on failure). Loads it now if needed, or
+        waits for an in-flight background load to finish.
+        """
+        if self.released:
+            return None
+        return self._manager._load(self.key)
+
+    def prefetch(self) -> "AssetHandle":
+        """Start loading the asset on a worker thread; returns self."""
+        if not self.released:
+            self._manager._prefetch(self.key)
+        return self
+
+    def ready(self) -> bool:
+        """True once `get()` can return without touching the disk."""
+        return not self.released and self._manager._is_ready(self.key)
+
+    def release(self) -> None:
+        """Drop this reference. Safe to call more than once."""
+        if not self.released:
+            self.released = True
+            self._manager._release(self.key)
+
+
+class _Entry:
+    """Bookkeeping for one asset key."""
+
+    def __init__(self, asset_type: str, path: Optional[str], size: Optional[int] = None) -> None:
+        self.asset_type = asset_type
+        self.path = path
+        self.size = size
+        self.refcount = 0
+        self.asset: Any = None
+        self.future: Optional[Future] = None
+        self.resident_bytes = 0
+        self.failed = False
+        # For an image packed into a sprite sheet: the sheet, and where on it the image is
+        self.sheet: Optional[AssetHandle] = None
+        self.region: Optional[Tuple[int, int, int, int]] = None
+
+
+class ResourceManager:
+    """
+    Loads assets on demand and frees them when their last handle is released.
+
+    Assets described in the manifest carry a content hash, which the asset
+    cache tooling uses as a key. Assets missing from the manifest can still be
+    acquired; their type is inferred from the file extension.
+
+    Loading is split in two: reading and decoding (`_read`) is safe to run on
+    a worker thread, while finishing the asset for the display (`_finalize`)
+    happens on the main thread, either in `pump()` or on demand in `get()`.
+    Images and sounds found in the prebuilt asset cache skip decoding, and
+    an image packed into one of its sprite sheets is a subsurface of the
+    sheet, which is loaded once (as its own entry) for all of them.
+    """
+
+    def __init__(
+        self,
+        manifest_path: str = ASSET_MANIFEST_PATH,
+        max_workers: int = ASSET_LOADER_THREADS,
+        cache_dir: str = ASSET_CACHE_DIR,
+    ) -> None:
+        self.manifest_path = manifest_path
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self.cache = AssetCache(cache_dir)
+        self._entries: Dict[Tuple[Any, ...], _Entry] = {}
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Tuple[Tuple[Any, ...], _Entry]] = []
+        self.load_manifest()
+
+    def load_manifest(self) -> None:
+        """Load the asset manifest if it exists."""
+        try:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, "r") as f:
+                    self.manifest = json.load(f).get("assets", {})
+        except Exception as e:
+            logging.exception(f"Error loading asset manifest: {e}")
+            self.manifest = {}
+
+    def get_hash(self, path: str) -> Optional[str]:
+        """Content hash recorded for `path`, or None if it isn't in the manifest."""
+        info = self.manifest.get(_normalize(path))
+        return info["hash"] if info else None
+
+    # ----- Acquiring handles -----
+    def acquire(self, path: str, asset_type: Optional[str] = None) -> AssetHandle:
+        """Get a handle on an image or sound. Nothing is loaded yet."""
+        path = _normalize(path)
+        if asset_type is None:
+            info = self.manifest.get(path)
+            asset_type = info["type"] if info else ASSET_EXTENSIONS.get(os.path.splitext(path)[1].lower(), IMAGE)
+        return self._acquire((asset_type, path), asset_type, path)
+
+    def acquire_image(self, path: str) -> AssetHandle:
+        return self.acquire(path, IMAGE)
+
+    def acquire_sound(self, path: str) -> AssetHandle:
+        return self.acquire(path, SOUND)
+
+    def acquire_font(self, path: Optional[str], size: int) -> AssetHandle:
+        """Get a handle on a font. `path=None` means pygame's default font."""
+        path = _normalize(path) if path else None
+        return self._acquire((FONT, path, size), FONT, path, size)
+
+    def _acquire(self, key: Tuple[Any, ...], asset_type: str, path: Optional[str], size: Optional[int] = None) -> AssetHandle:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(asset_type, path, size)
+            sprite = self.cache.sprite(path) if asset_type == IMAGE else None
+            if sprite is not None:
+                sheet_key, entry.region = sprite
+                entry.sheet = self._acquire((SHEET, sheet_key), SHEET, sheet_key)
+        entry.refcount += 1
+        return AssetHandle(self, key)
+
+    def prefetch(self, paths: Iterable[str]) -> List[AssetHandle]:
+        """
+        Acquire handles on several files and start loading them in the
+        background. Missing files are skipped. The caller owns the handles.
+        """
+        return [self.acquire(path).prefetch() for path in paths if path and os.path.exists(path)]
+
+    # ----- Loading and freeing -----
+    def _load(self, key: Tuple[Any, ...]) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry.failed:
+            return None
+        if entry.asset is None and entry.sheet is not None:
+            sheet = entry.sheet.get()
+            if sheet is not None:
+                entry.asset = sheet.subsurface(entry.region)  # Its memory is counted against the sheet
+                return entry.asset
+            # No usable sheet; load the image from its own file instead
+            entry.sheet.release()
+            entry.sheet = None
+        if entry.asset is None:
+            try:
+                if entry.future is not None:
+                    payload = entry.future.result()
+                    entry.future = None
+                else:
+                    payload = self._read(entry)
+                self._finalize(entry, payload)
+            except Exception as e:
+                self._fail(entry, e)
+        return entry.asset
+
+    def _prefetch(self, key: Tuple[Any, ...]) -> None:
+        entry = self._entries.get(key)
+        if entry is None or entry.asset is not None or entry.future is not None or entry.failed:
+            return
+        if entry.sheet is not None:
+            entry.sheet.prefetch()
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asset-loader")
+        entry.future = self._executor.submit(self._read, entry)
+        self._pending.append((key, entry))
+
+    def _is_ready(self, key: Tuple[Any, ...]) -> bool:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if entry.asset is None and entry.sheet is not None:
+            if entry.sheet.ready():
+                self._load(key)
+        elif entry.asset is None and not entry.failed and entry.future is not None and entry.future.done():
+            # Finished in the background; hand it off now
+            self._load(key)
+        return entry.asset is not None or entry.failed
+
+    def pump(self, budget_ms: float) -> int:
+        """
+        Finish background loads on the main thread, stopping once
+        `budget_ms` has been spent. At least one finished load is handled per
+        call so progress is always made.
+
+        Returns:
+            The number of assets handed off.
+        """
+        if not self._pending:
+            return 0
+        start = time.perf_counter()
+        handed_off = 0
+        still_pending: List[Tuple[Tuple[Any, ...], _Entry]] = []
+        for index, (key, entry) in enumerate(self._pending):
+            if self._entries.get(key) is not entry or entry.future is None:
+                continue  # Released, or already finished by get()
+            if not entry.future.done():
+                still_pending.append((key, entry))
+                continue
+            self._load(key)
+            handed_off += 1
+            if (time.perf_counter() - start) * 1000 >= budget_ms:
+                still_pending.extend(self._pending[index + 1:])
+                break
+        self._pending = still_pending
+        return handed_off
+
+    def has_pending(self) -> bool:
+        """True while background loads are waiting to be handed off."""
+        return bool(self._pending)
+
+    def _read(self, entry: _Entry) -> Any:
+        """Disk read and decode. Runs on a worker thread for prefetched assets."""
+        if entry.asset_type == FONT:
+            return None  # Fonts are cheap to open; done in _finalize
+        if entry.asset_type == SHEET:
+            sheet = self.cache.load_sheet(entry.path)
+            if sheet is None:
+                raise FileNotFoundError(f"no sprite sheet '{entry.path}' in the asset cache")
+            return sheet
+        if entry.asset_type == IMAGE:
+            cached = self.cache.load_image(entry.path, self.get_hash(entry.path))
+            if cached is not None:
+                return cached
+        elif entry.asset_type == SOUND and pygame.mixer.get_init():
+            cached = self.cache.load_sound(entry.path, self.get_hash(entry.path))
+            if cached is not None:
+                return cached
+        with open(entry.path, "rb") as f:
+            data = f.read()
+        if entry.asset_type == IMAGE:
+            return pygame.image.load(io.BytesIO(data), entry.path)
+        if entry.asset_type == SOUND:
+            if not pygame.mixer.get_init():
+                raise RuntimeError("Pygame mixer not initialized")
+            return pygame.mixer.Sound(io.BytesIO(data))
+        raise ValueError(f"Unknown asset type '{entry.asset_type}'")
+
+    def _finalize(self, entry: _Entry, payload: Any) -> None:
+        """Main-thread handoff: make the asset display-ready and record it."""
+        if entry.asset_type in (IMAGE, SHEET) and pygame.display.get_surface() is not None:
+            # Match the display format so blits don't convert every frame
+            payload = payload.convert_alpha() if payload.get_alpha() is not None else payload.convert()
+        elif entry.asset_type == FONT:
+            payload = pygame.font.Font(entry.path, entry.size)
+        entry.asset = payload
+        entry.resident_bytes = self._measure(entry)
+
+    @staticmethod
+    def _fail(entry: _Entry, error: Exception) -> None:
+        logging.exception(f"Error loading {entry.asset_type} '{entry.path}': {error}")
+        entry.future = None
+        entry.failed = True
+
+    @staticmethod
+    def _measure(entry: _Entry) -> int:
+        """Estimate how many bytes a loaded asset keeps resident."""
+        asset = entry.asset
+        if entry.asset_type in (IMAGE, SHEET):
+            return asset.get_pitch() * asset.get_height()
+        if entry.asset_type == SOUND:
+            frequency, sample_format, channels = pygame.mixer.get_init()
+            return int(asset.get_length() * frequency) * channels * (abs(sample_format) // 8)
+        if entry.asset_type == FONT:
+            path = entry.path or os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+            return os.path.getsize(path) if os.path.exists(path) else 0
+        return 0
+
+    def _release(self, key: Tuple[Any, ...]) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.refcount -= 1
+        if entry.refcount <= 0:
+            # Last user gone; let pygame free the surface/sound
+            if entry.future is not None:
+                entry.future.cancel()
+            del self._entries[key]
+            if entry.sheet is not None:
+                entry.sheet.release()
+
+    def shutdown(self) -> None:
+        """Stop the loader threads, abandoning queued loads, and unmap the asset cache."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+        self.cache.close()
+
+    # ----- Reporting -----
+    def is_resident(self, path: str) -> bool:
+        """True if any asset loaded from `path` is currently in memory."""
+        path = _normalize(path)
+        return any(e.path == path and e.asset is not None for e in self._entries.values())
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Resident bytes per asset type."""
+        usage = {IMAGE: 0, SHEET: 0, SOUND: 0, FONT: 0}
+        for entry in self._entries.values():
+            if entry.asset is not None:
+                usage[entry.asset_type] += entry.resident_bytes
+        return usage
+
+    def report(self) -> str:
+        """A human-readable summary of resident assets."""
+        lines = ["Resident assets:"]
+        for key, entry in sorted(self._entries.items(), key=lambda item: -item[1].resident_bytes):
+            if entry.asset is not None:
+                name = entry.path or "<default>"
+                if entry.size:
+                    name = f"{name} @ {entry.size}"
+                lines.append(f"  {entry.asset_type:<6} {entry.resident_bytes / 1024:>9.1f} KB  x{entry.refcount}  {name}")
+        for asset_type, total in self.memory_usage().items():
+            lines.append(f"  total {asset_type}: {total / 1024:.1f} KB")
+        return "\n".join(lines)
+
+
+# Create a global instance for easy access
+resource_manager = ResourceManager()
+
+
+if __name__ == "__main__":
+    # Regenerate the asset manifest: python -m engine.resource_manager
+    written = write_manifest()
+    print(f"Wrote {len(written['assets'])} assets to {ASSET_MANIFEST_PATH}")
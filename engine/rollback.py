@@ -0,0 +1,154 @@
+"""Rollback history: undo deltas of story state kept in a memory-capped ring buffer."""
+import copy
+import pickle
+import zlib
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from config import ROLLBACK_MAX_STEPS, ROLLBACK_MEMORY_BUDGET
+
+# Deltas pickled to more than this many bytes are stored zlib-compressed
+COMPRESS_THRESHOLD = 256
+# Values that cannot change in place, so the shadow copy can share them
+_IMMUTABLE = (str, int, float, bool, bytes, type(None))
+
+
+class MISSING:
+    """Stands in for a key that did not exist at an earlier step; pickles by reference."""
+
+
+def _freeze(value: Any) -> Any:
+    """A copy of `value` later in-place changes cannot reach."""
+    if isinstance(value, _IMMUTABLE):
+        return value
+    if isinstance(value, tuple) and all(isinstance(item, _IMMUTABLE) for item in value):
+        return value
+    return copy.deepcopy(value)
+
+
+class RollbackLog:
+    """
+    Lets a story step back through its earlier interactions.
+
+    `checkpoint()` takes the whole state as a flat dict and compares it
+    with a shadow copy of the previous checkpoint. Only the keys that
+    changed are recorded, as an undo delta holding their old values. The
+    delta is pickled, and compressed when it is large. Deltas go into a
+    ring buffer that drops the oldest step once `max_steps` or the
+    `budget` in bytes is exceeded, so a long session never uses more than
+    that. `rollback(n)` undoes the newest n deltas and touches only the
+    keys they hold, so a step costs the size of its delta, not of the
+    whole state.
+    """
+
+    def __init__(self, budget: int = ROLLBACK_MEMORY_BUDGET, max_steps: int = ROLLBACK_MAX_STEPS) -> None:
+        self.budget = budget
+        self.max_steps = max_steps
+        # Undo deltas, oldest first: (payload, compressed)
+        self.steps: Deque[Tuple[bytes, bool]] = deque()
+        self.resident_bytes = 0
+        self.stats: Dict[str, int] = {"recorded": 0, "recorded_bytes": 0, "dropped": 0, "rolled_back": 0}
+
+        # The state as of the newest checkpoint
+        self._shadow: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        """How many steps back can be rolled."""
+        return len(self.steps)
+
+    def checkpoint(self, state: Dict[str, Any]) -> int:
+        """
+        Record `state` as the newest step. The first call only sets the
+        starting point; a call with nothing changed records nothing.
+
+        Returns:
+            The bytes the step takes in the history.
+        """
+        shadow = self._shadow
+        if shadow is None:
+            self._shadow = {key: _freeze(value) for key, value in state.items()}
+            return 0
+
+        delta = {}
+        for key, value in state.items():
+            old = shadow.get(key, MISSING)
+            if old is value:
+                continue
+            if old is MISSING or type(old) is not type(value) or old != value:
+                delta[key] = old
+                shadow[key] = _freeze(value)
+        if len(shadow) > len(state):
+            for key in shadow.keys() - state.keys():
+                delta[key] = shadow.pop(key)
+        if not delta:
+            return 0
+
+        try:
+            payload = pickle.dumps(delta, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            # An unpicklable value would make every earlier step unreachable
+            logging.warning(f"Rollback history cleared, state cannot be recorded: {e}")
+            self.clear()
+            self._shadow = {key: _freeze(value) for key, value in state.items()}
+            return 0
+        compressed = len(payload) > COMPRESS_THRESHOLD
+        if compressed:
+            payload = zlib.compress(payload, 1)
+
+        self.steps.append((payload, compressed))
+        self.resident_bytes += len(payload)
+        self.stats["recorded"] += 1
+        self.stats["recorded_bytes"] += len(payload)
+        self._trim()
+        return len(payload)
+
+    def rollback(self, steps: int = 1) -> Dict[str, Any]:
+        """
+        Undo the newest `steps` checkpoints, or as many as there are.
+
+        Returns:
+            The keys that differ from the newest checkpoint, with their values
+            at the step rolled back to. A key removed back then maps to
+            `MISSING`.
+        """
+        changes: Dict[str, Any] = {}
+        shadow = self._shadow
+        for _ in range(min(steps, len(self.steps))):
+            payload, compressed = self.steps.pop()
+            self.resident_bytes -= len(payload)
+            if compressed:
+                payload = zlib.decompress(payload)
+            changes.update(pickle.loads(payload))
+            self.stats["rolled_back"] += 1
+        for key, old in changes.items():
+            if old is MISSING:
+                shadow.pop(key, None)
+            else:
+                shadow[key] = _freeze(old)
+        return changes
+
+    def _trim(self) -> None:
+        while self.steps and (len(self.steps) > self.max_steps or self.resident_bytes > self.budget):
+            payload, _ = self.steps.popleft()
+            self.resident_bytes -= len(payload)
+            self.stats["dropped"] += 1
+
+    def clear(self) -> None:
+        """Forget every step, e.g. when a new story starts."""
+        self.steps.clear()
+        self.resident_bytes = 0
+        self._shadow = None
+
+    @property
+    def bytes_per_step(self) -> float:
+        return self.resident_bytes / len(self.steps) if self.steps else 0.0
+
+    def report(self) -> str:
+        """A human-readable summary of the history."""
+        average = self.stats["recorded_bytes"] / self.stats["recorded"] if self.stats["recorded"] else 0.0
+        return (f"Rollback: {len(self.steps)} steps in {self.resident_bytes / 1024:.1f} KB of "
+                f"{self.budget / 1024:.0f} KB budget, {self.bytes_per_step:.0f} bytes/step held, "
+                f"{average:.0f} bytes/step recorded; "
+                + ", ".join(f"{name} {count}" for name, count in self.stats.items()))
+
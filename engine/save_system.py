@@ -0,0 +1,305 @@
+"""Save slots: versioned, compressed snapshots written off the frame loop."""
+import io
+import os
+import json
+import time
+import zlib
+import pickle
+import struct
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import pygame
+
+from config import SAVE_COMPRESSION_LEVEL, SAVE_DIR, SAVE_THUMBNAIL_SIZE
+
+SAVE_SUFFIX = ".sav"
+SAVE_FORMAT_VERSION = 1
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+THUMBNAIL_DIRNAME = "thumbnails"
+# magic, format version, metadata length, body length, CRC-32 of metadata and body
+SAVE_HEADER = struct.Struct("<4sBIII")
+SAVE_MAGIC = b"FFSV"
+
+# Kinds of save, each resumed by the state that wrote it
+SNAKE_SAVE = "snake"
+DIALOGUE_SAVE = "dialogue"
+
+
+class SaveError(Exception):
+    """A save that is missing, damaged or written by an unknown format version."""
+
+
+class _DataUnpickler(pickle.Unpickler):
+    """Reads plain data only: a save naming any class or function is rejected, not run."""
+
+    def find_class(self, module: str, name: str) -> Any:
+        raise SaveError(f"save refers to {module}.{name}")
+
+
+def encode_save(meta: Dict[str, Any], body: bytes, level: int = SAVE_COMPRESSION_LEVEL) -> bytes:
+    """A save file: header, JSON metadata, then the zlib-compressed pickled state."""
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    compressed = zlib.compress(body, level)
+    crc = zlib.crc32(compressed, zlib.crc32(meta_bytes))
+    header = SAVE_HEADER.pack(SAVE_MAGIC, SAVE_FORMAT_VERSION, len(meta_bytes), len(compressed), crc)
+    return header + meta_bytes + compressed
+
+
+def read_save_meta(data: bytes) -> Tuple[Dict[str, Any], memoryview]:
+    """Check a save's header and checksum; returns its metadata and compressed body."""
+    if len(data) < SAVE_HEADER.size:
+        raise SaveError("save is truncated")
+    magic, version, meta_length, body_length, crc = SAVE_HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC:
+        raise SaveError("not a save file")
+    if version != SAVE_FORMAT_VERSION:
+        raise SaveError(f"save format version {version} is not supported")
+    view = memoryview(data)[SAVE_HEADER.size:]
+    if len(view) != meta_length + body_length:
+        raise SaveError("save is truncated")
+    meta_bytes, compressed = view[:meta_length], view[meta_length:]
+    if zlib.crc32(compressed, zlib.crc32(meta_bytes)) != crc:
+        raise SaveError("save is damaged")
+    return json.loads(bytes(meta_bytes)), compressed
+
+
+def decode_save(data: bytes) -> Tuple[Dict[str, Any], Any]:
+    """The metadata and state stored by `encode_save`."""
+    meta, compressed = read_save_meta(data)
+    return meta, _DataUnpickler(io.BytesIO(zlib.decompress(compressed))).load()
+
+
+def make_thumbnail(screenshot: pygame.Surface, size: Tuple[int, int] = SAVE_THUMBNAIL_SIZE) -> bytes:
+    """Shrink a screenshot to fit within `size`, keeping its aspect ratio, and encode it as PNG."""
+    width, height = screenshot.get_size()
+    scale = min(size[0] / width, size[1] / height)
+    thumb_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    try:
+        thumbnail = pygame.transform.smoothscale(screenshot, thumb_size)
+    except ValueError:
+        # smoothscale only takes 24 and 32-bit surfaces
+        thumbnail = pygame.transform.scale(screenshot, thumb_size)
+    buffer = io.BytesIO()
+    pygame.image.save(thumbnail, buffer, "thumbnail.png")
+    return buffer.getvalue()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Replace `path` with `data` so a crash leaves either the old file or the new one."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class SaveManager:
+    """
+    Numbered save slots in `save_dir`.
+
+    `save()` pickles the state on the calling thread, which is quick and
+    keeps the snapshot consistent. Compressing and writing happen on a
+    single background thread, in order, each to a temporary file renamed
+    over the old slot. Slot metadata (kind, title, time, size) also goes
+    into `index.json`, so listing saves reads one small file instead of
+    every save. If the index is lost, it is rebuilt from the metadata each
+    save carries. A screenshot passed to `save()` is copied as is; the
+    writer thread shrinks it into a PNG thumbnail in `thumbnail_dir`.
+    """
+
+    def __init__(self, save_dir: str = SAVE_DIR) -> None:
+        self.save_dir = save_dir
+        # slot -> metadata, as stored in the index
+        self.slots: Dict[int, Dict[str, Any]] = {}
+        self.indexed = False
+        self.stats: Dict[str, int] = {"saved": 0, "loaded": 0, "failed": 0, "bytes_written": 0}
+
+        self._pending: Dict[int, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ----- Index -----
+    def slot_path(self, slot: int) -> str:
+        return os.path.join(self.save_dir, f"slot_{slot:04d}{SAVE_SUFFIX}")
+
+    @property
+    def thumbnail_dir(self) -> str:
+        return os.path.join(self.save_dir, THUMBNAIL_DIRNAME)
+
+    def thumbnail_path(self, slot: int) -> str:
+        return os.path.join(self.thumbnail_dir, f"slot_{slot:04d}.png")
+
+    def ensure_indexed(self) -> None:
+        """Read the slot index, rebuilding it from the save files if it is missing or stale."""
+        if self.indexed:
+            return
+        self.indexed = True
+        index_path = os.path.join(self.save_dir, INDEX_FILENAME)
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                self.slots = {int(slot): meta for slot, meta in index["slots"].items()}
+                return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Rebuilding unreadable save index: {e}")
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        self.slots = {}
+        if not os.path.isdir(self.save_dir):
+            return
+        for filename in os.listdir(self.save_dir):
+            if not (filename.startswith("slot_") and filename.endswith(SAVE_SUFFIX)):
+                continue
+            path = os.path.join(self.save_dir, filename)
+            try:
+                with open(path, "rb") as f:
+                    meta, _ = read_save_meta(f.read())
+                self.slots[int(filename[len("slot_"):-len(SAVE_SUFFIX)])] = meta
+            except (OSError, ValueError, SaveError) as e:
+                logging.warning(f"Skipping save '{path}': {e}")
+        self._submit(self._write_index, dict(self.slots))
+
+    def _write_index(self, slots: Dict[int, Dict[str, Any]]) -> None:
+        os.makedirs(self.save_dir, exist_ok=True)
+        data = json.dumps({"version": INDEX_VERSION, "slots": slots}).encode("utf-8")
+        _write_atomic(os.path.join(self.save_dir, INDEX_FILENAME), data)
+
+    def listing(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """Every slot and its metadata, most recently saved first."""
+        self.ensure_indexed()
+        return sorted(self.slots.items(), key=lambda item: item[1].get("saved_at", 0), reverse=True)
+
+    def next_slot(self) -> int:
+        self.ensure_indexed()
+        return max(self.slots, default=0) + 1
+
+    # ----- Saving -----
+    def _submit(self, fn, *args) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save-writer")
+        return self._executor.submit(fn, *args)
+
+    def save(
+        self,
+        kind: str,
+        state: Any,
+        title: str = "",
+        slot: Optional[int] = None,
+        screenshot: Optional[pygame.Surface] = None,
+    ) -> int:
+        """
+        Save `state`, a structure of plain Python data, to `slot` or a new
+        slot, with a thumbnail of `screenshot` if given. Returns as soon as
+        the state is pickled; the files are written in the background.
+
+        Returns:
+            The slot saved to.
+        """
+        self.ensure_indexed()
+        if slot is None:
+            slot = self.next_slot()
+        self._pending = {pending: future for pending, future in self._pending.items() if not future.done()}
+        body = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        meta = {"kind": kind, "title": title, "saved_at": time.time(), "state_bytes": len(body)}
+        if screenshot is not None:
+            # The display keeps changing; the copy is what gets shrunk later
+            screenshot = screenshot.copy()
+            meta["thumbnail"] = os.path.basename(self.thumbnail_path(slot))
+        self.slots[slot] = meta
+        self._pending[slot] = self._submit(self._write_slot, slot, meta, body, dict(self.slots), screenshot)
+        return slot
+
+    def _write_slot(
+        self,
+        slot: int,
+        meta: Dict[str, Any],
+        body: bytes,
+        slots: Dict[int, Dict[str, Any]],
+        screenshot: Optional[pygame.Surface],
+    ) -> None:
+        try:
+            data = encode_save(meta, body)
+            os.makedirs(self.save_dir, exist_ok=True)
+            _write_atomic(self.slot_path(slot), data)
+            written = len(data)
+            if screenshot is not None:
+                thumbnail = make_thumbnail(screenshot)
+                os.makedirs(self.thumbnail_dir, exist_ok=True)
+                _write_atomic(self.thumbnail_path(slot), thumbnail)
+                written += len(thumbnail)
+            self._write_index(slots)
+            self.stats["saved"] += 1
+            self.stats["bytes_written"] += written
+        except Exception as e:
+            self.stats["failed"] += 1
+            logging.error(f"Could not write save slot {slot}: {e}")
+            raise
+
+    def delete(self, slot: int) -> None:
+        """Remove a slot and its file."""
+        self.ensure_indexed()
+        self.slots.pop(slot, None)
+        self._submit(self._delete_slot, slot, dict(self.slots))
+
+    def _delete_slot(self, slot: int, slots: Dict[int, Dict[str, Any]]) -> None:
+        for path in (self.slot_path(slot), self.thumbnail_path(slot)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._write_index(slots)
+
+    # ----- Loading -----
+    def load(self, slot: int) -> Tuple[Dict[str, Any], Any]:
+        """
+        Read a slot, waiting for its write first if one is still pending.
+
+        Returns:
+            The slot's metadata and the state it was saved with.
+        """
+        future = self._pending.pop(slot, None)
+        if future is not None:
+            future.exception()
+        try:
+            with open(self.slot_path(slot), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            raise SaveError(f"slot {slot} is empty") from None
+        try:
+            result = decode_save(data)
+        except SaveError:
+            raise
+        except Exception as e:
+            raise SaveError(f"slot {slot} could not be read: {e}") from None
+        self.stats["loaded"] += 1
+        return result
+
+    # ----- Shutdown -----
+    def flush(self) -> None:
+        """Wait until every queued write is on disk."""
+        if self._executor is not None:
+            self._submit(lambda: None).result()
+        self._pending.clear()
+
+    def shutdown(self) -> None:
+        """Finish queued writes, then stop the writer thread. Saves are never dropped."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._pending.clear()
+
+    def report(self) -> str:
+        """A human-readable summary of the save slots."""
+        return (f"Saves: {len(self.slots)} slots in {self.save_dir}, {len(self._pending)} pending; "
+                + ", ".join(f"{name} {count}" for name, count in self.stats.items()))
+
+
+# Create a global instance for easy access
+save_manager = SaveManager()
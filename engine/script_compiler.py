@@ -0,0 +1,492 @@
+"""Dialogue script compiler.
+
+Parses `.story` scripts into a compact bytecode and caches the compiled
+form on disk, keyed by the source file's content hash, so unchanged
+scripts are never re-parsed. Precompile everything with:
+
+    python -m engine.script_compiler [--dis]
+
+Script format (indentation is significant, `#` starts a comment line):
+
+    define e = "Eileen"
+
+    label start:
+        scene PossibleBackground
+        "Narration is a bare string."
+        e "A line spoken by a defined character."
+        $ trust = 0
+        menu:
+            "Be friendly":
+                $ trust += 1
+            "Be cold" if trust < 5:
+                jump cold_open
+        if trust > 0:
+            e "Nice to meet you."
+        elif trust < 0:
+            pass
+        else:
+            show MainMenuBackground
+        show eileen happy uniform
+        call interlude
+        return
+
+`show` takes an image name, or a layered character and attributes (see
+`engine/layered_image.py`); showing a name again replaces the image with
+that tag, its first word, and `hide` takes the tag alone.
+
+Expressions after `$`, `if` and menu-choice conditions are Python
+expressions over the story's variables; they are compiled once with the
+script and cached as code objects.
+"""
+import os
+import re
+import ast
+import time
+import marshal
+import threading
+import logging
+from array import array
+from importlib.util import MAGIC_NUMBER
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import SCRIPT_CACHE_DIR, SCRIPT_DIR, SCRIPT_EXTENSION
+
+# Opcodes. Every instruction is four int32s: the opcode and three operands.
+(SAY, MENU, CHOICE, JUMP, JUMP_IF_NOT, GOTO, CALL, RETURN, SET, SCENE, SHOW, HIDE, END) = range(13)
+OPCODE_NAMES = ["SAY", "MENU", "CHOICE", "JUMP", "JUMP_IF_NOT", "GOTO", "CALL", "RETURN",
+                "SET", "SCENE", "SHOW", "HIDE", "END"]
+INSTRUCTION_WIDTH = 4
+NO_OPERAND = -1
+
+CACHE_SUFFIX = ".ffc"
+CACHE_VERSION = 1
+# Cached expressions are marshalled code objects, which are only valid for
+# the interpreter version that wrote them
+CACHE_HEADER = b"FFSC" + bytes([CACHE_VERSION]) + MAGIC_NUMBER
+
+_SAY_RE = re.compile(r'(?:([A-Za-z_]\w*)\s+)?("(?:[^"\\]|\\.)*")$')
+_CHOICE_RE = re.compile(r'("(?:[^"\\]|\\.)*")(?:\s+if\s+(.+))?:$')
+_SET_RE = re.compile(r'\$\s*([A-Za-z_]\w*)\s*([-+*/]?=)\s*(.+)$')
+_DEFINE_RE = re.compile(r'define\s+([A-Za-z_]\w*)\s*=\s*("(?:[^"\\]|\\.)*")$')
+_NAME_RE = re.compile(r'[A-Za-z_][\w.]*$')
+_LABEL_SCAN_RE = re.compile(rb'^label[ \t]+([A-Za-z_][\w.]*)[ \t]*:', re.MULTILINE)
+
+
+class ScriptError(Exception):
+    """A syntax or runtime error in a dialogue script, tagged with its location."""
+
+    def __init__(self, filename: str, lineno: int, message: str) -> None:
+        super().__init__(f"{filename}:{lineno}: {message}")
+        self.filename = filename
+        self.lineno = lineno
+
+
+class CompiledScript:
+    """
+    One compiled script file.
+
+    `code` is a flat int32 array of fixed-width instructions, so a program
+    counter is an instruction index. Operands refer to `consts` (strings),
+    `exprs` (compiled expressions) or other instructions.
+    """
+
+    __slots__ = ("name", "code", "lines", "consts", "exprs", "labels", "defines")
+
+    def __init__(
+        self,
+        name: str,
+        code: array,
+        lines: array,
+        consts: List[str],
+        exprs: List[Any],
+        labels: Dict[str, int],
+        defines: Dict[str, str],
+    ) -> None:
+        self.name = name
+        self.code = code
+        self.lines = lines
+        self.consts = consts
+        self.exprs = exprs
+        self.labels = labels
+        self.defines = defines
+
+    def __len__(self) -> int:
+        return len(self.code) // INSTRUCTION_WIDTH
+
+    def fetch(self, pc: int) -> Tuple[int, int, int, int]:
+        i = pc * INSTRUCTION_WIDTH
+        code = self.code
+        return code[i], code[i + 1], code[i + 2], code[i + 3]
+
+    def lineno(self, pc: int) -> int:
+        return self.lines[pc] if 0 <= pc < len(self.lines) else 0
+
+    def nbytes(self) -> int:
+        """Approximate in-memory size, for budgeting how many scripts stay loaded."""
+        return (
+            self.code.itemsize * len(self.code)
+            + self.lines.itemsize * len(self.lines)
+            + sum(len(c) for c in self.consts)
+            + 200 * len(self.exprs)
+        )
+
+    def to_bytes(self) -> bytes:
+        return CACHE_HEADER + marshal.dumps((
+            self.code.tobytes(), self.lines.tobytes(), self.consts, self.exprs, self.labels, self.defines,
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, name: str) -> Optional["CompiledScript"]:
+        """Rebuild a script from `to_bytes()` output, or None if it was written by another version."""
+        if not data.startswith(CACHE_HEADER):
+            return None
+        code_bytes, line_bytes, consts, exprs, labels, defines = marshal.loads(data[len(CACHE_HEADER):])
+        code = array("i")
+        code.frombytes(code_bytes)
+        lines = array("i")
+        lines.frombytes(line_bytes)
+        return cls(name, code, lines, consts, exprs, labels, defines)
+
+
+def _logical_lines(source: str) -> List[Tuple[int, int, str]]:
+    """(indent, lineno, text) for every line that isn't blank or a comment."""
+    result = []
+    for lineno, raw in enumerate(source.splitlines(), 1):
+        text = raw.strip()
+        if not text or text.startswith("#"):
+            continue
+        expanded = raw.expandtabs(4)
+        result.append((len(expanded) - len(expanded.lstrip()), lineno, text))
+    return result
+
+
+class _Compiler:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.code = array("i")
+        self.lines = array("i")
+        self.consts: List[str] = []
+        self.const_index: Dict[str, int] = {}
+        self.exprs: List[Any] = []
+        self.expr_index: Dict[str, int] = {}
+        self.labels: Dict[str, int] = {}
+        self.defines: Dict[str, str] = {}
+
+    # ----- Emission -----
+    @property
+    def pc(self) -> int:
+        return len(self.lines)
+
+    def emit(self, lineno: int, op: int, a: int = NO_OPERAND, b: int = NO_OPERAND, c: int = NO_OPERAND) -> int:
+        pc = self.pc
+        self.code.extend((op, a, b, c))
+        self.lines.append(lineno)
+        return pc
+
+    def patch(self, pc: int, operand: int, value: int) -> None:
+        self.code[pc * INSTRUCTION_WIDTH + operand] = value
+
+    def const(self, value: str) -> int:
+        index = self.const_index.get(value)
+        if index is None:
+            index = self.const_index[value] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+    def expr(self, source: str, lineno: int) -> int:
+        index = self.expr_index.get(source)
+        if index is None:
+            try:
+                code = compile(source, f"{self.name}:{lineno}", "eval")
+            except SyntaxError as e:
+                raise ScriptError(self.name, lineno, f"invalid expression '{source}': {e.msg}") from None
+            index = self.expr_index[source] = len(self.exprs)
+            self.exprs.append(code)
+        return index
+
+    def string(self, literal: str, lineno: int) -> str:
+        if "\\" not in literal:
+            return literal[1:-1]
+        try:
+            return ast.literal_eval(literal)
+        except (SyntaxError, ValueError):
+            raise ScriptError(self.name, lineno, f"invalid string {literal}") from None
+
+    # ----- Blocks -----
+    def compile(self, lines: List[Tuple[int, int, str]]) -> CompiledScript:
+        i = 0
+        while i < len(lines):
+            indent, lineno, text = lines[i]
+            if indent:
+                raise ScriptError(self.name, lineno, "unexpected indent")
+            if text.startswith("label "):
+                i = self.label(lines, i)
+            elif text.startswith("define "):
+                match = _DEFINE_RE.match(text)
+                if not match:
+                    raise ScriptError(self.name, lineno, "expected: define name = \"Display Name\"")
+                self.defines[match.group(1)] = self.string(match.group(2), lineno)
+                i += 1
+            else:
+                raise ScriptError(self.name, lineno, "statements must be inside a label")
+        self.emit(lines[-1][1] if lines else 0, END)
+        return CompiledScript(self.name, self.code, self.lines, self.consts, self.exprs, self.labels, self.defines)
+
+    def label(self, lines: List[Tuple[int, int, str]], i: int) -> int:
+        _, lineno, text = lines[i]
+        name = text[len("label "):].rstrip(":").strip()
+        if not text.endswith(":") or not _NAME_RE.match(name):
+            raise ScriptError(self.name, lineno, "expected: label name:")
+        if name in self.labels:
+            raise ScriptError(self.name, lineno, f"label '{name}' is defined twice")
+        self.labels[name] = self.pc
+        return self.block(lines, i + 1, self.child_indent(lines, i))
+
+    def child_indent(self, lines: List[Tuple[int, int, str]], i: int) -> int:
+        indent, lineno, _ = lines[i]
+        if i + 1 >= len(lines) or lines[i + 1][0] <= indent:
+            raise ScriptError(self.name, lineno, "expected an indented block")
+        return lines[i + 1][0]
+
+    def block(self, lines: List[Tuple[int, int, str]], i: int, indent: int) -> int:
+        while i < len(lines):
+            line_indent, lineno, _ = lines[i]
+            if line_indent < indent:
+                break
+            if line_indent > indent:
+                raise ScriptError(self.name, lineno, "unexpected indent")
+            i = self.statement(lines, i, indent)
+        return i
+
+    # ----- Statements -----
+    def statement(self, lines: List[Tuple[int, int, str]], i: int, indent: int) -> int:
+        _, lineno, text = lines[i]
+        keyword = text.split(None, 1)[0].rstrip(":")
+
+        if text.startswith('"') or (keyword not in _KEYWORDS and _SAY_RE.match(text)):
+            match = _SAY_RE.match(text)
+            if not match:
+                raise ScriptError(self.name, lineno, "unterminated or malformed say statement")
+            speaker, literal = match.groups()
+            speaker_index = self.const(self.defines.get(speaker, speaker)) if speaker else NO_OPERAND
+            self.emit(lineno, SAY, speaker_index, self.const(self.string(literal, lineno)))
+            return i + 1
+        if text.startswith("$"):
+            match = _SET_RE.match(text)
+            if not match:
+                raise ScriptError(self.name, lineno, "expected: $ name = expression")
+            name, op, source = match.groups()
+            if op != "=":
+                source = f"{name} {op[0]} ({source})"
+            self.emit(lineno, SET, self.const(name), self.expr(source, lineno))
+            return i + 1
+        if keyword == "menu":
+            return self.menu(lines, i)
+        if keyword == "if":
+            return self.if_chain(lines, i, indent)
+        if keyword == "show":
+            # show name [attribute ...]; the image's tag is its first word
+            parts = text.split()
+            if len(parts) < 2 or not all(_NAME_RE.match(part) for part in parts[1:]):
+                raise ScriptError(self.name, lineno, "expected: show name [attribute ...]")
+            self.emit(lineno, SHOW, self.const(" ".join(parts[1:])))
+            return i + 1
+        if keyword in ("jump", "call", "scene", "hide"):
+            parts = text.split()
+            if len(parts) != 2 or not _NAME_RE.match(parts[1]):
+                raise ScriptError(self.name, lineno, f"expected: {keyword} name")
+            op = {"jump": GOTO, "call": CALL, "scene": SCENE, "hide": HIDE}[keyword]
+            self.emit(lineno, op, self.const(parts[1]))
+            return i + 1
+        if text == "return":
+            self.emit(lineno, RETURN)
+            return i + 1
+        if text == "pass":
+            return i + 1
+        if keyword in ("elif", "else"):
+            raise ScriptError(self.name, lineno, f"'{keyword}' without a matching 'if'")
+        raise ScriptError(self.name, lineno, f"unknown statement '{text}'")
+
+    def menu(self, lines: List[Tuple[int, int, str]], i: int) -> int:
+        _, lineno, text = lines[i]
+        if text != "menu:":
+            raise ScriptError(self.name, lineno, "expected: menu:")
+        choice_indent = self.child_indent(lines, i)
+
+        # Gather the choices first: their CHOICE instructions sit together
+        # right after MENU, ahead of the bodies they jump to
+        choices = []
+        i += 1
+        while i < len(lines) and lines[i][0] >= choice_indent:
+            line_indent, choice_line, choice_text = lines[i]
+            if line_indent > choice_indent:
+                raise ScriptError(self.name, choice_line, "unexpected indent")
+            match = _CHOICE_RE.match(choice_text)
+            if not match:
+                raise ScriptError(self.name, choice_line, 'expected: "Choice text" [if condition]:')
+            body_start = i + 1
+            body_indent = self.child_indent(lines, i)
+            i = body_start
+            while i < len(lines) and lines[i][0] >= body_indent:
+                i += 1
+            choices.append((choice_line, match.group(1), match.group(2), body_start, body_indent))
+        end = i
+
+        menu_pc = self.emit(lineno, MENU, len(choices))
+        choice_pcs = []
+        for choice_line, literal, condition, _, _ in choices:
+            condition_index = self.expr(condition, choice_line) if condition else NO_OPERAND
+            choice_pcs.append(self.emit(choice_line, CHOICE, self.const(self.string(literal, choice_line)), condition_index))
+
+        exits = []
+        for choice_pc, (_, _, _, body_start, body_indent) in zip(choice_pcs, choices):
+            self.patch(choice_pc, 3, self.pc)
+            self.block(lines, body_start, body_indent)
+            exits.append(self.emit(lines[body_start][1], JUMP))
+        for exit_pc in exits:
+            self.patch(exit_pc, 1, self.pc)
+        # Where to continue if no choice's condition holds
+        self.patch(menu_pc, 2, self.pc)
+        return end
+
+    def if_chain(self, lines: List[Tuple[int, int, str]], i: int, indent: int) -> int:
+        exits = []
+        while True:
+            _, lineno, text = lines[i]
+            keyword = text.split(None, 1)[0].rstrip(":")
+            if not text.endswith(":"):
+                raise ScriptError(self.name, lineno, f"expected ':' after {keyword}")
+            body_indent = self.child_indent(lines, i)
+            if keyword == "else":
+                i = self.block(lines, i + 1, body_indent)
+                break
+            condition = text[len(keyword):-1].strip()
+            branch = self.emit(lineno, JUMP_IF_NOT, self.expr(condition, lineno))
+            i = self.block(lines, i + 1, body_indent)
+            if i < len(lines) and lines[i][0] == indent and lines[i][2].split(None, 1)[0].rstrip(":") in ("elif", "else"):
+                exits.append(self.emit(lineno, JUMP))
+                self.patch(branch, 2, self.pc)
+                continue
+            self.patch(branch, 2, self.pc)
+            break
+        for exit_pc in exits:
+            self.patch(exit_pc, 1, self.pc)
+        return i
+
+
+_KEYWORDS = {"menu", "if", "elif", "else", "jump", "call", "return", "pass", "scene", "show", "hide", "label", "define"}
+
+
+def compile_source(source: str, name: str = "<script>") -> CompiledScript:
+    """Compile script text. Raises ScriptError on bad syntax."""
+    return _Compiler(name).compile(_logical_lines(source))
+
+
+def compile_file(path: str) -> CompiledScript:
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_source(f.read(), path)
+
+
+def load_script(path: str, cache_dir: str = SCRIPT_CACHE_DIR) -> CompiledScript:
+    """
+    Load a script, using the bytecode cache when the source's content hash
+    has been compiled before. Fresh compilations are written back to the
+    cache atomically, so a crash never leaves a truncated entry.
+    """
+    from engine.resource_manager import hash_file
+
+    cached_path = os.path.join(cache_dir, hash_file(path) + CACHE_SUFFIX)
+    try:
+        with open(cached_path, "rb") as f:
+            script = CompiledScript.from_bytes(f.read(), path)
+        if script is not None:
+            return script
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable script cache '{cached_path}': {e}")
+
+    script = compile_file(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(script.to_bytes())
+        os.replace(temp_path, cached_path)
+    except OSError as e:
+        logging.warning(f"Could not cache compiled script '{path}': {e}")
+    return script
+
+
+def scan_labels(path: str) -> List[str]:
+    """Labels defined in a script file, found with one regex pass instead of a compile."""
+    with open(path, "rb") as f:
+        return [match.group(1).decode() for match in _LABEL_SCAN_RE.finditer(f.read())]
+
+
+def linked_labels(script: CompiledScript) -> List[str]:
+    """Labels a script jumps to or calls, in order of first use."""
+    code = script.code
+    names = (script.consts[a] for op, a in zip(code[0::INSTRUCTION_WIDTH], code[1::INSTRUCTION_WIDTH])
+             if op == GOTO or op == CALL)
+    return list(dict.fromkeys(names))
+
+
+def find_scripts(script_dir: str = SCRIPT_DIR) -> List[str]:
+    """Every script file under `script_dir`, in a stable order."""
+    paths = []
+    for root, _, files in os.walk(script_dir):
+        paths.extend(os.path.join(root, f) for f in files if f.endswith(SCRIPT_EXTENSION))
+    return sorted(paths)
+
+
+def disassemble(script: CompiledScript) -> str:
+    """Human-readable listing of a compiled script."""
+    label_at = {pc: name for name, pc in script.labels.items()}
+    lines = []
+    for pc in range(len(script)):
+        op, a, b, c = script.fetch(pc)
+        if pc in label_at:
+            lines.append(f"{label_at[pc]}:")
+        consts = script.consts
+        if op == SAY:
+            args = [repr(consts[a]) if a != NO_OPERAND else "(narrator)", repr(consts[b])]
+        elif op == CHOICE:
+            args = [repr(consts[a]), f"if expr#{b}" if b != NO_OPERAND else "", f"-> {c}"]
+        elif op == SET:
+            args = [consts[a], f"= expr#{b}"]
+        elif op in (GOTO, CALL, SCENE, SHOW, HIDE):
+            args = [consts[a]]
+        elif op == MENU:
+            args = [str(a), f"else -> {b}"]
+        elif op == JUMP:
+            args = [f"-> {a}"]
+        elif op == JUMP_IF_NOT:
+            args = [f"expr#{a}", f"-> {b}"]
+        else:
+            args = []
+        lines.append(f"  {pc:6d}  line {script.lineno(pc):<6d} {OPCODE_NAMES[op]:<12} {' '.join(a for a in args if a)}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile dialogue scripts into the bytecode cache.")
+    parser.add_argument("paths", nargs="*", help=f"script files (default: every {SCRIPT_EXTENSION} under {SCRIPT_DIR})")
+    parser.add_argument("--cache", default=SCRIPT_CACHE_DIR, help="bytecode cache directory")
+    parser.add_argument("--dis", action="store_true", help="print a disassembly of each script")
+    args = parser.parse_args()
+
+    for path in args.paths or find_scripts():
+        start = time.perf_counter()
+        script = load_script(path, args.cache)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"{path}: {len(script)} instructions, {len(script.labels)} labels, "
+              f"{script.nbytes() / 1024:.1f} KB in {elapsed_ms:.1f} ms")
+        if args.dis:
+            print(disassemble(script))
+
+
+if __name__ == "__main__":
+    main()
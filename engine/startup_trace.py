@@ -0,0 +1,61 @@
+"""Startup timing: nested import/init phases from launch to the first frame."""
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from config import TRACE_STARTUP
+
+
+class StartupTracer:
+    """
+    Records how long each startup phase takes and prints a report when the
+    first frame is shown. Phases nest, so the report reads as a tree.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        # [depth, name, start offset ms, duration ms]
+        self.records: List[list] = []
+        self.first_frame_ms: Optional[float] = None
+        self._depth = 0
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one startup phase."""
+        if not self.enabled or self.first_frame_ms is not None:
+            yield
+            return
+
+        record = [self._depth, name, self._now_ms(), 0.0]
+        self.records.append(record)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record[3] = self._now_ms() - record[2]
+
+    def first_frame(self) -> None:
+        """Mark the first frame as presented; prints the report once."""
+        if self.first_frame_ms is not None:
+            return
+        self.first_frame_ms = self._now_ms()
+        if self.enabled:
+            print(self.report())
+
+    def report(self) -> str:
+        """A tree of phases with their durations and start offsets."""
+        lines = ["Startup trace (ms):"]
+        for depth, name, start, duration in self.records:
+            lines.append(f"  {duration:8.1f}  @{start:8.1f}  {'  ' * depth}{name}")
+        if self.first_frame_ms is not None:
+            lines.append(f"  time to first frame: {self.first_frame_ms:.1f} ms")
+        return "\n".join(lines)
+
+
+# Create a global instance for easy access
+startup_tracer = StartupTracer(TRACE_STARTUP)
@@ -1,12 +1,18 @@
 """Main game class."""
-import pygame
 import sys
-from screens.menu_system import MenuBaseStateController, MenuConfig
-from engine.music import MusicManager
+from engine.startup_trace import startup_tracer
+
+with startup_tracer.phase("import pygame"):
+    import pygame
+with startup_tracer.phase("import screens.menu_system"):
+    from screens.menu_system import MenuBaseStateController, MenuConfig
+from engine.music import MusicManager, SettingsManager, init_mixer
+from engine.resource_manager import resource_manager
 from config import (
     SCREEN_WIDTH,
     SCREEN_HEIGHT,
     GAME_TITLE,
+    DEFAULT_AUDIO_PROFILE,
 )
 
 class Game:
@@ -19,19 +25,29 @@ class Game:
     def run_main_menu(self):
         """Run the main menu game loop."""
         try:
-            pygame.init()
-            pygame.mixer.init()
-
-            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
-            pygame.display.set_caption(GAME_TITLE)
+            # Only start the pygame modules the menus use, rather than
+            # pygame.init() bringing up every module (joystick, camera, ...)
+            with startup_tracer.phase("init display + font"):
+                pygame.display.init()
+                pygame.font.init()
+            # The mixer's buffer size is fixed at init, so the saved audio
+            # profile has to be read first
+            with startup_tracer.phase("init mixer"):
+                settings_manager = SettingsManager()
+                init_mixer(settings_manager.get_setting("audio_profile", DEFAULT_AUDIO_PROFILE))
 
+            with startup_tracer.phase("create window"):
+                self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+                pygame.display.set_caption(GAME_TITLE)
 
             # Create required dependencies
-            music_manager = MusicManager()
-            config = MenuConfig(music_manager)
+            with startup_tracer.phase("create MusicManager"):
+                music_manager = MusicManager(settings_manager)
+                config = MenuConfig(music_manager)
             
             # Create and run the main menu with proper configuration
-            menu = MenuBaseStateController(config)
+            with startup_tracer.phase("create menu controller"):
+                menu = MenuBaseStateController(config)
             menu.run()
             
             # If we return from the menu and quit was selected
@@ -48,5 +64,13 @@ class Game:
         """Clean up and quit the game."""
         print("Exiting game. Cleaning up and shutting down...")
         self.running = False
+        resource_manager.shutdown()
+        from engine.dialogue import script_library
+        script_library.shutdown()
+        from engine.animation import animation_cache
+        animation_cache.shutdown()
+        # Waits for saves still being written
+        from engine.save_system import save_manager
+        save_manager.shutdown()
         pygame.quit()
         sys.exit(0)  # Use 0 to indicate normal exit
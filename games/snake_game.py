@@ -1,7 +1,17 @@
 """Snake game implementation."""
+import math
 import pygame
 import random
-from typing import List, Tuple, Optional
+import time
+from array import array
+from typing import Any, Dict, List, Tuple, Optional
+
+from engine.particles import ParticleSystem
+from engine.save_system import SNAKE_SAVE, save_manager
+from ui.glyph_atlas import GlyphAtlas
+
+# Frame rate while particles are flying; the snake still moves at its own speed
+EFFECT_FPS = 60
 
 class SnakeGame:
     """
@@ -41,10 +51,19 @@ class SnakeGame:
         self.escape_overlay = False  # New state for escape overlay
         self.score = 0
         self.high_score = 0
+        self.status_text = ""
+        self.status_until = 0.0
         
         # Init font
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        # Score labels change often; draw them from glyph atlases
+        self.score_atlas = GlyphAtlas(self.font, self.WHITE)
+        self.small_atlas = GlyphAtlas(self.small_font, self.WHITE)
+        
+        # Food bursts
+        self.particles = ParticleSystem()
+        self.burst_sprite = self.particles.sprite_id((255, 90, 40), 3)
         
         # Overlay buttons
         self.overlay_buttons = []
@@ -71,9 +90,19 @@ class SnakeGame:
             'hovered': False
         }
         
+        # Save button
+        self.save_button = {
+            'rect': pygame.Rect(center_x - button_width//2, center_y, button_width, button_height),
+            'text': "Save Game",
+            'action': self.save_game,
+            'color': (200, 160, 60),
+            'hover_color': (255, 210, 110),
+            'hovered': False
+        }
+        
         # Main Menu button
         self.menu_button = {
-            'rect': pygame.Rect(center_x - button_width//2, center_y, button_width, button_height),
+            'rect': pygame.Rect(center_x - button_width//2, center_y + 60, button_width, button_height),
             'text': "Return to Main Menu",
             'action': self.return_to_menu,
             'color': (100, 200, 100),
@@ -83,7 +112,7 @@ class SnakeGame:
         
         # Quit button
         self.quit_button = {
-            'rect': pygame.Rect(center_x - button_width//2, center_y + 60, button_width, button_height),
+            'rect': pygame.Rect(center_x - button_width//2, center_y + 120, button_width, button_height),
             'text': "Quit Game",
             'action': self.quit_game,
             'color': (200, 100, 100),
@@ -91,7 +120,7 @@ class SnakeGame:
             'hovered': False
         }
         
-        self.overlay_buttons = [self.resume_button, self.menu_button, self.quit_button]
+        self.overlay_buttons = [self.resume_button, self.save_button, self.menu_button, self.quit_button]
     
     def initialize_game(self):
         """Set up the initial game state."""
@@ -177,6 +206,45 @@ class SnakeGame:
         self.paused = False
         return False  # Don't exit to menu
     
+    def save_game(self) -> bool:
+        """Save to a new slot; the file is written in the background"""
+        # Thumbnail the board, not the pause messages in front of it
+        self.paused = self.escape_overlay = False
+        self.draw()
+        self.paused = self.escape_overlay = True
+        slot = save_manager.save(SNAKE_SAVE, self.snapshot(), f"Snake - score {self.score}", screenshot=self.screen)
+        self.status_text = f"Saved to slot {slot}"
+        self.status_until = time.perf_counter() + 2.0
+        return False  # Stay in the overlay
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The game as plain data for a save. The body is packed as 16-bit grid coordinates."""
+        return {
+            "grid": (self.grid_width, self.grid_height),
+            "snake": array("H", [coord for cell in self.snake for coord in cell]).tobytes(),
+            "direction": self.direction,
+            "food": self.food,
+            "score": self.score,
+            "high_score": self.high_score,
+            "speed": self.speed,
+            "game_over": self.game_over,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Continue a saved game, paused. Cells outside a smaller window wrap around."""
+        coords = array("H")
+        coords.frombytes(state["snake"])
+        self.snake = [(x % self.grid_width, y % self.grid_height) for x, y in zip(coords[0::2], coords[1::2])]
+        self.direction = self.next_direction = tuple(state["direction"])
+        food_x, food_y = state["food"]
+        self.food = (food_x % self.grid_width, food_y % self.grid_height)
+        self.score = state["score"]
+        self.high_score = max(self.high_score, state["high_score"])
+        self.speed = state["speed"]
+        self.game_over = state["game_over"]
+        self.paused = True
+        self.escape_overlay = False
+
     def return_to_menu(self) -> bool:
         """Return to the main menu"""
         return True  # Exit to menu
@@ -219,12 +287,19 @@ class SnakeGame:
             # Increase speed every 5 points
             if self.score % 5 == 0:
                 self.speed = min(20, self.speed + 1)
+            self.burst(self.food)
             # Place new food
             self.food = self.place_food()
         else:
             # Remove tail
             self.snake.pop()
     
+    def burst(self, cell: Tuple[int, int]):
+        """Scatter sparks from a grid cell, e.g. where food was eaten."""
+        center = ((cell[0] + 0.5) * self.cell_size, (cell[1] + 0.5) * self.cell_size)
+        self.particles.emit(40, self.burst_sprite, center=center, speed=(60, 260), life=(0.3, 0.8),
+                            acceleration=(0, 400))
+    
     def draw_cell(self, x: int, y: int, color: Tuple[int, int, int]):
         """Draw a cell at the given grid coordinates."""
         pygame.draw.rect(
@@ -277,6 +352,12 @@ class SnakeGame:
             btn_text = self.font.render(button['text'], True, self.WHITE)
             text_rect = btn_text.get_rect(center=button['rect'].center)
             self.screen.blit(btn_text, text_rect)
+
+        # Confirmation after saving
+        if self.status_text and time.perf_counter() < self.status_until:
+            status_text = self.small_font.render(self.status_text, True, self.WHITE)
+            status_rect = status_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 - 90))
+            self.screen.blit(status_text, status_rect)
     
     def draw(self):
         """Render the game state."""
@@ -316,14 +397,13 @@ class SnakeGame:
         # Draw food
         food_x, food_y = self.food
         self.draw_cell(food_x, food_y, self.RED)
+        self.particles.draw(self.screen)
         
         # Draw score
-        score_text = self.font.render(f"Score: {self.score}", True, self.WHITE)
-        self.screen.blit(score_text, (10, 10))
+        self.score_atlas.draw(self.screen, str(self.score), (10, 10), label="Score: ")
         
         # Draw high score
-        high_score_text = self.small_font.render(f"High Score: {self.high_score}", True, self.WHITE)
-        self.screen.blit(high_score_text, (10, 50))
+        self.small_atlas.draw(self.screen, str(self.high_score), (10, 50), label="High Score: ")
         
         # Game state messages
         if self.game_over and not self.escape_overlay:
@@ -349,14 +429,21 @@ class SnakeGame:
         Run the snake game loop.
         Returns True if the game should transition back to the menu.
         """
+        next_step = last_frame = time.perf_counter()
         while self.running:
             # Handle events
             exit_to_menu = self.handle_events()
             if exit_to_menu or not self.running:
                 return True
                 
-            # Update game state
-            self.update()
+            # Update game state `speed` times a second; frames between steps only move particles
+            now = time.perf_counter()
+            if now >= next_step:
+                self.update()
+                # Stay on the beat, unless a stall left it more than a step behind
+                next_step = max(next_step + 1.0 / self.speed, now)
+            self.particles.update(now - last_frame)
+            last_frame = now
             
             # Draw everything
             self.draw()
@@ -364,7 +451,9 @@ class SnakeGame:
             # Update display
             pygame.display.flip()
             
-            # Cap frame rate based on current speed
-            self.clock.tick(self.speed)
+            # Sleep until the next step, waking for every effect frame while particles fly
+            wake = min(next_step, now + 1.0 / EFFECT_FPS) if self.particles.count else next_step
+            self.clock.tick()
+            pygame.time.wait(max(0, math.ceil((wake - time.perf_counter()) * 1000)))
             
         return True
@@ -1,5 +1,8 @@
 """Main entry point for the game."""
-from game import Game
+from engine.startup_trace import startup_tracer
+
+with startup_tracer.phase("import game"):
+    from game import Game
 import sys
 
 def main():
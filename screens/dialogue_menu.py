@@ -0,0 +1,292 @@
+# dialogue_menu.py
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import pygame
+
+from screens.menu_system import AbstractMenuBase
+from ui.builders.button_builder import ButtonBuilder
+from ui.components.button import Button
+from ui.layout import LayoutNode, VStack
+from ui.scene import ButtonNode, ImageNode, SceneNode, TextNode
+from ui.typewriter import TypewriterText
+from engine.dialogue import DialogueRunner, script_library
+from engine.image_predictor import COVER, FIT_HEIGHT, ImageKey, ImagePredictor
+from engine.layered_image import PortraitCompositor, character_library
+from engine.save_system import DIALOGUE_SAVE, save_manager
+from engine.script_compiler import SCENE, ScriptError
+
+from config import CLICK_SOUND_PATH, HOVER_SOUND_PATH, HOVER_TEXT_COLOR, SCRIPT_IMAGE_LOOKAHEAD, TEXT_COLOR
+
+DIALOGUE_BOX_HEIGHT = 160
+DIALOGUE_BOX_MARGIN = 40
+DIALOGUE_BOX_COLOR = (0, 0, 0, 180)
+PORTRAIT_MAX_HEIGHT = 0.6  # Fraction of the screen height
+
+
+class DialogueAbstractMenuBase(AbstractMenuBase):
+    """
+    Dialogue state: plays the story script with a dialogue box for lines,
+    buttons for menu choices, and the script's scene/show images behind.
+    Lines are typed out; click, SPACE or ENTER shows the rest of the line,
+    then advances. Number keys pick a choice; PAGE UP or the mouse wheel
+    rolls back to earlier lines; F5 saves to a new slot; ESC returns to
+    the main menu.
+    """
+    prefetch_assets = [CLICK_SOUND_PATH, HOVER_SOUND_PATH]
+    prefetch_states = ["main"]
+
+    def __init__(self, menu_manager):
+        self.runner = DialogueRunner(script_library)
+        self.choice_buttons: List[Button] = []
+        self.images = ImagePredictor()
+        self.portraits = PortraitCompositor(character_library)
+        self.typewriter = TypewriterText(menu_manager.base_menu.small_font, TEXT_COLOR)
+        self.shown_background: Optional[str] = None
+        self.shown_portraits: List[str] = []
+        super().__init__(menu_manager)
+
+        try:
+            self.runner.start()
+        except ScriptError as e:
+            self.show_error(e)
+        self.show_current()
+
+    def create_buttons(self) -> None:
+        """Choice buttons are created per menu; stack them around the screen centre"""
+        self.choice_stack = self.layout.add(VStack(spacing=15, anchor="center", pivot="center", offset=(0, -60)))
+
+    def build_scene(self) -> None:
+        """Background, portraits, dialogue box and choices, back to front"""
+        self.background_node = self.scene.add(ImageNode(pygame.Surface((1, 1)), z=0))
+        self.background_node.set_visible(False)
+        self.portrait_layer = self.scene.add(SceneNode(z=1))
+        self.box_node = self.scene.add(ImageNode(pygame.Surface((1, 1), pygame.SRCALPHA), z=2))
+        self.speaker_node = self.scene.add(TextNode("", self.button_font, HOVER_TEXT_COLOR, z=3))
+        self.body_node = self.scene.add(ImageNode(pygame.Surface((1, 1), pygame.SRCALPHA), z=3))
+        self.choice_layer = self.scene.add(SceneNode(z=4))
+        self.place_dialogue_box()
+
+    # ----- Layout -----
+    def box_rect(self) -> pygame.Rect:
+        # Leave the bottom strip for the footer instructions
+        return pygame.Rect(
+            DIALOGUE_BOX_MARGIN,
+            self.screen_height - DIALOGUE_BOX_HEIGHT - 60,
+            self.screen_width - DIALOGUE_BOX_MARGIN * 2,
+            DIALOGUE_BOX_HEIGHT,
+        )
+
+    def place_dialogue_box(self) -> None:
+        box = self.box_rect()
+        panel = pygame.Surface(box.size, pygame.SRCALPHA)
+        pygame.draw.rect(panel, DIALOGUE_BOX_COLOR, panel.get_rect(), border_radius=10)
+        self.box_node.set_image(panel)
+        self.box_node.set_position(box.topleft)
+        self.speaker_node.set_position((box.x + 20, box.y + 12))
+        self.body_node.set_position((box.x + 20, box.y + 50))
+
+    def on_resize(self) -> None:
+        super().on_resize()
+        self.place_dialogue_box()
+        self.images.clear()
+        self.portraits.clear()
+        self.shown_background = None
+        self.shown_portraits = []
+        self.show_current()
+
+    # ----- Images -----
+    def background_key(self, name: str) -> ImageKey:
+        return (name, COVER, (self.screen_width, self.screen_height))
+
+    def portrait_key(self, name: str) -> ImageKey:
+        return (name, FIT_HEIGHT, (0, int(self.screen_height * PORTRAIT_MAX_HEIGHT)))
+
+    def portrait(self, image: str) -> Optional[pygame.Surface]:
+        """A shown image: a layered character composited from its attributes, or a plain image."""
+        tag, *attributes = image.split()
+        if character_library.get(tag):
+            return self.portraits.get(tag, attributes, int(self.screen_height * PORTRAIT_MAX_HEIGHT))
+        return self.images.get(self.portrait_key(tag))
+
+    def show_images(self) -> None:
+        runner = self.runner
+        if runner.background != self.shown_background:
+            self.shown_background = runner.background
+            background = self.images.get(self.background_key(runner.background)) if runner.background else None
+            if background:
+                self.background_node.set_image(background)
+                self.background_node.set_position(background.get_rect(center=self.screen.get_rect().center).topleft)
+            self.background_node.set_visible(background is not None)
+
+        if runner.shown != self.shown_portraits:
+            self.shown_portraits = list(runner.shown)
+            self.portrait_layer.clear()
+            portraits = [image for image in map(self.portrait, runner.shown) if image]
+            x = (self.screen_width - sum(p.get_width() for p in portraits)) // 2
+            bottom = self.box_rect().top
+            for portrait in portraits:
+                self.portrait_layer.add(ImageNode(portrait, (x, bottom - portrait.get_height())))
+                x += portrait.get_width()
+
+        tags = [image.split()[0] for image in runner.shown]
+        on_screen = [self.portrait_key(tag) for tag in tags if not character_library.get(tag)]
+        if runner.background:
+            on_screen.append(self.background_key(runner.background))
+        self.images.pin(on_screen)
+
+    def predict_images(self) -> None:
+        """Start loading what the next statements, on every branch, may show."""
+        keys = []
+        for op, name in self.runner.upcoming_images(SCRIPT_IMAGE_LOOKAHEAD):
+            tag = name.split()[0]
+            if op == SCENE:
+                keys.append(self.background_key(name))
+            elif character_library.get(tag):
+                character_library.prefetch(tag)
+            else:
+                keys.append(self.portrait_key(tag))
+        self.images.predict(keys)
+
+    def update(self) -> bool:
+        loading = self.images.pump()
+        for area in self.typewriter.update():
+            self.body_node.damage_image(area)
+        return loading or not self.typewriter.done
+
+    # ----- Story -----
+    def show_current(self) -> None:
+        """Bring the scene in line with the runner's current line or menu."""
+        runner = self.runner
+        self.show_images()
+        self.speaker_node.set_text(runner.speaker or "")
+        self.set_body(runner.text or "")
+        if runner.choices and not self.choice_buttons:
+            self.create_choice_buttons()
+        self.predict_images()
+
+    def set_body(self, text: str) -> None:
+        previous = self.typewriter.surface
+        self.typewriter.set_text(text, self.box_rect().width - 40)
+        if self.typewriter.surface is not previous:
+            self.body_node.set_image(self.typewriter.surface)
+
+    def show_error(self, error: Exception) -> None:
+        logging.error(f"Dialogue script error: {error}")
+        self.runner.choices = []
+        self.runner.finished = True
+        self.runner.speaker = "Script error"
+        self.runner.text = str(error)
+
+    def create_choice_buttons(self) -> None:
+        base_menu = self.menu_manager.base_menu
+        for index, (text, _) in enumerate(self.runner.choices):
+            builder = (
+                ButtonBuilder.default_button(self.screen, self.button_font, text=text)
+                .set_size(500, 50)
+                .set_layout_node(self.choice_stack.add(LayoutNode()))
+                .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
+                .set_music_manager(base_menu.config.music_manager)
+                .set_on_click(lambda index=index: self.choose(index))
+            )
+            if index < 9:
+                builder.set_shortcut_key(pygame.K_1 + index)
+            self.choice_buttons.append(builder.build())
+        self.layout.update()
+        for button in self.choice_buttons:
+            self.choice_layer.add(ButtonNode(button))
+
+    def clear_choice_buttons(self) -> None:
+        self.choice_layer.clear()
+        for button in self.choice_buttons:
+            button.release_resources()
+        self.choice_buttons.clear()
+        for node in list(self.choice_stack.children):
+            self.choice_stack.remove(node)
+
+    def choose(self, index: int) -> None:
+        self.clear_choice_buttons()
+        try:
+            self.runner.choose(index)
+        except ScriptError as e:
+            self.show_error(e)
+        self.show_current()
+
+    def finish_line(self) -> None:
+        for area in self.typewriter.finish():
+            self.body_node.damage_image(area)
+
+    def advance(self) -> None:
+        if not self.typewriter.done:
+            self.finish_line()
+            return
+        if self.runner.finished:
+            self.menu_manager.transition_to("main")
+            return
+        try:
+            self.runner.advance()
+        except ScriptError as e:
+            self.show_error(e)
+        if self.runner.finished and not self.runner.text:
+            self.menu_manager.transition_to("main")
+            return
+        self.show_current()
+
+    def rollback(self) -> None:
+        """Step back one interaction; lines already read are shown whole."""
+        if not self.runner.rollback():
+            return
+        self.clear_choice_buttons()
+        self.show_current()
+        self.finish_line()
+
+    def save(self) -> None:
+        runner = self.runner
+        title = f"{runner.speaker}: {runner.text}" if runner.speaker else (runner.text or "")
+        slot = save_manager.save(DIALOGUE_SAVE, runner.state(), title[:60], screenshot=self.screen)
+        logging.info(f"Saved dialogue to slot {slot}")
+
+    def restore(self, state: Dict[Any, Any]) -> None:
+        """Continue from a saved `DialogueRunner.state()`."""
+        self.clear_choice_buttons()
+        try:
+            self.runner.restore(state)
+        except (ScriptError, OSError) as e:
+            self.show_error(e)
+        self.show_current()
+        self.finish_line()
+
+    def handle_events(self, event: pygame.event.Event) -> bool:
+        """Handle events for this state"""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.menu_manager.transition_to("main")
+            return True
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+            self.save()
+            return True
+
+        if (event.type == pygame.KEYDOWN and event.key == pygame.K_PAGEUP) or \
+                (event.type == pygame.MOUSEWHEEL and event.y > 0):
+            self.rollback()
+            return True
+
+        if self.choice_buttons:
+            for button in list(self.choice_buttons):
+                button.handle_event(event)
+                if not self.choice_buttons:
+                    break  # A choice was made; the remaining buttons are gone
+            return False
+
+        if (event.type == pygame.MOUSEBUTTONUP and event.button == 1) or \
+                (event.type == pygame.KEYDOWN and event.key in (pygame.K_SPACE, pygame.K_RETURN)):
+            self.advance()
+            return True
+        return False
+
+    def cleanup(self) -> None:
+        self.clear_choice_buttons()
+        self.images.shutdown()
+        character_library.release()
+        super().cleanup()
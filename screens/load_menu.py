@@ -0,0 +1,164 @@
+# load_menu.py
+
+import os
+import time
+import logging
+from typing import Any, Dict, Optional
+
+import pygame
+
+from screens.menu_system import AbstractMenuBase
+from ui.builders.button_builder import ButtonBuilder
+from ui.components.button import Button
+from ui.components.scroll_list import ScrollList
+from ui.layout import LayoutNode
+from ui.scene import TextNode
+from engine.image_predictor import FIT_HEIGHT, ImageKey, ImagePredictor
+from engine.save_system import DIALOGUE_SAVE, SNAKE_SAVE, SaveError, save_manager
+
+from config import CLICK_SOUND_PATH, HOVER_SOUND_PATH, SAVE_THUMBNAIL_CACHE, SAVE_THUMBNAIL_SIZE, TEXT_COLOR
+
+SLOT_LIST_WIDTH = 720
+SLOT_ROW_HEIGHT = SAVE_THUMBNAIL_SIZE[1] + 10
+SLOT_LIST_HEIGHT = 0.55  # Fraction of the screen height
+# Rows either side of the view whose thumbnails are decoded ahead of a scroll
+THUMBNAIL_LOOKAHEAD = 3
+PLACEHOLDER_COLOR = (40, 40, 40)
+
+
+class LoadAbstractMenuBase(AbstractMenuBase):
+    """
+    Load Game state: every save slot, newest first, in a scrolling list
+    built from the save index without opening any save. Only the rows in
+    view exist, and only their thumbnails (and a few ahead) are decoded,
+    on a worker thread into a small LRU, so the screen opens at once
+    whatever the number of slots. Picking a slot resumes it.
+    """
+    title = "Load Game"
+    prefetch_assets = [CLICK_SOUND_PATH, HOVER_SOUND_PATH]
+    prefetch_states = ["main", "dialogue"]
+
+    def __init__(self, menu_manager):
+        self.slots = save_manager.listing()
+        self.thumbnails = ImagePredictor(save_manager.thumbnail_dir, budget=SAVE_THUMBNAIL_CACHE, max_workers=1)
+        self.placeholder = pygame.Surface(SAVE_THUMBNAIL_SIZE)
+        self.placeholder.fill(PLACEHOLDER_COLOR)
+        self._predicted: Optional[range] = None
+        self._thumbnails_loaded = 0
+        super().__init__(menu_manager)
+
+    def create_buttons(self) -> None:
+        """The slot list, then Back"""
+        base_menu = self.menu_manager.base_menu
+        config = base_menu.config
+
+        list_node = self.layout.add(
+            LayoutNode(SLOT_LIST_WIDTH, SLOT_LIST_HEIGHT, anchor="top", pivot="top", offset=(0, 190))
+        )
+        self.slot_list = ScrollList(
+            self.screen, list_node.resolve(), len(self.slots), SLOT_ROW_HEIGHT,
+            self.create_row, self.bind_row, spacing=8,
+        )
+        list_node.bind(self.slot_list)
+
+        back_btn = (
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Back to Main Menu")
+            .set_size(250, 50)
+            .set_layout_node(self.layout.add(LayoutNode(anchor="bottom", pivot="bottom", offset=(0, -60))))
+            .set_hover_text("⬅ Main Menu")
+            .set_tooltip("Return to main menu")
+            .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
+            .set_music_manager(config.music_manager)
+            .build()
+        )
+        back_btn.on_click = lambda: self.menu_manager.transition_to("main")
+        self.buttons = [self.slot_list, back_btn]
+
+    def build_scene(self) -> None:
+        super().build_scene()
+        message = "" if self.slots else "No saved games yet"
+        message_anchor = self.layout.add(LayoutNode(anchor="top", pivot="top", offset=(0, 160)))
+        self.message = self.scene.add(TextNode(message, self.small_font, TEXT_COLOR, layout_node=message_anchor))
+
+    # ----- Slot rows -----
+    def create_row(self) -> Button:
+        base_menu = self.menu_manager.base_menu
+        return (
+            ButtonBuilder.default_button(self.screen, self.small_font, text="")
+            .set_size(SLOT_LIST_WIDTH, SLOT_ROW_HEIGHT)
+            .set_text_align("left")
+            .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
+            .set_music_manager(base_menu.config.music_manager)
+            .build()
+        )
+
+    def bind_row(self, row: Button, index: int) -> None:
+        slot, meta = self.slots[index]
+        saved_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(meta.get("saved_at", 0)))
+        text = f"{meta.get('title') or 'Untitled'}\nSlot {slot}, saved {saved_at}"
+        row.set_text(text)
+        row.set_hover_text(text)
+        row.icon = self.thumbnail(meta)
+        row.on_click = lambda slot=slot: self.load_slot(slot)
+
+    def thumbnail_key(self, meta: Dict[str, Any]) -> Optional[ImageKey]:
+        if "thumbnail" not in meta:
+            return None
+        return (os.path.splitext(meta["thumbnail"])[0], FIT_HEIGHT, (0, SAVE_THUMBNAIL_SIZE[1]))
+
+    def thumbnail(self, meta: Dict[str, Any]) -> pygame.Surface:
+        """The slot's thumbnail if it is decoded yet, otherwise a blank of the same size."""
+        key = self.thumbnail_key(meta)
+        return (self.thumbnails.peek(key) if key else None) or self.placeholder
+
+    def update(self) -> bool:
+        gliding = self.slot_list.update()
+
+        # Decode the thumbnails in view, then those a short scroll away
+        visible = self.slot_list.visible_range()
+        if visible != self._predicted:
+            self._predicted = visible
+            ahead = range(max(0, visible.start - THUMBNAIL_LOOKAHEAD),
+                          min(len(self.slots), visible.stop + THUMBNAIL_LOOKAHEAD))
+            nearest = sorted(ahead, key=lambda index: 0 if index in visible else 1)
+            keys = (self.thumbnail_key(self.slots[index][1]) for index in nearest)
+            self.thumbnails.predict(key for key in keys if key)
+
+        loading = self.thumbnails.pump()
+        if self.thumbnails.stats["loaded"] != self._thumbnails_loaded:
+            self._thumbnails_loaded = self.thumbnails.stats["loaded"]
+            for index, row in self.slot_list.rows.items():
+                row.icon = self.thumbnail(self.slots[index][1])
+        return gliding or loading
+
+    # ----- Loading -----
+    def load_slot(self, slot: int) -> None:
+        """Resume a save in the state it belongs to."""
+        try:
+            meta, state = save_manager.load(slot)
+            if meta.get("kind") not in (SNAKE_SAVE, DIALOGUE_SAVE):
+                raise SaveError(f"unknown kind of save '{meta.get('kind')}'")
+        except SaveError as e:
+            logging.error(f"Could not load save slot {slot}: {e}")
+            self.message.set_text(f"Slot {slot} could not be loaded")
+            return
+
+        if meta["kind"] == SNAKE_SAVE:
+            # The game takes over the display at once, so there is nothing to animate
+            self.menu_manager.transition_to("main", transition="")
+            self.menu_manager.current_state.start_snake_game(state)
+        else:
+            self.menu_manager.transition_to("dialogue")
+            self.menu_manager.current_state.restore(state)
+
+    def handle_events(self, event: pygame.event.Event) -> bool:
+        """Handle events for this state"""
+        for widget in list(self.buttons):
+            widget.handle_event(event)
+            if self.menu_manager.current_state is not self:
+                break  # A save was loaded; this state is gone
+        return False
+
+    def cleanup(self) -> None:
+        self.thumbnails.shutdown()
+        super().cleanup()
@@ -1,26 +1,24 @@
 # main_menu.py
 
 import logging
+from typing import Any, Dict, Optional
+
 import pygame
 
-from screens.menu_system import AbstractMenuBase, MenuManager
+from screens.menu_system import AbstractMenuBase
 from ui.builders.button_builder import ButtonBuilder
+from ui.layout import LayoutNode, VStack
 
-# Import the Snake game
-from games.snake_game import SnakeGame
-
-# Constants from menu_system
-TEXT_COLOR = (220, 220, 220)
-HOVER_TEXT_COLOR = (255, 255, 0)
+from config import CLICK_SOUND_PATH, HOVER_SOUND_PATH
 
 
 class MainAbstractMenuBase(AbstractMenuBase):
     """
     Main menu state implementation
     """
-    def __init__(self, menu_manager: MenuManager):
-        super().__init__(menu_manager)
-        self.title = "Main Menu"
+    title = "Main Menu"
+    prefetch_assets = [CLICK_SOUND_PATH, HOVER_SOUND_PATH]
+    prefetch_states = ["settings", "test", "load"]
 
     def create_buttons(self) -> None:
         """Create main menu buttons"""
@@ -32,46 +30,46 @@ class MainAbstractMenuBase(AbstractMenuBase):
         button_height = 50
         button_spacing = 20
 
+        # Buttons stack downward from just above the screen centre
+        button_stack = self.layout.add(
+            VStack(spacing=button_spacing, anchor="center", pivot="top", offset=(0, -100))
+        )
+
         # Start Game button
         start_game_btn = (
-            ButtonBuilder(self.screen, self.button_font, text="Start Game")
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Start Game")
             .set_size(button_width - 75, button_height)
-            .set_offsets(0, -100)  # center horizontally, offset Y
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_hover_text("▶ Start Game ▶")
-            .set_hover_text_color(HOVER_TEXT_COLOR)
             .set_tooltip("Start a new game")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
-            .set_is_background_visible(False)
             .set_debug_hitbox(True)
             .set_music_manager(config.music_manager)
             .build()
         )
         start_game_btn.on_click = self.start_snake_game
 
-        # Load Game button (disabled)
+        # Load Game button
         load_game_btn = (
-            ButtonBuilder(self.screen, self.button_font, text="Load Game")
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Load Game")
             .set_size(button_width, button_height)
-            .set_offsets(0, -100 + button_height + button_spacing)
-            .set_hover_text("Load Game (Unavailable)")
-            .set_hover_text_color(HOVER_TEXT_COLOR)
+            .set_layout_node(button_stack.add(LayoutNode()))
+            .set_hover_text("📂 Load Game 📂")
             .set_tooltip("Load a saved game")
-            .set_is_background_visible(False)
+            .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
             .set_music_manager(config.music_manager)
-            .set_disabled(True)
             .build()
         )
+        load_game_btn.on_click = lambda: self.menu_manager.transition_to("load")
         
         # Settings button
         settings_btn = (
-            ButtonBuilder(self.screen, self.button_font, text="Settings")
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Settings")
             .set_size(button_width, button_height)
-            .set_offsets(0, -100 + (button_height + button_spacing) * 2)
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_hover_text("⚙ Settings ⚙")
-            .set_hover_text_color(HOVER_TEXT_COLOR)
             .set_tooltip("Game settings")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
-            .set_is_background_visible(False)
             .set_music_manager(config.music_manager)
             .build()
         )
@@ -79,14 +77,12 @@ class MainAbstractMenuBase(AbstractMenuBase):
         
         # Test Menu button
         test_btn = (
-            ButtonBuilder(self.screen, self.button_font, text="Test Menu")
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Test Menu")
             .set_size(button_width, button_height)
-            .set_offsets(0, -100 + (button_height + button_spacing) * 3)
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_hover_text("🧪 Test Menu 🧪")
-            .set_hover_text_color(HOVER_TEXT_COLOR)
             .set_tooltip("Test features")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
-            .set_is_background_visible(False)
             .set_music_manager(config.music_manager)
             .build()
         )
@@ -94,14 +90,13 @@ class MainAbstractMenuBase(AbstractMenuBase):
         
         # Quit button
         quit_btn = (
-            ButtonBuilder(self.screen, self.button_font, text="Quit")
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Quit")
             .set_size(button_width, button_height)
-            .set_offsets(0, -100 + (button_height + button_spacing) * 4)
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_hover_text("✖ Exit Game ✖")
             .set_hover_text_color((255, 100, 100))
             .set_tooltip("Exit the game")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
-            .set_is_background_visible(False)
             .set_music_manager(config.music_manager)
             .build()
         )
@@ -114,29 +109,21 @@ class MainAbstractMenuBase(AbstractMenuBase):
         for button in self.buttons:
             button.handle_event(event)
         return False
-            
-    def draw(self) -> None:
-        """Draw the main menu state"""
-        # Draw title
-        title_text = self.title_font.render(self.title, True, TEXT_COLOR)
-        self.screen.blit(
-            title_text,
-            (self.screen_width // 2 - title_text.get_width() // 2, 100)
-        )
-        
-        # Draw all buttons
-        for button in self.buttons:
-            button.draw()
-    
+
     def handle_quit(self) -> bool:
         """Handle quit button click"""
         self.menu_manager.base_menu.running = False
         return True
         
-    def start_snake_game(self) -> None:
-        """Start the Snake game when the Start Game button is clicked"""
+    def start_snake_game(self, state: Optional[Dict[str, Any]] = None) -> None:
+        """Start the Snake game when the Start Game button is clicked, or resume a saved one"""
+        # Imported on first use so the mini-game stays off the startup path
+        from games.snake_game import SnakeGame
+
         # Create an instance of the snake game
         snake_game = SnakeGame(self.screen, self.menu_manager.base_menu.clock)
+        if state is not None:
+            snake_game.restore(state)
         
         # Pause menu music if it's playing (optional)
         if self.menu_manager.base_menu.config.music_enabled:
@@ -144,6 +131,9 @@ class MainAbstractMenuBase(AbstractMenuBase):
             
         # Run the snake game
         result = snake_game.run()
+
+        # The game drew over the whole display; repaint the menu scene
+        self.menu_manager.base_menu.scene.invalidate()
         
         # Resume menu music if it was playing before (optional)
         if self.menu_manager.base_menu.config.music_enabled:
@@ -1,18 +1,33 @@
 """Menu system core — manages the main menu loop, background, and menu state transitions."""
 
 import os
+import math
+import time
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Type, Any
+from typing import Optional, Dict, List, Type, Any
 
 import pygame
 
 # === UI Components ===
 from ui.builders.button_builder import ButtonBuilder
+from ui.components.animated_sprite import AnimatedSprite
 from ui.components.button import Button
+from ui.components.scroll_list import ScrollList
+from ui.glyph_atlas import glyph_atlas
+from ui.layout import LayoutNode, LayoutRoot
+from ui.scene import (
+    AnimationNode, AtlasTextNode, ButtonNode, ParticleNode, Scene, SceneNode, ScrollListNode, SliderNode, TextNode,
+)
+from ui.transition import ScreenTransition
+from ui.tween import tween_scheduler
 
 # === Engine ===
+from engine.image_predictor import scale_to_cover
 from engine.music import MusicManager
+from engine.particles import ParticleSystem
+from engine.resource_manager import AssetHandle, resource_manager
+from engine.startup_trace import startup_tracer
 
 # === Configuration ===
 from config import (
@@ -23,12 +38,19 @@ from config import (
     CLICK_SOUND_PATH,
     HOVER_SOUND_PATH,
     BACKGROUND_MUSIC_PATH,
-    BG_IMAGE_PATH
+    BG_IMAGE_PATH,
+    ASSET_FINALIZE_BUDGET_MS,
+    IDLE_WAIT_MS,
+    MENU_SPARKLES_PER_SECOND,
+    MENU_SPARKLE_FPS,
+    SCREEN_TRANSITION,
+    SPARKLE_COLOR,
 )
 
 # === Setup Logging ===
 logging.basicConfig(level=logging.INFO)
 
+
 # Holds global user settings like fullscreen, music, and FPS display.
 class MenuConfig:
     """
@@ -45,16 +67,34 @@ class MenuConfig:
 class AbstractMenuBase(ABC):
     """
     Abstract base class for menu states.
+
+    A state describes its content once: `create_buttons()` builds the
+    widgets and `build_scene()` adds them (and the title) to `self.scene`,
+    which the menu loop repaints only where something changed.
     """
+    title: str = ""
+
+    # Assets this state uses, and states reachable from it whose assets are
+    # loaded in the background while this one is shown
+    prefetch_assets: List[str] = []
+    prefetch_states: List[str] = []
+
     def __init__(self, menu_manager: 'MenuManager'):
         self.menu_manager = menu_manager
+        self.prefetch_handles: List[AssetHandle] = []
         self.screen = pygame.display.get_surface()
         self.screen_width, self.screen_height = self.screen.get_size()
-        self.button_font = pygame.font.Font(None, 32)
-        self.title_font = pygame.font.Font(None, 48)
-        self.small_font = pygame.font.Font(None, 24)
+        # Share the base menu's fonts rather than reopening them per state
+        base_menu = menu_manager.base_menu
+        self.button_font = base_menu.button_font
+        self.title_font = base_menu.title_font
+        self.small_font = base_menu.small_font
         self.buttons = []
+        self.layout = LayoutRoot((self.screen_width, self.screen_height))
+        self.scene = SceneNode()
         self.create_buttons()
+        self.layout.update()
+        self.build_scene()
 
     @abstractmethod
     def create_buttons(self) -> None:
@@ -66,15 +106,57 @@ class AbstractMenuBase(ABC):
         """Handle state-specific events"""
         pass
 
-    @abstractmethod
+    def build_scene(self) -> None:
+        """Add the title and every widget to this state's scene. Override to add more."""
+        if self.title:
+            title_anchor = self.layout.add(LayoutNode(anchor="top", pivot="top", offset=(0, 100)))
+            self.scene.add(TextNode(self.title, self.title_font, TEXT_COLOR, layout_node=title_anchor))
+        for widget in self.buttons:
+            if isinstance(widget, Button):
+                self.scene.add(ButtonNode(widget))
+            elif isinstance(widget, ScrollList):
+                self.scene.add(ScrollListNode(widget))
+            elif isinstance(widget, AnimatedSprite):
+                self.scene.add(AnimationNode(widget))
+            else:
+                self.scene.add(SliderNode(widget))
+
     def draw(self) -> None:
-        """Draw the current state"""
+        """
+        Immediate-mode drawing on top of the scene. A state that overrides
+        this is repainted in full every frame, so prefer scene nodes.
+        """
         pass
 
+    @property
+    def draws_every_frame(self) -> bool:
+        return type(self).draw is not AbstractMenuBase.draw
+
+    def update(self) -> bool:
+        """
+        Per-frame work outside event handling.
+
+        Returns:
+            True while background work is in flight, so the loop doesn't idle.
+        """
+        return False
+
+    def on_resize(self) -> None:
+        """Re-anchor widgets to the new screen size without rebuilding them"""
+        self.screen_width, self.screen_height = self.screen.get_size()
+        self.layout.resize(self.screen_width, self.screen_height)
+
     def cleanup(self) -> None:
         """Called when exiting this state"""
         # Default implementation - override if needed
+        if self.scene.parent is not None:
+            self.scene.parent.remove(self.scene)
+        for button in self.buttons:
+            button.release_resources()
         self.buttons.clear()
+        for handle in self.prefetch_handles:
+            handle.release()
+        self.prefetch_handles.clear()
 
 # Handles switching between and managing active menu states.
 class MenuManager:
@@ -90,28 +172,57 @@ class MenuManager:
         """Register a menu state with a name"""
         self.states[state_name] = state_class
 
-    def transition_to(self, state_name: str) -> None:
-        """Transition to a new state by name"""
+    def transition_to(self, state_name: str, transition: Optional[str] = SCREEN_TRANSITION) -> None:
+        """
+        Transition to a new state by name, animated with a `ScreenTransition`
+        kind unless `transition` is empty.
+        """
         if state_name not in self.states:
             logging.error(f"State {state_name} not registered")
             return
 
-        # Clean up current state if it exists
-        if self.current_state:
-            self.current_state.cleanup()
-
-        # Create new state
-        self.current_state = self.states[state_name](self)
+        # Start loading the new state's assets, and those of the states it
+        # leads to, before building it
+        state_class = self.states[state_name]
+        prefetch_handles = resource_manager.prefetch(self.collect_prefetch_assets(state_class))
+
+        # Create the new state before cleaning up the old one, so assets both
+        # states share keep their reference count and are not reloaded
+        previous_state = self.current_state
+        if previous_state and transition:
+            # The display still shows the outgoing state
+            self.base_menu.transition = ScreenTransition(self.base_menu.screen.copy(), transition)
+        else:
+            self.base_menu.transition = None
+        self.current_state = state_class(self)
+        self.current_state.prefetch_handles.extend(prefetch_handles)
+        self.base_menu.scene.add(self.current_state.scene)
+        if previous_state:
+            previous_state.cleanup()
         logging.info(f"Transitioned to {state_name} state")
 
+    def collect_prefetch_assets(self, state_class: Type[AbstractMenuBase]) -> List[str]:
+        """Assets declared by a state and by the states it can lead to"""
+        paths = list(state_class.prefetch_assets)
+        for next_state in state_class.prefetch_states:
+            if next_state in self.states:
+                paths.extend(self.states[next_state].prefetch_assets)
+        return list(dict.fromkeys(paths))
+
     def handle_events(self, event: pygame.event.Event) -> bool:
         """Forward events to current state"""
         if self.current_state:
             return self.current_state.handle_events(event)
         return False
 
+    def update(self) -> bool:
+        """Run the current state's per-frame work"""
+        if self.current_state:
+            return self.current_state.update()
+        return False
+
     def draw(self) -> None:
-        """Draw the current state"""
+        """Draw the current state's immediate-mode extras"""
         if self.current_state:
             self.current_state.draw()
 
@@ -133,6 +244,7 @@ class MenuBase:
         self.small_font = pygame.font.Font(None, 24)
 
         # Background handling
+        self.bg_handle: Optional[AssetHandle] = None
         self.original_bg: Optional[pygame.Surface] = None
         self.background_image: Optional[pygame.Surface] = None
         self.bg_pos = (0, 0)
@@ -143,8 +255,32 @@ class MenuBase:
 
         # State management
         self.menu_manager = MenuManager(self)
-        
-        self.load_background_image()
+        self.transition: Optional[ScreenTransition] = None
+
+        # Retained scene: the background is the bottom layer, the current
+        # state's subtree goes above it and the footer/FPS text on top
+        self.scene = Scene(self.screen, self.paint_background)
+        self.instructions = self.scene.add(TextNode(
+            "Press TAB to navigate, ENTER to select, Q to quit, F11 for fullscreen",
+            self.small_font, TEXT_COLOR, z=1,
+        ))
+        # The counter changes every frame, so it draws from a glyph atlas
+        fps_atlas = glyph_atlas(self.small_font, (255, 255, 0))
+        self.fps_text = self.scene.add(AtlasTextNode("0", fps_atlas, pos=(10, 10), label="FPS: ", z=1))
+        self.particle_text = self.scene.add(AtlasTextNode(
+            "0", fps_atlas, pos=(10, 10 + fps_atlas.height), label="Particles: ", z=1,
+        ))
+        self.place_overlay()
+
+        # Ambient sparkles, between the background and the current state
+        self.particles = ParticleSystem()
+        self.sparkle = self.particles.sprite_id(SPARKLE_COLOR, 2)
+        self.scene.add(ParticleNode(self.particles, z=-1))
+        self._sparkles_due = 0.0
+        self._particles_updated = time.perf_counter()
+
+        with startup_tracer.phase("load background"):
+            self.load_background_image()
 
     def load_background_image(self) -> None:
         """
@@ -152,37 +288,85 @@ class MenuBase:
         """
         self.screen_width, self.screen_height = self.screen.get_size()
         if self.original_bg is None and os.path.exists(BG_IMAGE_PATH):
-            try:
-                self.original_bg = pygame.image.load(BG_IMAGE_PATH)
-            except Exception as e:
-                logging.exception(f"Error loading background: {e}")
-                self.original_bg = None
+            if self.bg_handle is None:
+                self.bg_handle = resource_manager.acquire_image(BG_IMAGE_PATH).prefetch()
+            # Don't block on the decode; update_background retries once it's in
+            if self.bg_handle.ready():
+                self.original_bg = self.bg_handle.get()
 
         if self.original_bg:
-            bg_width, bg_height = self.original_bg.get_size()
-            width_ratio = self.screen_width / bg_width
-            height_ratio = self.screen_height / bg_height
-            scale_factor = max(width_ratio, height_ratio)
-            new_width = int(bg_width * scale_factor)
-            new_height = int(bg_height * scale_factor)
-            self.background_image = pygame.transform.scale(self.original_bg, (new_width, new_height))
-            bg_x = (self.screen_width - new_width) // 2
-            bg_y = (self.screen_height - new_height) // 2
-            self.bg_pos = (bg_x, bg_y)
+            self.background_image, self.bg_pos = scale_to_cover(self.original_bg, (self.screen_width, self.screen_height))
         else:
             self.background_image = None
             self.bg_pos = (0, 0)
+        self.scene.invalidate()
 
-    def draw_background(self) -> None:
-        self.screen.fill(BACKGROUND_COLOR)
+    def update_background(self) -> None:
+        """Pick up the background image once its background decode has finished."""
+        if self.original_bg is None and self.bg_handle and self.bg_handle.ready():
+            self.load_background_image()
+
+    def paint_background(self, surface: pygame.Surface, rect: pygame.Rect) -> None:
+        """Scene background layer; the surface is already clipped to `rect`."""
+        surface.fill(BACKGROUND_COLOR, rect)
         if self.background_image:
-            self.screen.blit(self.background_image, self.bg_pos)
+            surface.blit(self.background_image, self.bg_pos)
+
+    def place_overlay(self) -> None:
+        """Keep the footer instructions centred along the bottom edge."""
+        width = self.instructions.rect.width
+        self.instructions.set_position((self.screen_width // 2 - width // 2, self.screen_height - 40))
 
-    def draw_fps_counter(self) -> None:
+    def update_fps_counter(self) -> None:
+        self.fps_text.set_visible(self.config.fps_display_enabled)
         if self.config.fps_display_enabled:
-            fps = int(self.clock.get_fps())
-            fps_text = self.small_font.render(f"FPS: {fps}", True, (255, 255, 0))
-            self.screen.blit(fps_text, (10, 10))
+            self.fps_text.set_text(str(int(self.clock.get_fps())))
+        # What the particle effects cost a frame
+        show_particles = self.config.fps_display_enabled and self.particles.available
+        self.particle_text.set_visible(show_particles)
+        if show_particles:
+            self.particle_text.set_text(f"{self.particles.count}, {self.particles.frame_ms:.2f} ms")
+
+    def update_particles(self) -> bool:
+        """
+        Move the sparkles on by the real time since the last frame, starting
+        new ones at `MENU_SPARKLES_PER_SECOND`.
+
+        Returns:
+            True while any are alive.
+        """
+        now = time.perf_counter()
+        # After an idle wait or a game of Snake, carry on rather than catch up
+        dt = min(now - self._particles_updated, 0.1)
+        self._particles_updated = now
+        self._sparkles_due += MENU_SPARKLES_PER_SECOND * dt
+        count = int(self._sparkles_due)
+        if count:
+            self._sparkles_due -= count
+            self.particles.emit(count, self.sparkle, area=self.screen.get_rect(), speed=(6, 24),
+                                angle=(-2.4, -0.74), life=(1.0, 2.5))
+        self.particles.update(dt)
+        return self.particles.count > 0
+
+    def draw_transition(self) -> List[pygame.Rect]:
+        """
+        Play a frame of the screen transition. On its first frame the new
+        state is rendered once and snapshotted; after that, while the state
+        keeps loading in the background, each frame is just the transition's
+        blits. When it ends the scene takes over again with a full repaint.
+        """
+        transition = self.transition
+        if transition.incoming is None:
+            self.scene.invalidate()
+            self.scene.render()
+            self.menu_manager.draw()
+            transition.start(self.screen.copy())
+        transition.update()
+        transition.draw(self.screen)
+        if transition.finished:
+            self.transition = None
+            self.scene.invalidate()
+        return [self.screen.get_rect()]
 
     def toggle_fullscreen(self) -> None:
         """
@@ -197,14 +381,31 @@ class MenuBase:
             pygame.display.set_mode((1280, 720), pygame.RESIZABLE)
 
         self.load_background_image()
+        self.relayout_current_state()
 
-        # Reset the current menu state
-        if self.menu_manager.current_state:
+    def relayout_current_state(self) -> None:
+        """
+        Fit the current menu state to the current display size.
+        """
+        self.screen = pygame.display.get_surface()
+        self.scene.set_surface(self.screen)
+        self.place_overlay()
+        # Snapshots of the old size can't be shown; cut to the new state
+        self.transition = None
+
+        state = self.menu_manager.current_state
+        if not state:
+            return
+
+        if state.screen is self.screen:
+            state.on_resize()
+        else:
+            # The display surface was replaced, so widgets hold a stale target
             current_state_name = next(
                 name for name, cls in self.menu_manager.states.items()
-                if isinstance(self.menu_manager.current_state, cls)
+                if isinstance(state, cls)
             )
-            self.menu_manager.transition_to(current_state_name)
+            self.menu_manager.transition_to(current_state_name, transition="")
 
     def handle_common_events(self, event: pygame.event.Event) -> bool:
         if event.type == pygame.QUIT:
@@ -212,11 +413,7 @@ class MenuBase:
             return True
         elif event.type == pygame.VIDEORESIZE:
             self.load_background_image()
-            # Reload current state when resizing
-            if self.menu_manager.current_state:
-                current_state_name = next(name for name, cls in self.menu_manager.states.items() 
-                                         if isinstance(self.menu_manager.current_state, cls))
-                self.menu_manager.transition_to(current_state_name)
+            self.relayout_current_state()
             return True
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_q:
@@ -231,32 +428,54 @@ class MenuBase:
         """
         Main menu loop using state pattern
         """
+        dt = 0
         while self.running:
-            self.draw_background()
-
-            for event in pygame.event.get():
+            frame_started = time.perf_counter()
+            # Hand off finished background loads within a fixed time slice
+            resource_manager.pump(ASSET_FINALIZE_BUDGET_MS)
+            self.config.music_manager.update()
+            animating = tween_scheduler.update(dt)
+            self.update_background()
+            sparkling = self.update_particles()
+            busy = self.menu_manager.update()
+
+            events = pygame.event.get()
+            for event in events:
                 if self.handle_common_events(event):
                     continue
-                
+                if self.transition:
+                    continue  # Input waits until the new screen is fully shown
+
                 # Let current state handle events
                 self.menu_manager.handle_events(event)
 
-            # Draw the current state
-            self.menu_manager.draw()
-
-            # Example text instructions (common across states)
-            instructions = self.small_font.render(
-                "Press TAB to navigate, ENTER to select, Q to quit, F11 for fullscreen",
-                True, TEXT_COLOR
-            )
-            self.screen.blit(
-                instructions,
-                (self.screen_width // 2 - instructions.get_width() // 2, self.screen_height - 40)
-            )
-
-            self.draw_fps_counter()
-            pygame.display.flip()
-            self.clock.tick(60)
+            self.update_fps_counter()
+
+            if self.transition:
+                dirty_rects = self.draw_transition()
+            else:
+                # Repaint only what changed, unless the state draws by hand
+                state = self.menu_manager.current_state
+                if state and state.draws_every_frame:
+                    self.scene.invalidate()
+                dirty_rects = self.scene.render()
+                self.menu_manager.draw()
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            startup_tracer.first_frame()
+            dt = self.clock.tick(60)
+
+            # Nothing changed and nothing is moving: sleep until input arrives,
+            # or only until the next sparkle frame while sparkles drift
+            if (not events and not animating and not busy and not self.transition
+                    and not resource_manager.has_pending()):
+                wait_ms = IDLE_WAIT_MS
+                if sparkling:
+                    wait_ms = math.ceil((frame_started + 1.0 / MENU_SPARKLE_FPS - time.perf_counter()) * 1000)
+                if wait_ms > 0:
+                    event = pygame.event.wait(wait_ms)
+                    if event.type != pygame.NOEVENT:
+                        pygame.event.post(event)
 
         return True
 
@@ -269,17 +488,23 @@ class MenuBaseStateController(MenuBase):
         super().__init__(config)
         
         # Import the menu states
-        from screens.main_menu import MainAbstractMenuBase
-        from screens.settings_menu import SettingsAbstractMenuBase
-        from screens.test_menu import TestAbstractMenuBase
+        with startup_tracer.phase("import menu states"):
+            from screens.main_menu import MainAbstractMenuBase
+            from screens.settings_menu import SettingsAbstractMenuBase
+            from screens.test_menu import TestAbstractMenuBase
+            from screens.dialogue_menu import DialogueAbstractMenuBase
+            from screens.load_menu import LoadAbstractMenuBase
         
         # Register all menu states
         self.menu_manager.register_state("main", MainAbstractMenuBase)
         self.menu_manager.register_state("settings", SettingsAbstractMenuBase)
         self.menu_manager.register_state("test", TestAbstractMenuBase)
+        self.menu_manager.register_state("dialogue", DialogueAbstractMenuBase)
+        self.menu_manager.register_state("load", LoadAbstractMenuBase)
         
         # Start with the main menu state
-        self.menu_manager.transition_to("main")
+        with startup_tracer.phase("build main menu"):
+            self.menu_manager.transition_to("main")
 
         # If the user wants the game to start with music
         if self.config.music_enabled and os.path.exists(BACKGROUND_MUSIC_PATH):
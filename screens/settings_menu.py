@@ -3,23 +3,20 @@
 import os
 import pygame
 
-from screens.menu_system import AbstractMenuBase, MenuManager  # Updated import
+from screens.menu_system import AbstractMenuBase  # Updated import
 from ui.builders.button_builder import ButtonBuilder
+from ui.layout import LayoutNode, VStack
 
-from config import BACKGROUND_MUSIC_PATH  # make sure this is at the top
-
-# Constants from menu_system
-TEXT_COLOR = (220, 220, 220)
-HOVER_TEXT_COLOR = (255, 255, 0)
+from config import BACKGROUND_MUSIC_PATH, CLICK_SOUND_PATH, HOVER_SOUND_PATH  # make sure this is at the top
 
 
 class SettingsAbstractMenuBase(AbstractMenuBase):
     """
     Settings menu state implementation
     """
-    def __init__(self, menu_manager: MenuManager):
-        super().__init__(menu_manager)
-        self.title = "Settings Menu"
+    title = "Settings Menu"
+    prefetch_assets = [CLICK_SOUND_PATH, HOVER_SOUND_PATH]
+    prefetch_states = ["main"]
 
     def create_buttons(self) -> None:
         """Create settings menu buttons"""
@@ -30,17 +27,20 @@ class SettingsAbstractMenuBase(AbstractMenuBase):
         button_width = 250
         button_height = 50
         button_spacing = 20
+
+        # Buttons stack downward from just above the screen centre
+        button_stack = self.layout.add(
+            VStack(spacing=button_spacing, anchor="center", pivot="top", offset=(0, -50))
+        )
         
         # Toggle music button
         music_text = "Disable Music" if config.music_enabled else "Enable Music"
         music_btn = (
-            ButtonBuilder(self.screen, self.button_font, text=music_text)
+            ButtonBuilder.menu_button(self.screen, self.button_font, text=music_text)
             .set_size(button_width, button_height)
-            .set_offsets(0, -50)
-            .set_hover_text_color(HOVER_TEXT_COLOR)
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_tooltip("Toggle background music")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)  # Removed focus_sound_path
-            .set_is_background_visible(False)
             .set_music_manager(config.music_manager)
             .build()
         )
@@ -49,13 +49,11 @@ class SettingsAbstractMenuBase(AbstractMenuBase):
         # Toggle FPS display button
         fps_text = "Hide FPS" if config.fps_display_enabled else "Show FPS"
         fps_btn = (
-            ButtonBuilder(self.screen, self.button_font, text=fps_text)
+            ButtonBuilder.menu_button(self.screen, self.button_font, text=fps_text)
             .set_size(button_width, button_height)
-            .set_offsets(0, -50 + button_height + button_spacing)
-            .set_hover_text_color(HOVER_TEXT_COLOR)
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_tooltip("Toggle FPS counter")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)  # Removed focus_sound_path
-            .set_is_background_visible(False)
             .set_music_manager(config.music_manager)
             .build()
         )
@@ -63,14 +61,12 @@ class SettingsAbstractMenuBase(AbstractMenuBase):
         
         # Back to Main Menu button
         back_btn = (
-            ButtonBuilder(self.screen, self.button_font, text="Back to Main Menu")
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Back to Main Menu")
             .set_size(button_width, button_height)
-            .set_offsets(0, -50 + (button_height + button_spacing) * 2)
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_hover_text("⬅ Main Menu")
-            .set_hover_text_color(HOVER_TEXT_COLOR)
             .set_tooltip("Return to main menu")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)  # Removed focus_sound_path
-            .set_is_background_visible(False)
             .set_music_manager(config.music_manager)
             .build()
         )
@@ -83,19 +79,6 @@ class SettingsAbstractMenuBase(AbstractMenuBase):
         for button in self.buttons:
             button.handle_event(event)
         return False
-            
-    def draw(self) -> None:
-        """Draw the settings menu state"""
-        # Draw title
-        title_text = self.title_font.render(self.title, True, TEXT_COLOR)
-        self.screen.blit(
-            title_text,
-            (self.screen_width // 2 - title_text.get_width() // 2, 100)
-        )
-        
-        # Draw all buttons
-        for button in self.buttons:
-            button.draw()
 
     def toggle_music(self) -> bool:
         """Toggle music on/off"""
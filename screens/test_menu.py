@@ -3,22 +3,21 @@
 import logging
 import pygame
 
-from screens.menu_system import AbstractMenuBase, MenuManager  # Updated import
+from screens.menu_system import AbstractMenuBase  # Updated import
 from ui.builders.button_builder import ButtonBuilder
+from ui.components.animated_sprite import AnimatedSprite
+from ui.layout import LayoutNode, VStack
 
-
-# Constants from menu_system
-TEXT_COLOR = (220, 220, 220)
-HOVER_TEXT_COLOR = (255, 255, 0)
+from config import CLICK_SOUND_PATH, HOVER_SOUND_PATH, INTRO_ANIMATION_PATH
 
 
 class TestAbstractMenuBase(AbstractMenuBase):
     """
     Test menu state implementation
     """
-    def __init__(self, menu_manager: MenuManager):
-        super().__init__(menu_manager)
-        self.title = "Test Menu"
+    title = "Test Menu"
+    prefetch_assets = [CLICK_SOUND_PATH, HOVER_SOUND_PATH]
+    prefetch_states = ["main", "dialogue"]
 
     def create_buttons(self) -> None:
         """Create test menu buttons"""
@@ -27,11 +26,16 @@ class TestAbstractMenuBase(AbstractMenuBase):
         
         # Button spacing
         button_spacing = 20
+
+        # Buttons stack downward from just above the screen centre
+        button_stack = self.layout.add(
+            VStack(spacing=button_spacing, anchor="center", pivot="top", offset=(0, -50))
+        )
         
         # Default button using the preset
         default_btn = (
             ButtonBuilder.default_button(self.screen, self.button_font, text="Default Button Example")
-            .set_offsets(0, -50)
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_tooltip("This is a button using the default preset")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
             .set_music_manager(config.music_manager)
@@ -40,38 +44,46 @@ class TestAbstractMenuBase(AbstractMenuBase):
         )
         default_btn.on_click = lambda: logging.info("Default button clicked!")
 
+        # Dialogue engine demo
+        dialogue_btn = (
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Dialogue Demo")
+            .set_size(250, 50)
+            .set_layout_node(button_stack.add(LayoutNode()))
+            .set_hover_text("🗣 Dialogue Demo")
+            .set_tooltip("Play the prologue script")
+            .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
+            .set_music_manager(config.music_manager)
+            .build()
+        )
+        dialogue_btn.on_click = lambda: self.menu_manager.transition_to("dialogue")
+
         # Back to Main Menu button
         back_btn = (
-            ButtonBuilder(self.screen, self.button_font, text="Back to Main Menu")
+            ButtonBuilder.menu_button(self.screen, self.button_font, text="Back to Main Menu")
             .set_size(250, 50)
-            .set_offsets(0, -50 + 50 + button_spacing)
+            .set_layout_node(button_stack.add(LayoutNode()))
             .set_hover_text("⬅ Main Menu")
-            .set_hover_text_color(HOVER_TEXT_COLOR)
             .set_tooltip("Return to main menu")
             .set_sounds(base_menu.click_sound_path, base_menu.hover_sound_path)
-            .set_is_background_visible(False)
             .set_music_manager(config.music_manager)
             .build()
         )
         back_btn.on_click = lambda: self.menu_manager.transition_to("main")
         
-        self.buttons = [default_btn, back_btn]
+        self.buttons = [default_btn, dialogue_btn, back_btn]
+
+        # Animation demo beside the buttons, decoded in the background
+        self.intro_ball = AnimatedSprite(self.screen, INTRO_ANIMATION_PATH, scale=0.5)
+        ball_node = self.layout.add(LayoutNode(anchor="center", pivot="left", offset=(280, 0)))
+        ball_node.set_size(*self.intro_ball.rect.size)
+        ball_node.bind(self.intro_ball)
+        self.buttons.append(self.intro_ball)
+
+    def update(self) -> bool:
+        return self.intro_ball.update()
 
     def handle_events(self, event: pygame.event.Event) -> bool:
         """Handle events for this state"""
         for button in self.buttons:
             button.handle_event(event)
         return False
-            
-    def draw(self) -> None:
-        """Draw the test menu state"""
-        # Draw title
-        title_text = self.title_font.render(self.title, True, TEXT_COLOR)
-        self.screen.blit(
-            title_text,
-            (self.screen_width // 2 - title_text.get_width() // 2, 100)
-        )
-        
-        # Draw all buttons
-        for button in self.buttons:
-            button.draw()
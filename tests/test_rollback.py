@@ -0,0 +1,128 @@
+from engine.dialogue import DialogueRunner, ScriptLibrary
+from engine.rollback import MISSING, RollbackLog
+
+
+def test_first_checkpoint_only_sets_the_start():
+    log = RollbackLog()
+    assert log.checkpoint({"a": 1}) == 0
+    assert len(log) == 0
+    assert log.rollback() == {}
+
+
+def test_unchanged_state_records_nothing():
+    log = RollbackLog()
+    log.checkpoint({"a": 1, "b": [1, 2]})
+    assert log.checkpoint({"a": 1, "b": [1, 2]}) == 0
+    assert len(log) == 0
+
+
+def test_rollback_n_steps():
+    log = RollbackLog()
+    for step in range(6):
+        log.checkpoint({"step": step, "constant": "same"})
+    assert len(log) == 5
+
+    assert log.rollback(1) == {"step": 4}
+    assert log.rollback(3) == {"step": 1}
+    assert len(log) == 1
+    # Past the oldest step, it stops there
+    assert log.rollback(10) == {"step": 0}
+    assert len(log) == 0
+
+
+def test_rollback_then_carry_on():
+    log = RollbackLog()
+    for step in range(3):
+        log.checkpoint({"step": step})
+    log.rollback(2)
+    # The shadow is back at step 0, so the next delta is against it
+    log.checkpoint({"step": 7})
+    assert log.rollback() == {"step": 0}
+
+
+def test_added_and_removed_keys():
+    log = RollbackLog()
+    log.checkpoint({"kept": 1, "removed": "x"})
+    log.checkpoint({"kept": 1, "added": True})
+    assert log.rollback() == {"removed": "x", "added": MISSING}
+
+
+def test_in_place_changes_are_recorded():
+    log = RollbackLog()
+    inventory = ["key"]
+    log.checkpoint({"inventory": inventory})
+    inventory.append("lamp")
+    log.checkpoint({"inventory": inventory})
+    assert log.rollback() == {"inventory": ["key"]}
+
+
+def test_large_deltas_are_compressed():
+    log = RollbackLog()
+    log.checkpoint({"text": ""})
+    log.checkpoint({"text": "a" * 4096})
+    log.checkpoint({"text": "b"})
+    payload, compressed = log.steps[-1]
+    assert compressed and len(payload) < 4096
+    assert log.rollback() == {"text": "a" * 4096}
+
+
+def test_oldest_steps_are_dropped_past_the_limits():
+    log = RollbackLog(max_steps=3)
+    for step in range(10):
+        log.checkpoint({"step": step})
+    assert len(log) == 3
+    assert log.stats["dropped"] == 6
+    assert log.rollback(10) == {"step": 6}
+
+    log = RollbackLog(budget=200)
+    for step in range(50):
+        log.checkpoint({"step": step})
+    assert log.resident_bytes <= 200
+    assert 0 < len(log) < 49
+
+
+def test_unpicklable_state_clears_the_history():
+    def callback():
+        pass
+
+    log = RollbackLog()
+    log.checkpoint({"step": 0, "callback": callback})
+    log.checkpoint({"step": 1, "callback": callback})
+    # The delta would hold the old callback, which cannot be pickled
+    assert log.checkpoint({"step": 2, "callback": None}) == 0
+    assert len(log) == 0
+    # Recording carries on from the state it could not record
+    log.checkpoint({"step": 3, "callback": None})
+    assert log.rollback() == {"step": 2}
+
+
+STORY = '''\
+label start:
+    $ trust = 0
+    "One."
+    $ trust += 1
+    "Two."
+    $ trust += 1
+    "Three."
+    $ trust += 1
+    "Four."
+'''
+
+
+def test_runner_rolls_back_n_interactions(tmp_path):
+    (tmp_path / "story.story").write_text(STORY)
+    runner = DialogueRunner(ScriptLibrary(str(tmp_path), str(tmp_path / "cache")))
+    assert runner.start("start")
+    for _ in range(3):
+        runner.advance()
+    assert (runner.text, runner.variables["trust"]) == ("Four.", 3)
+
+    assert runner.rollback(2)
+    assert (runner.text, runner.variables["trust"]) == ("Two.", 1)
+    # Running on from there replays the same lines
+    runner.advance()
+    assert (runner.text, runner.variables["trust"]) == ("Three.", 2)
+
+    assert runner.rollback(10)
+    assert (runner.text, runner.variables["trust"]) == ("One.", 0)
+    assert not runner.rollback()
@@ -0,0 +1,126 @@
+import os
+import pickle
+import zlib
+
+import pytest
+
+from engine.save_system import (
+    SAVE_FORMAT_VERSION,
+    SAVE_HEADER,
+    SNAKE_SAVE,
+    SaveError,
+    SaveManager,
+    decode_save,
+    encode_save,
+)
+
+STATE = {"snake": [(3, 4), (3, 5)], "score": 12, "name": "Ada", "ratio": 0.5, "flags": {"paused": True}}
+
+
+def make_save(state=STATE, meta=None):
+    return encode_save(meta or {"kind": SNAKE_SAVE, "title": "Test"}, pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+
+def test_encode_decode_round_trip():
+    meta, state = decode_save(make_save())
+    assert meta == {"kind": SNAKE_SAVE, "title": "Test"}
+    assert state == STATE
+
+
+@pytest.mark.parametrize("offset", [SAVE_HEADER.size, -1])
+def test_corrupted_byte_is_rejected(offset):
+    data = bytearray(make_save())
+    data[offset] ^= 0xFF
+    with pytest.raises(SaveError, match="damaged"):
+        decode_save(bytes(data))
+
+
+def test_truncated_file_is_rejected():
+    data = make_save()
+    for length in (0, SAVE_HEADER.size - 1, len(data) - 1):
+        with pytest.raises(SaveError, match="truncated"):
+            decode_save(data[:length])
+
+
+def test_wrong_version_is_rejected():
+    data = make_save()
+    magic, _, meta_length, body_length, crc = SAVE_HEADER.unpack_from(data)
+    newer = SAVE_HEADER.pack(magic, SAVE_FORMAT_VERSION + 1, meta_length, body_length, crc) + data[SAVE_HEADER.size:]
+    with pytest.raises(SaveError, match="version"):
+        decode_save(newer)
+
+
+def test_other_file_is_rejected():
+    with pytest.raises(SaveError, match="not a save"):
+        decode_save(b"\x89PNG" + bytes(SAVE_HEADER.size))
+
+
+def test_save_naming_a_callable_is_not_run():
+    # A well-formed save whose state would call os.system when unpickled
+    class Exploit:
+        def __reduce__(self):
+            return os.system, ("echo unsafe",)
+
+    data = encode_save({"kind": SNAKE_SAVE}, pickle.dumps(Exploit()))
+    with pytest.raises(SaveError, match="posix.system|nt.system"):
+        decode_save(data)
+
+
+def test_manager_round_trip(tmp_path):
+    saves = SaveManager(str(tmp_path))
+    slot = saves.save(SNAKE_SAVE, STATE, title="First")
+    saves.flush()
+
+    meta, state = SaveManager(str(tmp_path)).load(slot)
+    assert state == STATE
+    assert meta["kind"] == SNAKE_SAVE and meta["title"] == "First"
+    saves.shutdown()
+
+
+def test_load_waits_for_pending_write(tmp_path):
+    saves = SaveManager(str(tmp_path))
+    slot = saves.save(SNAKE_SAVE, STATE)
+    assert saves.load(slot)[1] == STATE
+    saves.shutdown()
+
+
+def test_corrupted_slot_raises_save_error(tmp_path):
+    saves = SaveManager(str(tmp_path))
+    slot = saves.save(SNAKE_SAVE, STATE)
+    saves.flush()
+    path = saves.slot_path(slot)
+    with open(path, "r+b") as f:
+        f.seek(-4, os.SEEK_END)
+        f.write(b"\0\0\0\0")
+    with pytest.raises(SaveError):
+        saves.load(slot)
+    with pytest.raises(SaveError, match="empty"):
+        saves.load(slot + 1)
+    saves.shutdown()
+
+
+def test_body_that_is_not_zlib_raises_save_error(tmp_path):
+    saves = SaveManager(str(tmp_path))
+    body = b"not compressed"
+    meta = b"{}"
+    crc = zlib.crc32(body, zlib.crc32(meta))
+    os.makedirs(saves.save_dir, exist_ok=True)
+    with open(saves.slot_path(1), "wb") as f:
+        f.write(SAVE_HEADER.pack(b"FFSV", SAVE_FORMAT_VERSION, len(meta), len(body), crc) + meta + body)
+    with pytest.raises(SaveError, match="could not be read"):
+        saves.load(1)
+
+
+def test_index_lists_slots_and_is_rebuilt_when_lost(tmp_path):
+    saves = SaveManager(str(tmp_path))
+    first = saves.save(SNAKE_SAVE, STATE, title="One")
+    second = saves.save(SNAKE_SAVE, STATE, title="Two")
+    saves.delete(first)
+    saves.shutdown()
+    assert [slot for slot, _ in SaveManager(str(tmp_path)).listing()] == [second]
+
+    os.remove(os.path.join(str(tmp_path), "index.json"))
+    rebuilt = SaveManager(str(tmp_path))
+    assert [(slot, meta["title"]) for slot, meta in rebuilt.listing()] == [(second, "Two")]
+    rebuilt.shutdown()
+    assert os.path.exists(os.path.join(str(tmp_path), "index.json"))
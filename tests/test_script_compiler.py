@@ -0,0 +1,160 @@
+import os
+
+import pytest
+
+import engine.script_compiler as script_compiler
+from engine.script_compiler import (
+    CACHE_HEADER,
+    CACHE_SUFFIX,
+    CHOICE,
+    END,
+    MENU,
+    SAY,
+    SET,
+    CompiledScript,
+    ScriptError,
+    compile_source,
+    disassemble,
+    linked_labels,
+    load_script,
+    scan_labels,
+)
+
+SOURCE = '''\
+define e = "Eileen"
+
+label start:
+    # A comment
+    "Narration."
+    e "Hello, \\"you\\"."
+    $ trust = 1
+    menu:
+        "Stay":
+            $ trust += 1
+        "Leave" if trust < 5:
+            jump ending
+    call interlude
+    return
+
+label interlude:
+    "Meanwhile."
+    return
+'''
+
+
+def opcodes(script):
+    return [script.fetch(pc)[0] for pc in range(len(script))]
+
+
+def test_compiles_labels_lines_and_defines():
+    script = compile_source(SOURCE, "test.story")
+    assert script.defines == {"e": "Eileen"}
+    assert set(script.labels) == {"start", "interlude"}
+
+    op, speaker, text, _ = script.fetch(script.labels["start"])
+    assert op == SAY and speaker == -1 and script.consts[text] == "Narration."
+    op, speaker, text, _ = script.fetch(script.labels["start"] + 1)
+    # Defined speakers are resolved to their display name when compiled
+    assert (script.consts[speaker], script.consts[text]) == ("Eileen", 'Hello, "you".')
+    assert script.lineno(script.labels["start"]) == 5
+    assert opcodes(script)[-1] == END
+
+
+def test_menu_choices_and_conditions():
+    script = compile_source(SOURCE)
+    menu_pc = opcodes(script).index(MENU)
+    assert script.fetch(menu_pc)[1] == 2
+    (_, stay, no_condition, _), (_, leave, condition, _) = script.fetch(menu_pc + 1), script.fetch(menu_pc + 2)
+    assert script.fetch(menu_pc + 1)[0] == script.fetch(menu_pc + 2)[0] == CHOICE
+    assert (script.consts[stay], script.consts[leave]) == ("Stay", "Leave")
+    assert no_condition == -1
+    assert eval(script.exprs[condition], {}, {"trust": 1}) is True
+
+
+def test_expressions_are_compiled_once():
+    script = compile_source('label a:\n    $ x = 1 + 1\n    $ y = 1 + 1\n    "Done."\n')
+    sets = [script.fetch(pc) for pc in range(len(script)) if script.fetch(pc)[0] == SET]
+    assert sets[0][2] == sets[1][2]
+    assert len(script.exprs) == 1
+
+
+def test_linked_and_scanned_labels(tmp_path):
+    script = compile_source(SOURCE)
+    assert linked_labels(script) == ["ending", "interlude"]
+    path = tmp_path / "test.story"
+    path.write_text(SOURCE)
+    assert scan_labels(str(path)) == ["start", "interlude"]
+
+
+def test_disassembles_every_instruction():
+    script = compile_source(SOURCE)
+    listing = disassemble(script).splitlines()
+    assert "start:" in listing and "interlude:" in listing
+    assert len(listing) == len(script) + 2
+
+
+@pytest.mark.parametrize("source, lineno, message", [
+    ('"Outside."\n', 1, "inside a label"),
+    ("label a:\n\"Not indented.\"\n", 1, "indented block"),
+    ("label a:\n    \"One.\"\n        \"Two.\"\n", 3, "unexpected indent"),
+    ("label a:\n    $ x = (1\n", 2, "invalid expression"),
+    ("label a:\n    \"One.\"\nlabel a:\n    \"Two.\"\n", 3, "defined twice"),
+    ("label a:\n    jump\n", 2, "expected: jump name"),
+])
+def test_syntax_errors_name_the_line(source, lineno, message):
+    with pytest.raises(ScriptError, match=message) as error:
+        compile_source(source, "bad.story")
+    assert error.value.filename == "bad.story"
+    assert error.value.lineno == lineno
+
+
+def test_bytecode_round_trip():
+    script = compile_source(SOURCE, "test.story")
+    loaded = CompiledScript.from_bytes(script.to_bytes(), "test.story")
+    assert list(loaded.code) == list(script.code)
+    assert list(loaded.lines) == list(script.lines)
+    assert (loaded.consts, loaded.labels, loaded.defines) == (script.consts, script.labels, script.defines)
+    assert [eval(expr, {}, {"trust": 9}) for expr in loaded.exprs] == [eval(expr, {}, {"trust": 9}) for expr in script.exprs]
+
+
+def test_bytecode_from_another_version_is_ignored():
+    data = compile_source(SOURCE).to_bytes()
+    assert CompiledScript.from_bytes(b"XXXX" + data[4:], "test.story") is None
+    assert CompiledScript.from_bytes(data[:4] + bytes([data[4] + 1]) + data[5:], "test.story") is None
+
+
+def test_load_script_uses_the_cache_until_the_source_changes(tmp_path, monkeypatch):
+    path = tmp_path / "test.story"
+    path.write_text(SOURCE)
+    cache_dir = tmp_path / "cache"
+
+    first = load_script(str(path), str(cache_dir))
+    cached = os.listdir(cache_dir)
+    assert len(cached) == 1 and cached[0].endswith(CACHE_SUFFIX)
+    assert (cache_dir / cached[0]).read_bytes().startswith(CACHE_HEADER)
+
+    def no_compiling(_):
+        raise AssertionError("compiled although cached")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(script_compiler, "compile_file", no_compiling)
+        again = load_script(str(path), str(cache_dir))
+    assert list(again.code) == list(first.code) and again.name == str(path)
+
+    path.write_text(SOURCE.replace("Narration.", "Changed."))
+    changed = load_script(str(path), str(cache_dir))
+    assert "Changed." in changed.consts
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_damaged_cache_entry_is_recompiled(tmp_path):
+    path = tmp_path / "test.story"
+    path.write_text(SOURCE)
+    cache_dir = tmp_path / "cache"
+    load_script(str(path), str(cache_dir))
+    entry = cache_dir / os.listdir(cache_dir)[0]
+    entry.write_bytes(CACHE_HEADER + b"\x00garbage")
+
+    script = load_script(str(path), str(cache_dir))
+    assert script.labels == compile_source(SOURCE).labels
+    assert CompiledScript.from_bytes(entry.read_bytes(), str(path)) is not None
@@ -1,13 +1,26 @@
 # button_builder.py
 
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 import pygame
 from ui.components.button import Button
+from ui.components.style import ButtonStyle
+from ui.layout import LayoutNode
+from config import HOVER_TEXT_COLOR
 
 logging.basicConfig(level=logging.DEBUG)
 
+# Flyweight style presets. Buttons built from the same preset share one
+# ButtonStyle object rather than each holding copies of every colour.
+DEFAULT_BUTTON_STYLE = ButtonStyle.create(
+    bg_color=(0, 0, 0),
+    hover_color=(160, 160, 160),
+    text_color=(255, 255, 255),
+    border_color=(50, 50, 50),
+)
+MENU_BUTTON_STYLE = DEFAULT_BUTTON_STYLE._replace(visible_background=False, hover_text_color=HOVER_TEXT_COLOR)
+
 
 class ButtonBuilder:
     """
@@ -32,6 +45,7 @@ class ButtonBuilder:
         self.height: int = 50
         self.x_offset: int = 0
         self.y_offset: int = 0
+        self.layout_node: Optional[LayoutNode] = None
 
         self.on_click: Optional[Any] = None
         self.music_manager: Optional[Any] = None
@@ -48,7 +62,7 @@ class ButtonBuilder:
         self.border_width: int = 1
         self.visible_background: bool = True
 
-        self.icon: Optional[pygame.Surface] = None
+        self.icon: Optional[Union[pygame.Surface, str]] = None
         self.tooltip: Optional[str] = None
         self.disabled: bool = False
         self.animation_speed: int = 5
@@ -90,6 +104,11 @@ class ButtonBuilder:
         self.y_offset = y_offset
         return self
 
+    def set_layout_node(self, node: LayoutNode) -> "ButtonBuilder":
+        """Position the button from a layout node instead of absolute coordinates."""
+        self.layout_node = node
+        return self
+
     def set_on_click(self, callback) -> "ButtonBuilder":
         self.on_click = callback
         return self
@@ -138,7 +157,8 @@ class ButtonBuilder:
         self.visible_background = visible
         return self
 
-    def set_icon(self, icon: pygame.Surface) -> "ButtonBuilder":
+    def set_icon(self, icon: Union[pygame.Surface, str]) -> "ButtonBuilder":
+        """A surface, or an image path to load through the resource manager."""
         self.icon = icon
         return self
 
@@ -192,6 +212,17 @@ class ButtonBuilder:
         self.translation_func = func
         return self
 
+    def set_style(self, style: ButtonStyle) -> "ButtonBuilder":
+        """Copy every styling field from a preset; later setters still override it."""
+        for name, value in style._asdict().items():
+            setattr(self, name, value)
+        self.shape_params = dict(style.shape_params)
+        # A hover text colour the style only derived from its text colour
+        # stays derived, so set_text_color() still changes both
+        if style.hover_text_color == style.text_color:
+            self.hover_text_color = None
+        return self
+
 
     @staticmethod
     def default_button(screen: pygame.Surface, font: pygame.font.Font, text: str = "Default Button") -> "ButtonBuilder":
@@ -207,11 +238,39 @@ class ButtonBuilder:
             A pre-configured ButtonBuilder instance
         """
         return (ButtonBuilder(screen, font, text)
-                .set_is_background_visible(True)
-                .set_background_color((0, 0, 0))
+                .set_style(DEFAULT_BUTTON_STYLE)
                 .set_size(500, 70)
                 )
 
+    @staticmethod
+    def menu_button(screen: pygame.Surface, font: pygame.font.Font, text: str = "Menu Button") -> "ButtonBuilder":
+        """
+        Creates a ButtonBuilder for the text-only buttons used by the menu screens:
+        no background, highlighted text on hover.
+        """
+        return ButtonBuilder(screen, font, text).set_style(MENU_BUTTON_STYLE)
+
+    def build_style(self) -> ButtonStyle:
+        """The shared style matching this builder's styling fields."""
+        return ButtonStyle.create(
+            bg_color=self.bg_color,
+            hover_color=self.hover_color,
+            text_color=self.text_color,
+            hover_text_color=self.hover_text_color,
+            border_color=self.border_color,
+            border_width=self.border_width,
+            visible_background=self.visible_background,
+            debug_hitbox=self.debug_hitbox,
+            debug_color=self.debug_color,
+            text_align=self.text_align,
+            shape=self.shape,
+            shape_params=self.shape_params,
+            badge_color=self.badge_color,
+            badge_position=self.badge_position,
+            toggle_color=self.toggle_color,
+            animation_speed=self.animation_speed,
+        )
+
     # ----- FINAL BUILD METHOD -----
     def build(self) -> Button:
         """
@@ -221,7 +280,11 @@ class ButtonBuilder:
         """
         # Determine final x,y based on offsets if x,y not explicitly set
         screen_width, screen_height = self.screen.get_size()
-        if self.x is not None and self.y is not None:
+        if self.layout_node is not None:
+            # The node takes the button's size; the layout decides where it goes
+            self.layout_node.set_size(self.width, self.height)
+            button_rect = self.layout_node.resolve()
+        elif self.x is not None and self.y is not None:
             button_rect = pygame.Rect(self.x, self.y, self.width, self.height)
         else:
             button_rect = pygame.Rect(
@@ -248,33 +311,21 @@ class ButtonBuilder:
             font=self.font,
             on_click=self.on_click or (lambda: logging.info(f"{self.text} clicked!")),
             music_manager=self.music_manager,
-            bg_color=self.bg_color,
-            hover_color=self.hover_color,
-            text_color=self.text_color,
-            hover_text_color=self.hover_text_color,
-            border_color=self.border_color,
-            border_width=self.border_width,
-            visible_background=self.visible_background,
-            debug_hitbox=self.debug_hitbox,
-            debug_color=self.debug_color,
+            style=self.build_style(),
             icon=self.icon,
             tooltip=self.tooltip,
             disabled=self.disabled,
-            animation_speed=self.animation_speed,
             hover_text=self.hover_text,
             sound_path=self.sound_path,
             hover_sound_path=self.hover_sound_path,
-            text_align=self.text_align,
-            shape=self.shape,
-            shape_params=self.shape_params,
             badge_text=self.badge_text,
-            badge_color=self.badge_color,
-            badge_position=self.badge_position,
             shortcut_key=self.shortcut_key,
             toggle_mode=self.toggle_mode,
             toggled=self.toggled,
-            toggle_color=self.toggle_color,
             translation_func=self.translation_func
         )
 
+        if self.layout_node is not None:
+            self.layout_node.bind(btn)
+
         return btn
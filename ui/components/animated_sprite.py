@@ -0,0 +1,108 @@
+import time
+from typing import Optional, Tuple
+
+import pygame
+
+from engine.animation import animation_cache
+from config import SPRITE_SHEET_FRAME_MS
+
+
+class AnimatedSprite:
+    """
+    A widget that plays a GIF or sprite sheet at `rect`, at the speed its
+    frame lengths say, whatever the frame rate.
+
+    Frames come from the shared `animation_cache`, so every sprite playing
+    the same file at the same scale uses one set of decoded frames. Until
+    the first frame has been decoded the sprite draws nothing. `update()`
+    moves it on by the real time since the last call; a frame that is
+    still being decoded (when streaming) holds the one before on screen.
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        path: str,
+        pos: Tuple[int, int] = (0, 0),
+        scale: float = 1.0,
+        loop: bool = True,
+        speed: float = 1.0,
+        frame_size: Optional[Tuple[int, int]] = None,
+        frame_ms: int = SPRITE_SHEET_FRAME_MS,
+    ) -> None:
+        self.screen = screen
+        self.frames = animation_cache.acquire(path, scale, frame_size, frame_ms)
+        self.rect = pygame.Rect(pos, self.frames.size)
+        self.loop = loop
+        self.speed = speed
+        self.playing = True
+        self.index = 0
+        # Milliseconds the current frame has been shown for
+        self.elapsed = 0.0
+        self._last_update = time.perf_counter()
+
+    @property
+    def image(self) -> Optional[pygame.Surface]:
+        return self.frames.frame(self.index) if self.frames.ready(self.index) else None
+
+    def play(self) -> None:
+        if not self.playing:
+            self.playing = True
+            self._last_update = time.perf_counter()
+
+    def pause(self) -> None:
+        self.playing = False
+
+    def rewind(self) -> None:
+        self.index = 0
+        self.elapsed = 0.0
+        self.frames.showing(0)
+
+    def update(self) -> bool:
+        """
+        Advance by the time since the last call.
+
+        Returns:
+            True while the animation is playing (or waiting for frames).
+        """
+        now = time.perf_counter()
+        dt, self._last_update = now - self._last_update, now
+        frames = self.frames
+        if not self.playing or frames.failed:
+            return False
+        if not frames.ready(self.index):
+            return True
+
+        # After a long stall, skip whole loops rather than play them through
+        self.elapsed = min(self.elapsed + dt * 1000 * self.speed, sum(frames.durations))
+        while self.elapsed >= frames.durations[self.index]:
+            following = self.index + 1
+            if following == frames.count:
+                if not self.loop:
+                    self.playing = False
+                    break
+                following = 0
+            if not frames.ready(following):
+                # Streaming and not decoded yet; carry on when it is
+                self.elapsed = frames.durations[self.index]
+                break
+            self.elapsed -= frames.durations[self.index]
+            self.index = following
+        frames.showing(self.index)
+        return self.playing
+
+    def draw(self) -> None:
+        image = self.image
+        if image is not None:
+            self.screen.blit(image, self.rect)
+
+    def get_draw_bounds(self) -> pygame.Rect:
+        return self.rect.copy()
+
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        return False
+
+    def release_resources(self) -> None:
+        if self.frames is not None:
+            animation_cache.release(self.frames)
+            self.frames = None
@@ -1,8 +1,13 @@
 import logging
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import pygame
 from engine.music import MusicManager
+from engine.resource_manager import AssetHandle, resource_manager
+from ui.components.style import ButtonStyle
+from ui.text_cache import global_text_cache
+from ui.tween import tween_scheduler
+from config import BUTTON_HOVER_FADE_MS, TOOLTIP_FADE_MS, CLICK_FLASH_MS
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -11,6 +16,9 @@ class Button:
     """
     A versatile button class for pygame interfaces with advanced features.
 
+    Only per-button state lives on the instance (in slots); colours, borders,
+    shape, badge and toggle styling come from a shared, immutable ButtonStyle.
+
     Class Attributes:
       instances: Buttons with textual labels.
       all_buttons: All button instances used for keyboard navigation.
@@ -21,6 +29,16 @@ class Button:
     all_buttons: List["Button"] = []
     all_sliders: List[Any] = []  # List of slider instances (type from SliderButton if desired)
 
+    __slots__ = (
+        "rect", "original_text", "hover_text", "text", "id", "screen", "font", "on_click",
+        "style", "icon", "tooltip", "disabled", "hovered", "clicked",
+        "hover_alpha", "tooltip_alpha", "click_effect",
+        "sound_path", "hover_sound_path", "sounds_loaded",
+        "_tooltip_font_handle", "_click_sound_handle", "_hover_sound_handle", "_icon_handle",
+        "badge_text", "shortcut_key", "toggle_mode", "toggled", "group",
+        "translation_func", "music_manager",
+    )
+
     def __init__(
         self,
         rect: pygame.Rect,
@@ -38,7 +56,7 @@ class Button:
         visible_background: bool = True,
         debug_hitbox: bool = False,
         debug_color: Tuple[int, int, int] = (255, 0, 0),
-        icon: Optional[pygame.Surface] = None,
+        icon: Optional[Union[pygame.Surface, str]] = None,
         tooltip: Optional[str] = None,
         disabled: bool = False,
         sound_path: Optional[str] = None,
@@ -56,11 +74,16 @@ class Button:
         translation_func: Optional[Callable[[str], str]] = None,
         animation_speed: int = 5,
         hover_text: Optional[str] = None,
-        music_manager: Optional[MusicManager] = None
+        music_manager: Optional[MusicManager] = None,
+        style: Optional[ButtonStyle] = None,
     ) -> None:
+        """
+        Initialize a new Button instance with advanced features.
 
-
-        """Initialize a new Button instance with advanced features."""
+        If `style` is given it is used as-is and the individual styling
+        arguments (colours, border, shape, badge/toggle colours, alignment,
+        animation speed) are ignored; otherwise a shared style is built from them.
+        """
         self.rect = rect
         self.original_text = text
         self.hover_text = hover_text or text
@@ -69,19 +92,33 @@ class Button:
         self.screen = screen
         self.font = font
         self.on_click = on_click
-        self.bg_color = bg_color
-        self.hover_color = hover_color
-        self.text_color = text_color
-        self.hover_text_color = hover_text_color or text_color
-        self.border_color = border_color
-        self.border_width = border_width
-        self.visible_background = visible_background
-        self.show_hitbox = debug_hitbox
-        self.hitbox_color = debug_color
+        self.style = style or ButtonStyle.create(
+            bg_color=bg_color,
+            hover_color=hover_color,
+            text_color=text_color,
+            hover_text_color=hover_text_color,
+            border_color=border_color,
+            border_width=border_width,
+            visible_background=visible_background,
+            debug_hitbox=debug_hitbox,
+            debug_color=debug_color,
+            text_align=text_align,
+            shape=shape,
+            shape_params=shape_params,
+            badge_color=badge_color,
+            badge_position=badge_position,
+            toggle_color=toggle_color,
+            animation_speed=animation_speed,
+        )
+        # An icon given as a path is shared through the resource manager, cut
+        # from a sprite sheet when the asset cache has packed it
+        self._icon_handle: Optional[AssetHandle] = None
+        if isinstance(icon, str):
+            self._icon_handle = resource_manager.acquire_image(icon)
+            icon = self._icon_handle.get()
         self.icon = icon
         self.tooltip = tooltip
         self.disabled = disabled
-        self.animation_speed = animation_speed
 
         # State flags
         self.hovered: bool = False
@@ -93,20 +130,15 @@ class Button:
         self.click_effect: int = 0
 
         # Advanced features
-        self.tooltip_font = pygame.font.Font(None, 20)
+        self._tooltip_font_handle: AssetHandle = resource_manager.acquire_font(None, 20)
         self.sound_path = sound_path
         self.hover_sound_path = hover_sound_path
         self.sounds_loaded: bool = False
-        self.text_align = text_align
-        self.shape = shape
-        self.shape_params = shape_params or {}
         self.badge_text = badge_text
-        self.badge_color = badge_color
-        self.badge_position = badge_position
         self.shortcut_key = shortcut_key
         self.toggle_mode = toggle_mode
         self.toggled = toggled
-        self.toggle_color = toggle_color
+        self.group: Optional[Any] = None
         self.translation_func = translation_func
 
         # Music manager for playing sounds (if provided)
@@ -120,53 +152,86 @@ class Button:
         self._load_sounds()
 
     def _load_sounds(self) -> None:
-        """Load sound effects if available; log errors if they occur."""
+        """
+        Acquire shared handles on the sound effects and start decoding them in
+        the background, so the first hover doesn't wait on the disk.
+        """
+        self._click_sound_handle = None
+        self._hover_sound_handle = None
         if not pygame.mixer.get_init():
             logging.debug("Pygame mixer not initialized; skipping sound loading.")
             return
 
-        try:
-            self.click_sound = pygame.mixer.Sound(self.sound_path) if self.sound_path else None
-            self.hover_sound = pygame.mixer.Sound(self.hover_sound_path) if self.hover_sound_path else None
-            self.sounds_loaded = True
-        except Exception as e:
-            logging.exception(f"Error loading sounds for button '{self.id}': {e}")
+        if self.sound_path:
+            self._click_sound_handle = resource_manager.acquire_sound(self.sound_path).prefetch()
+        if self.hover_sound_path:
+            self._hover_sound_handle = resource_manager.acquire_sound(self.hover_sound_path).prefetch()
+        self.sounds_loaded = True
+
+    @property
+    def click_sound(self) -> Optional[pygame.mixer.Sound]:
+        return self._click_sound_handle.get() if self._click_sound_handle else None
+
+    @property
+    def hover_sound(self) -> Optional[pygame.mixer.Sound]:
+        return self._hover_sound_handle.get() if self._hover_sound_handle else None
+
+    @property
+    def tooltip_font(self) -> pygame.font.Font:
+        return self._tooltip_font_handle.get()
+
+    def release_resources(self) -> None:
+        """Release this button's shared assets. Call when the button is discarded."""
+        for handle in (self._click_sound_handle, self._hover_sound_handle, self._tooltip_font_handle, self._icon_handle):
+            if handle:
+                handle.release()
+        tween_scheduler.cancel(self)
 
     def draw(self) -> None:
         """Draw the button on the screen with appropriate visual effects."""
+        style = self.style
+
         # Select colors based on state
         if self.disabled:
-            bg_color = tuple(max(0, c - 50) for c in self.bg_color)
-            border_color = tuple(max(0, c - 50) for c in self.border_color)
-            text_color = tuple(max(0, c - 100) for c in self.text_color)
+            bg_color = tuple(max(0, c - 50) for c in style.bg_color)
+            border_color = tuple(max(0, c - 50) for c in style.border_color)
+            text_color = tuple(max(0, c - 100) for c in style.text_color)
         elif self.toggled and self.toggle_mode:
-            bg_color = self.toggle_color
-            border_color = self.border_color
-            text_color = self.text_color
-        elif self.hovered:
-            bg_color = self.hover_color
-            border_color = self.border_color
-            text_color = self.hover_text_color
+            bg_color = style.toggle_color
+            border_color = style.border_color
+            text_color = style.text_color
+        elif self.hovered or self.hover_alpha:
+            # hover_alpha fades the background between its normal and hover colours
+            t = self.hover_alpha / 255
+            bg_color = tuple(int(a + (b - a) * t) for a, b in zip(style.bg_color, style.hover_color))
+            border_color = style.border_color
+            text_color = style.hover_text_color if self.hovered else style.text_color
         else:
-            bg_color = self.bg_color
-            border_color = self.border_color
-            text_color = self.text_color
+            bg_color = style.bg_color
+            border_color = style.border_color
+            text_color = style.text_color
 
         # Draw the button background by shape
-        if self.visible_background:
-            if self.shape == "rectangle":
+        if style.visible_background:
+            if style.shape == "rectangle":
                 pygame.draw.rect(self.screen, bg_color, self.rect, border_radius=5)
-                if self.border_width > 0:
-                    pygame.draw.rect(self.screen, border_color, self.rect, width=self.border_width, border_radius=5)
-            elif self.shape == "circle":
-                radius = self.shape_params.get("radius", min(self.rect.width, self.rect.height) // 2)
+                if style.border_width > 0:
+                    pygame.draw.rect(self.screen, border_color, self.rect, width=style.border_width, border_radius=5)
+            elif style.shape == "circle":
+                radius = style.shape_param("radius", min(self.rect.width, self.rect.height) // 2)
                 pygame.draw.circle(self.screen, bg_color, self.rect.center, radius)
-                if self.border_width > 0:
-                    pygame.draw.circle(self.screen, border_color, self.rect.center, radius, width=self.border_width)
+                if style.border_width > 0:
+                    pygame.draw.circle(self.screen, border_color, self.rect.center, radius, width=style.border_width)
+
+            # Brief flash after a click, fading out through click_effect
+            if self.click_effect > 0:
+                flash = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+                flash.fill((255, 255, 255, self.click_effect // 4))
+                self.screen.blit(flash, self.rect)
 
         # Optionally draw a semi-transparent hitbox for debugging
-        if self.show_hitbox:
-            hitbox_color = self.hitbox_color + ((100,) if len(self.hitbox_color) == 3 else ())
+        if style.debug_hitbox:
+            hitbox_color = style.debug_color + ((100,) if len(style.debug_color) == 3 else ())
             hitbox_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
             pygame.draw.rect(hitbox_surface, hitbox_color, hitbox_surface.get_rect(), width=1, border_radius=5)
             self.screen.blit(hitbox_surface, self.rect)
@@ -179,9 +244,9 @@ class Button:
         if self.icon:
             icon_rect = self.icon.get_rect(center=self.rect.center)
             if self.text:
-                if self.text_align == "left":
+                if style.text_align == "left":
                     icon_rect.left = self.rect.left + 10
-                elif self.text_align == "right":
+                elif style.text_align == "right":
                     icon_rect.right = self.rect.right - 10
                 else:
                     icon_rect.centerx = self.rect.centerx - len(self.text) * 4
@@ -204,13 +269,14 @@ class Button:
         line_spacing = 2
         total_height = sum(self.font.size(line)[1] for line in lines) + (line_spacing * (len(lines) - 1))
         y = self.rect.centery - total_height // 2
+        text_align = self.style.text_align
 
         for line in lines:
-            text_surf = self.font.render(line, True, text_color)
+            text_surf = global_text_cache.render_text(self.font, line, text_color)
             text_rect = text_surf.get_rect()
-            if self.text_align == "left":
-                text_rect.left = self.rect.left + 10
-            elif self.text_align == "right":
+            if text_align == "left":
+                text_rect.left = self._text_left()
+            elif text_align == "right":
                 text_rect.right = self.rect.right - 10
             else:
                 text_rect.centerx = self.rect.centerx
@@ -218,63 +284,120 @@ class Button:
             self.screen.blit(text_surf, text_rect)
             y += text_rect.height + line_spacing
 
-    def _draw_badge(self) -> None:
-        """Draw a notification badge on the button."""
-        badge_font = pygame.font.Font(None, 20)
-        badge_surf = badge_font.render(str(self.badge_text), True, (255, 255, 255))
-        badge_rect = badge_surf.get_rect()
+    def _text_left(self) -> int:
+        """Left edge of left-aligned text: past the icon, which sits at the left too."""
+        if self.icon:
+            return self.rect.left + self.icon.get_width() + 20
+        return self.rect.left + 10
 
+    def _badge_rect(self, text_size: Tuple[int, int]) -> pygame.Rect:
+        """Where the badge background goes for badge text of the given size."""
         padding = 4
-        badge_bg_width = max(badge_rect.width + padding * 2, badge_rect.height + padding)
-        badge_bg_height = badge_rect.height + padding
+        badge_bg_width = max(text_size[0] + padding * 2, text_size[1] + padding)
+        badge_bg_height = text_size[1] + padding
+        badge_position = self.style.badge_position
 
-        if self.badge_position == "topleft":
+        if badge_position == "topleft":
             badge_x = self.rect.left - badge_bg_width // 2
             badge_y = self.rect.top - badge_bg_height // 2
-        elif self.badge_position == "topright":
+        elif badge_position == "topright":
             badge_x = self.rect.right - badge_bg_width // 2
             badge_y = self.rect.top - badge_bg_height // 2
-        elif self.badge_position == "bottomleft":
+        elif badge_position == "bottomleft":
             badge_x = self.rect.left - badge_bg_width // 2
             badge_y = self.rect.bottom - badge_bg_height // 2
         else:  # bottomright
             badge_x = self.rect.right - badge_bg_width // 2
             badge_y = self.rect.bottom - badge_bg_height // 2
+        return pygame.Rect(badge_x, badge_y, badge_bg_width, badge_bg_height)
+
+    def _tooltip_rect(self, text_size: Tuple[int, int]) -> pygame.Rect:
+        """Where the tooltip background goes for tooltip text of the given size."""
+        padding = 5
+        return pygame.Rect(
+            self.rect.centerx - (text_size[0] + padding * 2) // 2,
+            self.rect.top - text_size[1] - padding * 2 - 5,
+            text_size[0] + padding * 2,
+            text_size[1] + padding * 2,
+        )
+
+    def get_draw_bounds(self) -> pygame.Rect:
+        """
+        The screen area `draw()` paints in the current state. Text, icon,
+        badge and tooltip may all reach outside `rect`.
+        """
+        style = self.style
+        bounds = self.rect.copy()
+        if style.shape == "circle":
+            radius = style.shape_param("radius", min(self.rect.width, self.rect.height) // 2)
+            bounds.union_ip(pygame.Rect(0, 0, radius * 2 + 1, radius * 2 + 1).move(
+                self.rect.centerx - radius, self.rect.centery - radius))
+
+        text = self.hover_text if self.hovered else self.original_text
+        if text:
+            sizes = [self.font.size(line) for line in text.split('\n')]
+            text_rect = pygame.Rect(0, 0, max(w for w, _ in sizes), sum(h for _, h in sizes) + 2 * (len(sizes) - 1))
+            text_rect.y = self.rect.centery - text_rect.height // 2
+            if style.text_align == "left":
+                text_rect.left = self._text_left()
+            elif style.text_align == "right":
+                text_rect.right = self.rect.right - 10
+            else:
+                text_rect.centerx = self.rect.centerx
+            bounds.union_ip(text_rect)
+
+        if self.icon:
+            bounds.union_ip(self.icon.get_rect(center=self.rect.center).inflate(len(self.text or "") * 8 + 20, 0))
+        if self.badge_text:
+            bounds.union_ip(self._badge_rect(self.tooltip_font.size(str(self.badge_text))))
+        if self.hovered and self.tooltip:
+            bounds.union_ip(self._tooltip_rect(self.tooltip_font.size(self.tooltip)))
+        return bounds
+
+    def _draw_badge(self) -> None:
+        """Draw a notification badge on the button."""
+        badge_surf = self.tooltip_font.render(str(self.badge_text), True, (255, 255, 255))
+        badge_bg_rect = self._badge_rect(badge_surf.get_size())
+        badge_x, badge_y, badge_bg_width, badge_bg_height = badge_bg_rect
+        badge_color = self.style.badge_color
 
         if abs(badge_bg_width - badge_bg_height) <= 2:
             radius = max(badge_bg_width, badge_bg_height) // 2
-            pygame.draw.circle(self.screen, self.badge_color, (badge_x + badge_bg_width // 2, badge_y + badge_bg_height // 2), radius)
+            pygame.draw.circle(self.screen, badge_color, (badge_x + badge_bg_width // 2, badge_y + badge_bg_height // 2), radius)
         else:
-            badge_bg_rect = pygame.Rect(badge_x, badge_y, badge_bg_width, badge_bg_height)
-            pygame.draw.rect(self.screen, self.badge_color, badge_bg_rect, border_radius=badge_bg_height // 2)
+            pygame.draw.rect(self.screen, badge_color, badge_bg_rect, border_radius=badge_bg_height // 2)
 
         badge_text_rect = badge_surf.get_rect(center=(badge_x + badge_bg_width // 2, badge_y + badge_bg_height // 2))
         self.screen.blit(badge_surf, badge_text_rect)
 
     def _draw_tooltip(self) -> None:
         """Draw a tooltip when the button is hovered over."""
-        if self.tooltip_alpha < 255:
-            self.tooltip_alpha = min(255, self.tooltip_alpha + 15)
         tooltip_surf = self.tooltip_font.render(self.tooltip, True, (255, 255, 255))
-        tooltip_rect = tooltip_surf.get_rect()
+        tooltip_surf.set_alpha(self.tooltip_alpha)
+        background_rect = self._tooltip_rect(tooltip_surf.get_size())
         padding = 5
-        background = pygame.Surface((tooltip_rect.width + padding * 2, tooltip_rect.height + padding * 2))
+        background = pygame.Surface(background_rect.size)
         background.fill((0, 0, 0))
         background.set_alpha(min(200, self.tooltip_alpha))
-        tooltip_pos = (
-            self.rect.centerx - (tooltip_rect.width + padding * 2) // 2,
-            self.rect.top - tooltip_rect.height - padding * 2 - 5
-        )
+        tooltip_pos = background_rect.topleft
         self.screen.blit(background, tooltip_pos)
         self.screen.blit(tooltip_surf, (tooltip_pos[0] + padding, tooltip_pos[1] + padding))
 
-    def _animate_value(self, current: int, target: int) -> int:
-        """Animate a numerical value toward a target value."""
-        if current < target:
-            return min(current + self.animation_speed, target)
-        elif current > target:
-            return max(current - self.animation_speed, target)
-        return current
+    def _animation_ms(self, base_ms: int) -> float:
+        """Scale a default duration by animation_speed (5 is the default; higher is faster)."""
+        speed = self.style.animation_speed
+        return base_ms * 5 / speed if speed > 0 else 0
+
+    def _start_hover_animation(self, hovering: bool) -> None:
+        """Fade the hover highlight and tooltip in or out."""
+        target = 255 if hovering else 0
+        tween_scheduler.animate(self, "hover_alpha", target, self._animation_ms(BUTTON_HOVER_FADE_MS))
+        if self.tooltip:
+            tween_scheduler.animate(self, "tooltip_alpha", target, self._animation_ms(TOOLTIP_FADE_MS) if hovering else 0)
+
+    def _start_click_animation(self) -> None:
+        self.click_effect = 255
+        tween_scheduler.animate(self, "click_effect", 0, self._animation_ms(CLICK_FLASH_MS))
 
     def handle_event(self, event: pygame.event.Event) -> bool:
         """
@@ -289,11 +412,12 @@ class Button:
         mouse_pos = pygame.mouse.get_pos()
 
         # Determine whether the mouse hovers over the button based on its shape.
-        if self.shape == "rectangle":
+        shape = self.style.shape
+        if shape == "rectangle":
             is_hovering = self.rect.collidepoint(mouse_pos)
-        elif self.shape == "circle":
+        elif shape == "circle":
             center = self.rect.center
-            radius = self.shape_params.get("radius", min(self.rect.width, self.rect.height) // 2)
+            radius = self.style.shape_param("radius", min(self.rect.width, self.rect.height) // 2)
             dx = center[0] - mouse_pos[0]
             dy = center[1] - mouse_pos[1]
             is_hovering = (dx * dx + dy * dy) <= (radius * radius)
@@ -302,6 +426,8 @@ class Button:
 
         was_hovering = self.hovered
         self.hovered = is_hovering
+        if is_hovering != was_hovering:
+            self._start_hover_animation(is_hovering)
 
         if is_hovering and not was_hovering:
             if self.hover_sound and self.sounds_loaded:
@@ -318,6 +444,7 @@ class Button:
 
         elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
             if self.clicked and is_hovering:
+                self._start_click_animation()
                 if self.click_sound and self.sounds_loaded:
                     if self.music_manager:
                         self.music_manager.play_sound(self.click_sound)
@@ -0,0 +1,303 @@
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import pygame
+
+from ui.components.button import Button
+from ui.scene import button_signature
+from ui.tween import tween_scheduler
+from config import SCROLL_DRAG_THRESHOLD, SCROLL_FRICTION
+
+# Below this speed, in pixels per second, a glide stops
+MIN_GLIDE_SPEED = 20.0
+# A release takes its fling speed from the drag's last stretch of this many seconds
+FLING_WINDOW = 0.1
+# Marks the pixels of a cached row that are not part of it
+ROW_COLORKEY = (255, 0, 254)
+
+
+class ScrollList:
+    """
+    A vertical list of `count` rows inside `rect`, where only the rows in
+    view exist as Buttons.
+
+    `create_row()` builds a Button (usually with a ButtonBuilder) and
+    `bind_row(button, index)` points it at item `index`: text, icon,
+    on_click. When the list scrolls, rows that leave the view are reset and
+    handed to the items coming into view, so a list of thousands of items
+    holds only a screenful of widgets.
+
+    Scrolling is kinetic: the mouse wheel and a flung drag set the list
+    gliding, slowed by `SCROLL_FRICTION`, and `update()` moves it each
+    frame. Each row is rendered once into a surface kept until the row's
+    appearance changes, so a scrolling frame is one blit per row in view
+    however long the list is. Rows are drawn clipped to `rect`.
+    """
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        rect: pygame.Rect,
+        count: int,
+        row_height: int,
+        create_row: Callable[[], Button],
+        bind_row: Callable[[Button, int], None],
+        spacing: int = 0,
+        friction: float = SCROLL_FRICTION,
+    ) -> None:
+        self.screen = screen
+        self.rect = pygame.Rect(rect)
+        self.count = count
+        self.row_height = row_height
+        self.spacing = spacing
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.scroll = 0.0
+
+        # Kinetic scrolling, in pixels per second
+        self.friction = friction
+        self.velocity = 0.0
+        self._last_update = time.perf_counter()
+        # Mouse y and scroll offset when the left button went down in the list
+        self._press: Optional[Tuple[int, float]] = None
+        self.dragging = False
+        self._drag_samples: Deque[Tuple[float, int]] = deque()
+
+        # Item index -> the row showing it
+        self.rows: Dict[int, Button] = {}
+        self.rows_created = 0
+        self._free: List[Button] = []
+        self._placed: Optional[tuple] = None
+        # Row -> (appearance, the row rendered on its own, blend flags)
+        self._surfaces: Dict[Button, Tuple[Any, pygame.Surface, int]] = {}
+        self.rows_rendered = 0
+
+    # ----- Geometry -----
+    @property
+    def pitch(self) -> int:
+        return self.row_height + self.spacing
+
+    @property
+    def max_scroll(self) -> float:
+        return max(0, self.count * self.pitch - self.spacing - self.rect.height)
+
+    def visible_range(self) -> range:
+        """Indices of the items at least partly in view."""
+        first = int(self.scroll // self.pitch)
+        last = int((self.scroll + self.rect.height) // self.pitch) + 1
+        return range(max(0, first), min(self.count, last))
+
+    def row_rect(self, index: int) -> pygame.Rect:
+        return pygame.Rect(self.rect.x, self.rect.y + index * self.pitch - int(self.scroll),
+                           self.rect.width, self.row_height)
+
+    # ----- Scrolling -----
+    def scroll_to(self, offset: float) -> None:
+        offset = min(max(0.0, offset), self.max_scroll)
+        if offset != self.scroll:
+            self.scroll = offset
+            self.sync()
+
+    def scroll_by(self, delta: float) -> None:
+        self.scroll_to(self.scroll + delta)
+
+    def fling(self, distance: float) -> None:
+        """Start a glide that comes to rest about `distance` pixels further on."""
+        self.velocity += distance * self.friction
+
+    def stop(self) -> None:
+        self.velocity = 0.0
+
+    def update(self) -> bool:
+        """
+        Move a glide on by the time since the last call.
+
+        Returns:
+            True while the list is still gliding.
+        """
+        now = time.perf_counter()
+        dt, self._last_update = now - self._last_update, now
+        if not self.velocity or self.dragging:
+            return False
+        # Exponential slowdown, integrated exactly so the glide doesn't depend on frame rate
+        decay = math.exp(-self.friction * dt)
+        before = self.scroll
+        self.scroll_by(self.velocity * (1 - decay) / self.friction)
+        self.velocity *= decay
+        if abs(self.velocity) < MIN_GLIDE_SPEED or self.scroll == before:
+            self.velocity = 0.0  # Slowed to a stop, or ran into an end
+        return bool(self.velocity)
+
+    def set_count(self, count: int) -> None:
+        """Change the number of items; every row in view is bound again."""
+        self.count = count
+        self.scroll = min(self.scroll, self.max_scroll)
+        self.refresh_rows()
+
+    def refresh_rows(self) -> None:
+        """Bind the rows in view again, e.g. after their items changed."""
+        for row in self.rows.values():
+            self._recycle(row)
+        self.rows.clear()
+        self.sync()
+
+    # ----- Rows -----
+    def sync(self) -> None:
+        """Give every item in view a row and put the rows in place."""
+        visible = self.visible_range()
+        for index in [index for index in self.rows if index not in visible]:
+            self._recycle(self.rows.pop(index))
+        for index in visible:
+            row = self.rows.get(index)
+            if row is None:
+                row = self._free.pop() if self._free else self._new_row()
+                self.bind_row(row, index)
+                self.rows[index] = row
+            row.rect.update(self.row_rect(index))
+        self._placed = (tuple(self.rect), self.scroll, self.count)
+
+    def _new_row(self) -> Button:
+        self.rows_created += 1
+        return self.create_row()
+
+    def _recycle(self, row: Button) -> None:
+        """Forget a row's hover and click state before it shows another item."""
+        tween_scheduler.cancel(row)
+        row.hovered = row.clicked = False
+        row.hover_alpha = row.tooltip_alpha = row.click_effect = 0
+        self._free.append(row)
+
+    def _ensure_placed(self) -> None:
+        # The layout moves `rect` in place, e.g. on a window resize
+        if self._placed != (tuple(self.rect), self.scroll, self.count):
+            self.scroll = min(self.scroll, self.max_scroll)
+            self.sync()
+
+    def _row_surface(self, row: Button) -> Tuple[pygame.Surface, int]:
+        """
+        The row as drawn at the top-left of a surface of its own size, and
+        the blend flags to blit it with. Rendered again only when it changes.
+        """
+        appearance = (row.rect.size,) + button_signature(row)[1:]
+        cached = self._surfaces.get(row)
+        if cached is not None and cached[0] == appearance:
+            return cached[1], cached[2]
+
+        # An opaque row only lets the background through its rounded
+        # corners, which a run-length encoded colour key skips cheaply. The
+        # click flash and debug hitbox blend over the corners too.
+        opaque = row.style.visible_background and not row.click_effect and not row.style.debug_hitbox
+        if opaque:
+            surface = pygame.Surface(row.rect.size)
+            surface.fill(ROW_COLORKEY)
+        else:
+            surface = pygame.Surface(row.rect.size, pygame.SRCALPHA)
+        screen, rect = row.screen, row.rect
+        row.screen, row.rect = surface, surface.get_rect()
+        try:
+            row.draw()
+        finally:
+            row.screen, row.rect = screen, rect
+        if opaque:
+            surface.set_colorkey(ROW_COLORKEY, pygame.RLEACCEL)
+            flags = 0
+        else:
+            surface = surface.premul_alpha()
+            flags = pygame.BLEND_PREMULTIPLIED
+        self._surfaces[row] = (appearance, surface, flags)
+        self.rows_rendered += 1
+        return surface, flags
+
+    # ----- Widget interface -----
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        """
+        Scroll on the mouse wheel or a drag; pass other events to the rows
+        in view. A press that moves further than `SCROLL_DRAG_THRESHOLD`
+        becomes a drag and clicks nothing.
+        """
+        self._ensure_placed()
+        mouse_pos = getattr(event, "pos", None) or pygame.mouse.get_pos()
+        in_view = self.rect.collidepoint(mouse_pos)
+        if event.type == pygame.MOUSEWHEEL:
+            if in_view:
+                self.fling(-event.y * self.pitch)
+                return True
+            return False
+
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and in_view:
+            # Touching a gliding list stops it
+            self.stop()
+            self._press = (mouse_pos[1], self.scroll)
+            self._drag_samples.clear()
+            self._drag_samples.append((time.perf_counter(), mouse_pos[1]))
+        elif event.type == pygame.MOUSEMOTION and self._press is not None:
+            if self._drag(mouse_pos[1]):
+                return True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self._press is not None:
+            self._press = None
+            if self.dragging:
+                self._release(mouse_pos[1])
+                return True
+
+        if not in_view:
+            # Rows half out of view only react where they can be seen
+            for row in self.rows.values():
+                if row.hovered:
+                    row.hovered = row.clicked = False
+                    row._start_hover_animation(False)
+            return False
+
+        result = False
+        for row in list(self.rows.values()):
+            result = row.handle_event(event) or result
+        return result
+
+    def _drag(self, y: int) -> bool:
+        """Follow the mouse once the press has moved far enough. True while dragging."""
+        press_y, press_scroll = self._press
+        if not self.dragging:
+            if abs(y - press_y) < SCROLL_DRAG_THRESHOLD:
+                return False
+            self.dragging = True
+            for row in self.rows.values():
+                row.clicked = False
+        now = time.perf_counter()
+        self._drag_samples.append((now, y))
+        while len(self._drag_samples) > 2 and now - self._drag_samples[0][0] > FLING_WINDOW:
+            self._drag_samples.popleft()
+        self.scroll_to(press_scroll - (y - press_y))
+        return True
+
+    def _release(self, y: int) -> None:
+        """End a drag, flinging the list on at the speed the mouse was last moving."""
+        self.dragging = False
+        now = time.perf_counter()
+        self._drag_samples.append((now, y))
+        recent = [(t, sample_y) for t, sample_y in self._drag_samples if now - t <= FLING_WINDOW]
+        self._drag_samples.clear()
+        if len(recent) > 1 and recent[-1][0] > recent[0][0]:
+            self.velocity = -(recent[-1][1] - recent[0][1]) / (recent[-1][0] - recent[0][0])
+            self._last_update = now
+
+    def draw(self) -> None:
+        self._ensure_placed()
+        clip = self.screen.get_clip()
+        self.screen.set_clip(clip.clip(self.rect))
+        blits = []
+        for row in self.rows.values():
+            surface, flags = self._row_surface(row)
+            blits.append((surface, row.rect, None, flags))
+        self.screen.blits(blits, doreturn=False)
+        self.screen.set_clip(clip)
+
+    def get_draw_bounds(self) -> pygame.Rect:
+        return self.rect.copy()
+
+    def release_resources(self) -> None:
+        for row in list(self.rows.values()) + self._free:
+            row.release_resources()
+        self.rows.clear()
+        self._free.clear()
+        self._surfaces.clear()
@@ -2,7 +2,9 @@ import logging
 from typing import Optional, Callable, Tuple
 
 import pygame
+from engine.resource_manager import AssetHandle, resource_manager
 from ui.components.button import Button
+from ui.components.style import SliderStyle
 
 # Set up logging configuration
 logging.basicConfig(level=logging.DEBUG)
@@ -21,9 +23,7 @@ class SliderButton:
         current_value (int): The current slider value.
         step (int): The step increment when changing values.
         label (Optional[str]): Optional label displayed above the slider.
-        bg_color (Tuple[int, int, int]): Background color of the slider track.
-        hover_color (Tuple[int, int, int]): Color of the slider when hovered.
-        text_color (Tuple[int, int, int]): Color for rendering text.
+        style (SliderStyle): Shared track, hover and text colours.
         disabled (bool): If True, the slider is disabled.
         tooltip (Optional[str]): Tooltip text shown when hovering.
         sound_path (Optional[str]): Path for the click sound.
@@ -31,6 +31,13 @@ class SliderButton:
         on_value_change (Optional[Callable[[int], None]]): Callback when the slider value changes.
     """
 
+    __slots__ = (
+        "screen", "font", "rect", "min_value", "max_value", "current_value", "step", "label",
+        "style", "disabled", "tooltip", "sound_path", "hover_sound_path",
+        "is_hovered", "is_dragging", "on_value_change",
+        "_click_sound_handle", "_hover_sound_handle", "_tooltip_font_handle",
+    )
+
     def __init__(
         self,
         screen: pygame.Surface,
@@ -51,6 +58,7 @@ class SliderButton:
         tooltip: Optional[str] = None,
         sound_path: Optional[str] = None,
         hover_sound_path: Optional[str] = None,
+        style: Optional[SliderStyle] = None,
     ) -> None:
         self.screen: pygame.Surface = screen
         self.font: pygame.font.Font = font
@@ -61,9 +69,8 @@ class SliderButton:
         self.current_value: int = max(min_value, min(max_value, current_value))
         self.step: int = step
         self.label: Optional[str] = label
-        self.bg_color: Tuple[int, int, int] = bg_color
-        self.hover_color: Tuple[int, int, int] = hover_color
-        self.text_color: Tuple[int, int, int] = text_color
+        # An explicit style wins over the individual colour arguments
+        self.style = style or SliderStyle.create(bg_color=bg_color, hover_color=hover_color, text_color=text_color)
         self.disabled: bool = disabled
         self.tooltip: Optional[str] = tooltip
         self.sound_path: Optional[str] = sound_path
@@ -76,35 +83,42 @@ class SliderButton:
         # Callback for value change events
         self.on_value_change: Optional[Callable[[int], None]] = None
 
-        # Sound effects (initialized below)
-        self.click_sound: Optional[pygame.mixer.Sound] = None
-        self.hover_sound: Optional[pygame.mixer.Sound] = None
-
-        # Try to load click sound
-        if self.sound_path:
-            try:
-                self.click_sound = pygame.mixer.Sound(self.sound_path)
-            except Exception as e:
-                logging.exception(f"Could not load click sound '{self.sound_path}': {e}")
-
-        # Try to load hover sound
-        if self.hover_sound_path:
-            try:
-                self.hover_sound = pygame.mixer.Sound(self.hover_sound_path)
-            except Exception as e:
-                logging.exception(f"Could not load hover sound '{self.hover_sound_path}': {e}")
+        # Shared sound handles, decoded in the background
+        self._click_sound_handle: Optional[AssetHandle] = (
+            resource_manager.acquire_sound(self.sound_path).prefetch() if self.sound_path else None
+        )
+        self._hover_sound_handle: Optional[AssetHandle] = (
+            resource_manager.acquire_sound(self.hover_sound_path).prefetch() if self.hover_sound_path else None
+        )
+        self._tooltip_font_handle: AssetHandle = resource_manager.acquire_font(None, 24)
 
         # Register with global slider list for event handling
         Button.all_sliders.append(self)
 
+    @property
+    def click_sound(self) -> Optional[pygame.mixer.Sound]:
+        return self._click_sound_handle.get() if self._click_sound_handle else None
+
+    @property
+    def hover_sound(self) -> Optional[pygame.mixer.Sound]:
+        return self._hover_sound_handle.get() if self._hover_sound_handle else None
+
+    def release_resources(self) -> None:
+        """Release this slider's shared assets. Call when the slider is discarded."""
+        for handle in (self._click_sound_handle, self._hover_sound_handle, self._tooltip_font_handle):
+            if handle:
+                handle.release()
+
     def draw(self) -> None:
         """
         Draw the slider track, handle, label, current value, and tooltip (if applicable).
         """
+        style = self.style
+
         # Determine track color based on hover state
-        track_color = self.bg_color
+        track_color = style.bg_color
         if self.is_hovered and not self.disabled:
-            track_color = self.hover_color
+            track_color = style.hover_color
 
         # Draw the slider track with rounded corners
         border_radius: int = self.rect.height // 2
@@ -127,19 +141,18 @@ class SliderButton:
 
         # Draw label if provided
         if self.label:
-            label_text = self.font.render(self.label, True, self.text_color)
+            label_text = self.font.render(self.label, True, style.text_color)
             label_rect = label_text.get_rect(bottomleft=(self.rect.x, self.rect.y - 5))
             self.screen.blit(label_text, label_rect)
 
         # Draw the current value text
-        value_text = self.font.render(str(self.current_value), True, self.text_color)
+        value_text = self.font.render(str(self.current_value), True, style.text_color)
         value_rect = value_text.get_rect(topleft=(self.rect.x, self.rect.y + self.rect.height + 5))
         self.screen.blit(value_text, value_rect)
 
         # Draw tooltip if hovered and tooltip text is provided
         if self.is_hovered and self.tooltip and not self.disabled:
-            tooltip_font = pygame.font.Font(None, 24)
-            tooltip_text = tooltip_font.render(self.tooltip, True, (255, 255, 255))
+            tooltip_text = self._tooltip_font_handle.get().render(self.tooltip, True, (255, 255, 255))
             tooltip_rect = tooltip_text.get_rect(midbottom=(self.rect.centerx, self.rect.top - 10))
             # Draw a background for the tooltip
             padding: int = 5
@@ -147,6 +160,21 @@ class SliderButton:
             pygame.draw.rect(self.screen, (50, 50, 50), bg_rect, border_radius=5)
             self.screen.blit(tooltip_text, tooltip_rect)
 
+    def get_draw_bounds(self) -> pygame.Rect:
+        """The screen area `draw()` paints in the current state, including label, value and tooltip."""
+        # The handle can overhang either end of the track by its radius
+        bounds = self.rect.inflate(self.rect.height, 0)
+        if self.label:
+            label_size = self.font.size(self.label)
+            bounds.union_ip(pygame.Rect(self.rect.x, self.rect.y - 5 - label_size[1], *label_size))
+        value_size = self.font.size(str(self.current_value))
+        bounds.union_ip(pygame.Rect(self.rect.x, self.rect.bottom + 5, *value_size))
+        if self.is_hovered and self.tooltip and not self.disabled:
+            tooltip_rect = pygame.Rect((0, 0), self._tooltip_font_handle.get().size(self.tooltip))
+            tooltip_rect.midbottom = (self.rect.centerx, self.rect.top - 10)
+            bounds.union_ip(tooltip_rect.inflate(10, 10))
+        return bounds
+
     def handle_event(self, event: pygame.event.Event) -> bool:
         """
         Process mouse events for slider interactions.
@@ -0,0 +1,76 @@
+"""Immutable, shared style objects for buttons and sliders."""
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+Color = Tuple[int, ...]
+
+
+class ButtonStyle(NamedTuple):
+    """
+    Everything about how a Button looks that is not per-button state.
+
+    Styles are interned by `ButtonStyle.create`, so every button in a menu
+    that looks the same points at one shared object.
+    """
+
+    bg_color: Color = (0, 0, 0)
+    hover_color: Color = (150, 150, 150)
+    text_color: Color = (255, 255, 255)
+    hover_text_color: Color = (255, 255, 255)
+    border_color: Color = (200, 200, 200)
+    border_width: int = 1
+    visible_background: bool = True
+    debug_hitbox: bool = False
+    debug_color: Color = (255, 0, 0)
+    text_align: str = "center"
+    shape: str = "rectangle"
+    shape_params: Tuple[Tuple[str, Any], ...] = ()
+    badge_color: Color = (255, 0, 0)
+    badge_position: str = "topright"
+    toggle_color: Color = (160, 160, 200)
+    animation_speed: int = 5
+
+    @classmethod
+    def create(
+        cls,
+        hover_text_color: Optional[Color] = None,
+        shape_params: Optional[Dict[str, Any]] = None,
+        **fields: Any,
+    ) -> "ButtonStyle":
+        """
+        Build (or reuse) a style from loose values: colours may be lists or
+        pygame.Color, shape_params a dict, and hover_text_color defaults to
+        text_color.
+        """
+        for name in ("bg_color", "hover_color", "text_color", "border_color", "debug_color", "badge_color", "toggle_color"):
+            if name in fields:
+                fields[name] = tuple(fields[name])
+        text_color = fields.get("text_color", cls._field_defaults["text_color"])
+        fields["hover_text_color"] = tuple(hover_text_color) if hover_text_color else text_color
+        fields["shape_params"] = tuple(sorted((shape_params or {}).items()))
+        return shared_style(cls(**fields))
+
+    def shape_param(self, name: str, default: Any = None) -> Any:
+        for key, value in self.shape_params:
+            if key == name:
+                return value
+        return default
+
+
+class SliderStyle(NamedTuple):
+    """Colours shared by every SliderButton that looks the same."""
+
+    bg_color: Color = (80, 80, 80)
+    hover_color: Color = (100, 100, 150)
+    text_color: Color = (220, 220, 220)
+
+    @classmethod
+    def create(cls, **fields: Any) -> "SliderStyle":
+        return shared_style(cls(**{name: tuple(value) for name, value in fields.items()}))
+
+
+_styles: Dict[Any, Any] = {}
+
+
+def shared_style(style: Any) -> Any:
+    """Return the one shared instance equal to `style`."""
+    return _styles.setdefault(style, style)
@@ -0,0 +1,126 @@
+"""Glyph atlases: draw fast-changing strings as blits from pre-rendered characters."""
+from typing import Dict, List, Tuple
+
+import pygame
+
+Color = Tuple[int, ...]
+
+# Characters rendered into every atlas up front; others are added on first use
+ATLAS_CHARSET = "".join(chr(code) for code in range(32, 127))
+ATLAS_MAX_WIDTH = 1024
+# Advances are measured over a run of the character, which keeps the
+# fractional part SDL_ttf accumulates between glyphs
+ADVANCE_SAMPLE = 16
+
+
+def premultiplied(surface: pygame.Surface) -> pygame.Surface:
+    """
+    A premultiplied-alpha copy of `surface`. Font surfaces come with padded
+    rows, which `premul_alpha()` misreads, so they are repacked first.
+    """
+    return surface.copy().premul_alpha()
+
+
+class GlyphAtlas:
+    """
+    Every character of one font and colour rendered once into a single
+    surface, with each glyph's rect and advance width cached.
+
+    `draw()` lays a string out from the cached advances and blits glyph
+    rects from the atlas in one batch, so counters, timers and debug
+    overlays that change every frame never create a surface. A constant
+    `label` in front of the changing part ("Score: ") is rendered once and
+    blitted whole. Glyphs are stored with premultiplied alpha, which pygame
+    blends fastest. Characters outside the charset are rendered once, on
+    first use. Kerning is not applied, so a string may come out a pixel or
+    two wider than `font.render` would draw it.
+    """
+
+    def __init__(self, font: pygame.font.Font, color: Color = (255, 255, 255), charset: str = ATLAS_CHARSET) -> None:
+        self.font = font
+        self.color = color
+        self.height = font.size(charset)[1]
+        # char -> (surface to blit from, area within it, advance width)
+        self.glyphs: Dict[str, Tuple[pygame.Surface, pygame.Rect, float]] = {}
+        # Furthest any glyph reaches past its advance, so bounds cover it
+        self.overhang = 0
+        # Constant strings drawn in one blit: text -> (surface, width)
+        self.labels: Dict[str, Tuple[pygame.Surface, int]] = {}
+
+        rendered = [(char, font.render(char, True, color)) for char in dict.fromkeys(charset)]
+        positions: List[Tuple[int, int]] = []
+        x = y = atlas_width = 0
+        for _, glyph in rendered:
+            if x and x + glyph.get_width() > ATLAS_MAX_WIDTH:
+                x, y = 0, y + self.height
+            positions.append((x, y))
+            x += glyph.get_width()
+            atlas_width = max(atlas_width, x)
+
+        atlas = pygame.Surface((max(1, atlas_width), y + self.height), pygame.SRCALPHA)
+        areas = [atlas.blit(glyph, pos) for (_, glyph), pos in zip(rendered, positions)]
+        self.surface = atlas.premul_alpha()
+        for (char, _), area in zip(rendered, areas):
+            self._store(char, self.surface, area)
+
+    def _store(self, char: str, source: pygame.Surface, area: pygame.Rect) -> Tuple[pygame.Surface, pygame.Rect, float]:
+        advance = self.font.size(char * ADVANCE_SAMPLE)[0] / ADVANCE_SAMPLE
+        self.overhang = max(self.overhang, int(area.width - advance) + 1)
+        glyph = self.glyphs[char] = (source, area, advance)
+        return glyph
+
+    def _add(self, char: str) -> Tuple[pygame.Surface, pygame.Rect, float]:
+        """Render a character missing from the charset into its own surface."""
+        rendered = premultiplied(self.font.render(char, True, self.color))
+        return self._store(char, rendered, rendered.get_rect())
+
+    def label(self, text: str) -> Tuple[pygame.Surface, int]:
+        """A constant string rendered once, and its width."""
+        label = self.labels.get(text)
+        if label is None:
+            rendered = premultiplied(self.font.render(text, True, self.color))
+            label = self.labels[text] = (rendered, self.font.size(text)[0])
+        return label
+
+    def size(self, text: str, label: str = "") -> Tuple[int, int]:
+        """Width and height of the area `draw()` covers for `text`."""
+        glyphs = self.glyphs
+        width = float(self.label(label)[1]) if label else 0.0
+        for char in text:
+            width += (glyphs.get(char) or self._add(char))[2]
+        return int(width + 0.5) + self.overhang, self.height
+
+    def draw(self, surface: pygame.Surface, text: str, pos: Tuple[int, int], label: str = "") -> pygame.Rect:
+        """
+        Blit `label` then `text` onto an opaque `surface`, such as the
+        display, with the top-left at `pos`.
+
+        Returns:
+            The area covered.
+        """
+        x, y = pos
+        blits = []
+        if label:
+            label_surface, label_width = self.label(label)
+            blits.append((label_surface, pos, None, pygame.BLEND_PREMULTIPLIED))
+            x += label_width
+        glyphs = self.glyphs
+        x += 0.5
+        for char in text:
+            source, area, advance = glyphs.get(char) or self._add(char)
+            blits.append((source, (int(x), y), area, pygame.BLEND_PREMULTIPLIED))
+            x += advance
+        surface.blits(blits, doreturn=False)
+        return pygame.Rect(pos[0], y, int(x) - pos[0] + self.overhang, self.height)
+
+
+_atlases: Dict[Tuple[pygame.font.Font, Color], GlyphAtlas] = {}
+
+
+def glyph_atlas(font: pygame.font.Font, color: Color = (255, 255, 255)) -> GlyphAtlas:
+    """The shared atlas for a font and colour, built on first use."""
+    key = (font, tuple(color))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(font, tuple(color))
+    return atlas
@@ -0,0 +1,228 @@
+"""Anchor-based layout tree that positions widgets without re-creating them."""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pygame
+
+# A length is either absolute pixels (int) or a fraction of the parent (float).
+Length = Union[int, float]
+Point = Union[str, Tuple[float, float]]
+
+# Named anchor points as (x, y) fractions of a rect.
+ANCHORS: Dict[str, Tuple[float, float]] = {
+    "topleft": (0.0, 0.0),
+    "top": (0.5, 0.0),
+    "topright": (1.0, 0.0),
+    "left": (0.0, 0.5),
+    "center": (0.5, 0.5),
+    "right": (1.0, 0.5),
+    "bottomleft": (0.0, 1.0),
+    "bottom": (0.5, 1.0),
+    "bottomright": (1.0, 1.0),
+}
+
+
+def _resolve_point(point: Point) -> Tuple[float, float]:
+    """Turn a named anchor or an (x, y) fraction pair into fractions."""
+    if isinstance(point, str):
+        if point not in ANCHORS:
+            raise ValueError(f"Unknown anchor '{point}'")
+        return ANCHORS[point]
+    return float(point[0]), float(point[1])
+
+
+def _resolve_length(length: Length, available: int) -> int:
+    """Turn a pixel or fractional length into pixels."""
+    if isinstance(length, float):
+        return int(available * length)
+    return int(length)
+
+
+def _move_widget(widget: Any, rect: pygame.Rect) -> None:
+    widget.rect.update(rect)
+    mark_dirty = getattr(widget, "mark_dirty", None)
+    if mark_dirty is not None:
+        mark_dirty()
+
+
+class LayoutNode:
+    """
+    A node in the layout tree.
+
+    The node's `anchor` is a point on the parent rect and its `pivot` is the
+    point on the node itself that gets placed there, so anchor="center",
+    pivot="top" puts the node's top edge on the parent's centre line. Sizes
+    may be given in pixels (int) or as a fraction of the parent (float).
+
+    A widget bound with `bind()` has its `rect` updated in place whenever the
+    node moves, so the widget (and any assets it loaded) is never rebuilt.
+    A widget with a `mark_dirty()` method, such as a scene node, is also
+    told it moved, so it repaints at its new position.
+    """
+
+    def __init__(
+        self,
+        width: Length = 0,
+        height: Length = 0,
+        anchor: Point = "center",
+        pivot: Optional[Point] = None,
+        offset: Tuple[int, int] = (0, 0),
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.anchor = _resolve_point(anchor)
+        self.pivot = _resolve_point(pivot) if pivot is not None else self.anchor
+        self.offset = offset
+
+        self.parent: Optional["LayoutNode"] = None
+        self.children: List["LayoutNode"] = []
+        self.widget: Optional[Any] = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+        # A dirty node always has dirty ancestors, so the update pass can
+        # skip any clean subtree whose rect did not move.
+        self._dirty = True
+
+    # ----- Tree management -----
+    def add(self, child: "LayoutNode") -> "LayoutNode":
+        """Attach a child node and return it for chaining."""
+        if child.parent is not None:
+            child.parent.remove(child)
+        child.parent = self
+        self.children.append(child)
+        self.invalidate()
+        return child
+
+    def remove(self, child: "LayoutNode") -> None:
+        """Detach a child node."""
+        if child in self.children:
+            self.children.remove(child)
+            child.parent = None
+            self.invalidate()
+
+    def bind(self, widget: Any) -> None:
+        """Bind a widget (anything with a pygame.Rect `rect`) to this node."""
+        self.widget = widget
+        if widget.rect != self.rect:
+            _move_widget(widget, self.rect)
+
+    @property
+    def root(self) -> "LayoutNode":
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    # ----- Mutators that schedule a relayout -----
+    def set_size(self, width: Length, height: Length) -> None:
+        if (width, height) != (self.width, self.height):
+            self.width = width
+            self.height = height
+            self.invalidate()
+
+    def set_offset(self, x: int, y: int) -> None:
+        if (x, y) != tuple(self.offset):
+            self.offset = (x, y)
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Mark this node and its ancestors as needing a relayout."""
+        node: Optional[LayoutNode] = self
+        while node is not None and not node._dirty:
+            node._dirty = True
+            node = node.parent
+
+    def resolve(self) -> pygame.Rect:
+        """Bring the tree up to date and return a copy of this node's rect."""
+        root = self.root
+        if isinstance(root, LayoutRoot):
+            root.update()
+        return self.rect.copy()
+
+    # ----- Layout pass -----
+    def measure(self, parent_rect: pygame.Rect) -> Tuple[int, int]:
+        """Return this node's size in pixels inside the given parent rect."""
+        return (
+            _resolve_length(self.width, parent_rect.width),
+            _resolve_length(self.height, parent_rect.height),
+        )
+
+    def place(self, parent_rect: pygame.Rect) -> pygame.Rect:
+        """Compute this node's rect from its anchor, pivot and offset."""
+        width, height = self.measure(parent_rect)
+        anchor_x, anchor_y = self.anchor
+        pivot_x, pivot_y = self.pivot
+        x = parent_rect.x + int(parent_rect.width * anchor_x) - int(width * pivot_x) + self.offset[0]
+        y = parent_rect.y + int(parent_rect.height * anchor_y) - int(height * pivot_y) + self.offset[1]
+        return pygame.Rect(x, y, width, height)
+
+    def _layout(self, rect: pygame.Rect, changed: List["LayoutNode"]) -> None:
+        """Apply a new rect and recurse into children if anything moved."""
+        if rect == self.rect and not self._dirty:
+            return
+        self.rect = rect
+        self._dirty = False
+        if self.widget is not None and self.widget.rect != rect:
+            _move_widget(self.widget, rect)
+            changed.append(self)
+        self._layout_children(changed)
+
+    def _layout_children(self, changed: List["LayoutNode"]) -> None:
+        for child in self.children:
+            child._layout(child.place(self.rect), changed)
+
+
+class VStack(LayoutNode):
+    """
+    Stacks its children top to bottom with fixed spacing.
+
+    Children keep their own size and offset, but their anchor is replaced by
+    the stack's horizontal `align`. When the stack has no explicit size it
+    shrinks to fit its children.
+    """
+
+    def __init__(self, spacing: int = 0, align: Union[str, float] = "center", **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.spacing = spacing
+        self.align = ANCHORS[align][0] if isinstance(align, str) else float(align)
+        self._child_sizes: List[Tuple[int, int]] = []
+
+    def measure(self, parent_rect: pygame.Rect) -> Tuple[int, int]:
+        self._child_sizes = [child.measure(parent_rect) for child in self.children]
+        width, height = super().measure(parent_rect)
+        if not width:
+            width = max((w for w, _ in self._child_sizes), default=0)
+        if not height:
+            height = sum(h for _, h in self._child_sizes) + self.spacing * max(0, len(self.children) - 1)
+        return width, height
+
+    def _layout_children(self, changed: List[LayoutNode]) -> None:
+        y = self.rect.top
+        for child, (width, height) in zip(self.children, self._child_sizes):
+            x = self.rect.x + int(self.rect.width * self.align) - int(width * self.align)
+            rect = pygame.Rect(x + child.offset[0], y + child.offset[1], width, height)
+            child._layout(rect, changed)
+            y += height + self.spacing
+
+
+class LayoutRoot(LayoutNode):
+    """Top of a layout tree; covers the whole screen."""
+
+    def __init__(self, size: Tuple[int, int]) -> None:
+        super().__init__(size[0], size[1], anchor="topleft")
+
+    def resize(self, width: int, height: int) -> int:
+        """Resize the root and relayout. Returns the number of widgets moved."""
+        self.width = width
+        self.height = height
+        return self.update()
+
+    def update(self) -> int:
+        """
+        Run one layout pass over the dirty parts of the tree.
+
+        Returns:
+            The number of bound widgets whose rect changed.
+        """
+        changed: List[LayoutNode] = []
+        self._layout(pygame.Rect(0, 0, int(self.width), int(self.height)), changed)
+        return len(changed)
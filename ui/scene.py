@@ -0,0 +1,441 @@
+"""Retained-mode scene graph: screens describe their content once, the
+scene repaints only the parts of the display that changed."""
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional, Tuple
+
+import pygame
+
+from ui.glyph_atlas import GlyphAtlas
+from ui.layout import LayoutNode
+
+Color = Tuple[int, ...]
+# Paints the layer under every node into a rect: (surface, rect) -> None
+BackgroundPainter = Callable[[pygame.Surface, pygame.Rect], None]
+
+# Past this share of the screen, one full repaint beats many small ones
+FULL_REPAINT_RATIO = 0.5
+
+
+class SceneNode:
+    """
+    A node in the scene tree. Children are painted after (over) their parent
+    in ascending `z`; nodes with equal z keep the order they were added in.
+
+    A node that changes calls `mark_dirty()`, which flags its ancestors, so
+    the scene only walks subtrees with something to repaint. Widget nodes
+    whose state changes behind their back (hover, tweens) are `live`: they
+    are asked each frame whether they changed.
+    """
+
+    live = False
+
+    def __init__(self, z: int = 0, visible: bool = True) -> None:
+        self.z = z
+        self.visible = visible
+        self.parent: Optional["SceneNode"] = None
+        self.children: List["SceneNode"] = []
+        # Screen area this node covered the last time it was painted
+        self.painted: Optional[pygame.Rect] = None
+
+        self._dirty = True
+        self._dirty_below = True
+        self._live_below = self.live
+
+    # ----- Tree management -----
+    def add(self, child: "SceneNode") -> "SceneNode":
+        """Attach a child node and return it for chaining."""
+        if child.parent is not None:
+            child.parent.remove(child)
+        child.parent = self
+        self.children.append(child)
+        self.children.sort(key=lambda node: node.z)
+        if child._live_below:
+            node: Optional[SceneNode] = self
+            while node is not None and not node._live_below:
+                node._live_below = True
+                node = node.parent
+        self._flag_dirty_below()
+        return child
+
+    def remove(self, child: "SceneNode") -> None:
+        """Detach a child node; the area it covered is repainted."""
+        if child not in self.children:
+            return
+        self.children.remove(child)
+        child.parent = None
+        scene = self.scene
+        for node in child.walk():
+            if scene is not None and node.painted is not None:
+                scene.damage(node.painted)
+            node.painted = None
+            node._dirty = node._dirty_below = True
+
+    def clear(self) -> None:
+        for child in list(self.children):
+            self.remove(child)
+
+    def walk(self):
+        """This node and all its descendants, in paint order."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def scene(self) -> Optional["Scene"]:
+        node: Optional[SceneNode] = self
+        while node.parent is not None:
+            node = node.parent
+        return node if isinstance(node, Scene) else None
+
+    # ----- Change tracking -----
+    def mark_dirty(self) -> None:
+        """Repaint this node (at its old and new bounds) on the next render."""
+        self._dirty = True
+        if self.parent is not None:
+            self.parent._flag_dirty_below()
+
+    def _flag_dirty_below(self) -> None:
+        node: Optional[SceneNode] = self
+        while node is not None and not node._dirty_below:
+            node._dirty_below = True
+            node = node.parent
+
+    def set_visible(self, visible: bool) -> None:
+        if visible != self.visible:
+            self.visible = visible
+            for node in self.walk():
+                node.mark_dirty()
+
+    def set_z(self, z: int) -> None:
+        if z != self.z:
+            self.z = z
+            if self.parent is not None:
+                self.parent.children.sort(key=lambda node: node.z)
+            for node in self.walk():
+                node.mark_dirty()
+
+    # ----- Overridden by concrete nodes -----
+    def bounds(self) -> Optional[pygame.Rect]:
+        """Screen area this node paints, or None if it paints nothing itself."""
+        return None
+
+    def refresh(self) -> bool:
+        """Live nodes: sync with the widget and return True if it changed."""
+        return False
+
+    def paint(self, surface: pygame.Surface) -> None:
+        """Paint this node's cached output. The surface is clipped to the damage."""
+
+
+class Scene(SceneNode):
+    """
+    Root of a scene tree bound to a target surface.
+
+    `render()` walks the dirty and live subtrees, collects the old and new
+    bounds of everything that changed, then repaints just those rects: the
+    background layer first, then every visible node overlapping them. The
+    rest of the surface keeps last frame's pixels.
+    """
+
+    def __init__(self, surface: pygame.Surface, background: Optional[BackgroundPainter] = None) -> None:
+        super().__init__()
+        self.surface = surface
+        self.background = background
+        self._damage: List[pygame.Rect] = []
+        self._full_repaint = True
+
+    def set_surface(self, surface: pygame.Surface) -> None:
+        self.surface = surface
+        self.invalidate()
+
+    def damage(self, rect: pygame.Rect) -> None:
+        """Repaint an area on the next render, e.g. after drawing over it directly."""
+        self._damage.append(pygame.Rect(rect))
+
+    def invalidate(self) -> None:
+        """Repaint the whole surface on the next render."""
+        self._full_repaint = True
+
+    def render(self) -> List[pygame.Rect]:
+        """
+        Bring the target surface up to date.
+
+        Returns:
+            The rects that were repainted, for `pygame.display.update`.
+        """
+        damage: List[pygame.Rect] = []
+        self._collect(self, damage, True)
+        # Includes what live nodes damaged while being refreshed
+        damage, self._damage = damage + self._damage, []
+
+        screen_rect = self.surface.get_rect()
+        if self._full_repaint:
+            self._full_repaint = False
+            rects = [screen_rect]
+        else:
+            rects = merge_rects(damage, screen_rect)
+            if sum(r.width * r.height for r in rects) > FULL_REPAINT_RATIO * screen_rect.width * screen_rect.height:
+                rects = [screen_rect]
+
+        for rect in rects:
+            self.surface.set_clip(rect)
+            if self.background:
+                self.background(self.surface, rect)
+            self._paint(self, rect)
+        self.surface.set_clip(None)
+        return rects
+
+    def _collect(self, node: SceneNode, damage: List[pygame.Rect], visible: bool) -> None:
+        visible = visible and node.visible
+        if node.live and node.refresh():
+            node._dirty = True
+        if node._dirty:
+            node._dirty = False
+            if node.painted is not None:
+                damage.append(node.painted)
+            node.painted = node.bounds() if visible else None
+            if node.painted is not None:
+                damage.append(node.painted)
+        if node._dirty_below or node._live_below:
+            node._dirty_below = False
+            for child in node.children:
+                if child._dirty or child._dirty_below or child._live_below:
+                    self._collect(child, damage, visible)
+
+    def _paint(self, node: SceneNode, clip: pygame.Rect) -> None:
+        if not node.visible:
+            return
+        if node.painted is not None and node.painted.colliderect(clip):
+            node.paint(self.surface)
+        for child in node.children:
+            self._paint(child, clip)
+
+
+def merge_rects(rects: List[pygame.Rect], limit: pygame.Rect) -> List[pygame.Rect]:
+    """Clip rects to `limit` and union any that overlap, so no pixel is painted twice."""
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        rect = rect.clip(limit)
+        if not rect.width or not rect.height:
+            continue
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class ImageNode(SceneNode):
+    """A surface blitted at `rect`. Bind a LayoutNode to position it by anchor."""
+
+    def __init__(
+        self,
+        image: pygame.Surface,
+        pos: Tuple[int, int] = (0, 0),
+        layout_node: Optional[LayoutNode] = None,
+        z: int = 0,
+    ) -> None:
+        super().__init__(z)
+        self.image = image
+        self.rect = image.get_rect(topleft=pos)
+        self.layout_node = layout_node
+        self._place()
+
+    def _place(self) -> None:
+        if self.layout_node is not None:
+            self.layout_node.set_size(*self.image.get_size())
+            self.rect.update(self.layout_node.resolve())
+            self.layout_node.bind(self)
+
+    def set_image(self, image: pygame.Surface) -> None:
+        self.image = image
+        self.rect.size = image.get_size()
+        self._place()
+        self.mark_dirty()
+
+    def damage_image(self, area: pygame.Rect) -> None:
+        """Repaint part of the image after drawing into it in place."""
+        scene = self.scene
+        if scene is not None and self.painted is not None and not self._dirty:
+            scene.damage(area.move(self.rect.topleft).clip(self.rect))
+
+    def set_position(self, pos: Tuple[int, int]) -> None:
+        if tuple(pos) != self.rect.topleft:
+            self.rect.topleft = pos
+            self.mark_dirty()
+
+    def bounds(self) -> pygame.Rect:
+        return self.rect.copy()
+
+    def paint(self, surface: pygame.Surface) -> None:
+        surface.blit(self.image, self.rect)
+
+
+class TextNode(ImageNode):
+    """A line of text rendered once and re-rendered only when it changes."""
+
+    def __init__(
+        self,
+        text: str,
+        font: pygame.font.Font,
+        color: Color = (255, 255, 255),
+        pos: Tuple[int, int] = (0, 0),
+        layout_node: Optional[LayoutNode] = None,
+        z: int = 0,
+    ) -> None:
+        self.text = text
+        self.font = font
+        self.color = color
+        super().__init__(font.render(text, True, color), pos, layout_node, z)
+
+    def set_text(self, text: str) -> None:
+        if text != self.text:
+            self.text = text
+            self.set_image(self.font.render(text, True, self.color))
+
+    def set_color(self, color: Color) -> None:
+        if tuple(color) != tuple(self.color):
+            self.color = color
+            self.set_image(self.font.render(self.text, True, color))
+
+
+class AtlasTextNode(SceneNode):
+    """
+    Text drawn straight from a glyph atlas, after an optional constant
+    label. Changing the text allocates no surface, which suits counters and
+    overlays that change every frame.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        atlas: GlyphAtlas,
+        pos: Tuple[int, int] = (0, 0),
+        label: str = "",
+        z: int = 0,
+    ) -> None:
+        super().__init__(z)
+        self.text = text
+        self.atlas = atlas
+        self.pos = tuple(pos)
+        self.label = label
+
+    def set_text(self, text: str) -> None:
+        if text != self.text:
+            self.text = text
+            self.mark_dirty()
+
+    def set_position(self, pos: Tuple[int, int]) -> None:
+        if tuple(pos) != self.pos:
+            self.pos = tuple(pos)
+            self.mark_dirty()
+
+    def bounds(self) -> pygame.Rect:
+        return pygame.Rect(self.pos, self.atlas.size(self.text, self.label))
+
+    def paint(self, surface: pygame.Surface) -> None:
+        self.atlas.draw(surface, self.text, self.pos, self.label)
+
+
+class WidgetNode(SceneNode, ABC):
+    """
+    Wraps an existing widget that draws itself onto its own screen surface.
+    The widget is redrawn only when its `signature()` changes.
+    """
+
+    live = True
+
+    def __init__(self, widget: Any, z: int = 0) -> None:
+        super().__init__(z)
+        self.widget = widget
+        self._signature: Any = None
+
+    @abstractmethod
+    def signature(self) -> Any:
+        """Everything the widget's appearance depends on"""
+        pass
+
+    def refresh(self) -> bool:
+        signature = self.signature()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
+
+    def bounds(self) -> pygame.Rect:
+        return self.widget.get_draw_bounds()
+
+    def paint(self, surface: pygame.Surface) -> None:
+        self.widget.draw()
+
+
+def button_signature(b: Any) -> Any:
+    """Everything a Button's appearance depends on."""
+    return (
+        tuple(b.rect), b.style, b.hovered, b.hover_alpha, b.tooltip_alpha, b.click_effect,
+        b.toggled, b.disabled, b.original_text, b.hover_text, b.tooltip, b.badge_text, b.icon,
+    )
+
+
+class ButtonNode(WidgetNode):
+    def signature(self) -> Any:
+        return button_signature(self.widget)
+
+
+class ScrollListNode(WidgetNode):
+    """A ScrollList; only the rows in view are checked for changes each frame."""
+
+    def signature(self) -> Any:
+        s = self.widget
+        return (
+            tuple(s.rect), s.scroll, s.count,
+            tuple((index, button_signature(row)) for index, row in s.rows.items()),
+        )
+
+
+class AnimationNode(WidgetNode):
+    """An AnimatedSprite; repainted when it moves on to another frame."""
+
+    def signature(self) -> Any:
+        s = self.widget
+        return (tuple(s.rect), s.index, s.image is not None)
+
+
+class ParticleNode(SceneNode):
+    """
+    A ParticleSystem. Rather than its overall bounds, which for particles
+    spread over the screen would mean repainting everything, it damages
+    only the `tile`-sized squares its particles cover this frame or did
+    last frame.
+    """
+
+    live = True
+
+    def __init__(self, particles: Any, tile: int = 32, z: int = 0) -> None:
+        super().__init__(z)
+        self.particles = particles
+        self.tile = tile
+        self._tiles: set = set()
+
+    def refresh(self) -> bool:
+        tiles = self.particles.covered_tiles(self.tile)
+        scene = self.scene
+        if scene is not None and self.visible:
+            for x, y in tiles | self._tiles:
+                scene.damage(pygame.Rect(x * self.tile, y * self.tile, self.tile, self.tile))
+        self._tiles = tiles
+        self.painted = self.particles.bounds() if self.visible else None
+        return False
+
+    def paint(self, surface: pygame.Surface) -> None:
+        self.particles.draw(surface)
+
+
+class SliderNode(WidgetNode):
+    def signature(self) -> Any:
+        s = self.widget
+        return (
+            tuple(s.rect), s.style, s.current_value, s.min_value, s.max_value,
+            s.is_hovered, s.disabled, s.label, s.tooltip,
+        )
@@ -0,0 +1,80 @@
+"""Screen transitions: animate between snapshots of two screens with whole-surface blits."""
+import time
+from typing import Optional, Tuple
+
+import pygame
+
+from ui.tween import ease_in_out_quad
+from config import SCREEN_TRANSITION_MS
+
+TRANSITION_KINDS = ("fade", "dissolve", "slide_left", "slide_right")
+
+
+class ScreenTransition:
+    """
+    One change of screen, played from a snapshot of the outgoing screen to
+    a snapshot of the incoming one.
+
+    Both snapshots are taken once, as display-format copies, so a frame of
+    the transition is at most a fill and two blits using surface alpha or
+    an offset, whatever is on either screen:
+
+      dissolve     the incoming screen fades in over the outgoing one
+      fade         the outgoing screen fades to `color`, then the incoming one fades in
+      slide_left   the incoming screen pushes the outgoing one off to the left
+      slide_right  the same, to the right
+
+    Progress follows real time from `start()`, not frame count.
+    """
+
+    def __init__(
+        self,
+        outgoing: pygame.Surface,
+        kind: str = "dissolve",
+        duration_ms: int = SCREEN_TRANSITION_MS,
+        color: Tuple[int, int, int] = (0, 0, 0),
+    ) -> None:
+        if kind not in TRANSITION_KINDS:
+            raise ValueError(f"unknown transition '{kind}'")
+        self.outgoing = outgoing
+        self.incoming: Optional[pygame.Surface] = None
+        self.kind = kind
+        self.duration_ms = duration_ms
+        self.color = color
+        self.progress = 0.0
+        self._started = 0.0
+
+    def start(self, incoming: pygame.Surface) -> None:
+        """Begin playing towards `incoming`, a snapshot of the new screen."""
+        self.incoming = incoming
+        self._started = time.perf_counter()
+
+    @property
+    def finished(self) -> bool:
+        return self.progress >= 1.0
+
+    def update(self) -> None:
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        self.progress = min(1.0, elapsed_ms / self.duration_ms) if self.duration_ms > 0 else 1.0
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """Paint the current frame over the whole of `surface`."""
+        t = ease_in_out_quad(self.progress)
+        outgoing, incoming = self.outgoing, self.incoming
+        if self.kind == "dissolve":
+            outgoing.set_alpha(None)
+            incoming.set_alpha(int(255 * t))
+            surface.blit(outgoing, (0, 0))
+            surface.blit(incoming, (0, 0))
+        elif self.kind == "fade":
+            shown, alpha = (outgoing, 1 - 2 * t) if t < 0.5 else (incoming, 2 * t - 1)
+            shown.set_alpha(int(255 * alpha))
+            surface.fill(self.color)
+            surface.blit(shown, (0, 0))
+        else:
+            direction = -1 if self.kind == "slide_left" else 1
+            offset = int(surface.get_width() * t) * direction
+            outgoing.set_alpha(None)
+            incoming.set_alpha(None)
+            surface.blit(outgoing, (offset, 0))
+            surface.blit(incoming, (offset - surface.get_width() * direction, 0))
@@ -0,0 +1,107 @@
+"""Frame-rate independent tweens for UI widget attributes."""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def linear(t: float) -> float:
+    return t
+
+
+def ease_out_quad(t: float) -> float:
+    return 1 - (1 - t) * (1 - t)
+
+
+def ease_in_out_quad(t: float) -> float:
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+
+class Tween:
+    """Moves one numeric attribute of an object to a target over a duration."""
+
+    def __init__(
+        self,
+        target: Any,
+        attr: str,
+        end: float,
+        duration_ms: float,
+        easing: Callable[[float], float] = ease_out_quad,
+        on_complete: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.target = target
+        self.attr = attr
+        self.start = getattr(target, attr)
+        self.end = end
+        self.duration_ms = duration_ms
+        self.easing = easing
+        self.on_complete = on_complete
+        self.elapsed_ms = 0.0
+
+    def step(self, dt_ms: float) -> bool:
+        """Advance by `dt_ms`. Returns True once the tween has finished."""
+        self.elapsed_ms += dt_ms
+        t = min(1.0, self.elapsed_ms / self.duration_ms)
+        value = self.start + (self.end - self.start) * self.easing(t)
+        setattr(self.target, self.attr, round(value) if isinstance(self.end, int) else value)
+        return t >= 1.0
+
+
+class TweenScheduler:
+    """
+    Updates every active tween in one pass per frame using real elapsed time.
+
+    Only running tweens are visited, so idle widgets cost nothing. Starting a
+    tween on an attribute that is already animating replaces the old one and
+    continues from the current value.
+    """
+
+    def __init__(self) -> None:
+        self.tweens: Dict[Tuple[int, str], Tween] = {}
+
+    def animate(
+        self,
+        target: Any,
+        attr: str,
+        end: float,
+        duration_ms: float,
+        easing: Callable[[float], float] = ease_out_quad,
+        on_complete: Optional[Callable[[], Any]] = None,
+    ) -> Optional[Tween]:
+        """Tween `target.attr` to `end`. Zero durations apply immediately."""
+        key = (id(target), attr)
+        if duration_ms <= 0 or getattr(target, attr) == end:
+            self.tweens.pop(key, None)
+            setattr(target, attr, end)
+            if on_complete:
+                on_complete()
+            return None
+        tween = Tween(target, attr, end, duration_ms, easing, on_complete)
+        self.tweens[key] = tween
+        return tween
+
+    def cancel(self, target: Any, attr: Optional[str] = None) -> None:
+        """Stop tweens on `target` (one attribute, or all), leaving values as they are."""
+        for key in [k for k in self.tweens if k[0] == id(target) and (attr is None or k[1] == attr)]:
+            del self.tweens[key]
+
+    def update(self, dt_ms: float) -> bool:
+        """
+        Advance all tweens by `dt_ms`.
+
+        Returns:
+            True if anything is still animating afterwards.
+        """
+        if not self.tweens:
+            return False
+        finished = [key for key, tween in self.tweens.items() if tween.step(dt_ms)]
+        for key in finished:
+            tween = self.tweens.pop(key)
+            if tween.on_complete:
+                tween.on_complete()
+        return bool(self.tweens)
+
+    @property
+    def is_animating(self) -> bool:
+        return bool(self.tweens)
+
+
+# Create a global instance for easy access
+tween_scheduler = TweenScheduler()
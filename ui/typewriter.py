@@ -0,0 +1,207 @@
+"""Cached paragraph layout and an incremental typewriter text reveal."""
+import re
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+import pygame
+
+from config import TYPEWRITER_CHARS_PER_SECOND
+
+Color = Tuple[int, ...]
+
+# Paragraph layouts kept for reuse, most recently used last
+LAYOUT_CACHE_SIZE = 128
+_WORD_RE = re.compile(r"\S+")
+
+
+class TextLayout(NamedTuple):
+    """
+    Where each line of a wrapped paragraph goes, relative to its top-left,
+    and where each word starts within its line as (start, end, x offset).
+    """
+
+    lines: Tuple[str, ...]
+    positions: Tuple[Tuple[int, int], ...]
+    words: Tuple[Tuple[Tuple[int, int, int], ...], ...]
+    size: Tuple[int, int]
+
+    @property
+    def glyph_count(self) -> int:
+        return sum(len(line) for line in self.lines)
+
+
+def wrap_text(text: str, font: pygame.font.Font, width: Optional[int]) -> List[str]:
+    """Break text into lines no wider than `width`, keeping explicit newlines."""
+    if width is None:
+        return text.split("\n")
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if not line or font.size(candidate)[0] <= width:
+                line = candidate
+            else:
+                lines.append(line)
+                line = word
+        lines.append(line)
+    return lines
+
+
+_layouts: "OrderedDict[tuple, TextLayout]" = OrderedDict()
+
+
+def layout_text(
+    text: str,
+    font: pygame.font.Font,
+    width: Optional[int] = None,
+    align: str = "left",
+    line_spacing: int = 2,
+) -> TextLayout:
+    """
+    Wrap `text` to `width` (or only at newlines if None) and place each line
+    like `Button._draw_text` does: stacked with `line_spacing` between them
+    and aligned left, right or centred within the block. Layouts are cached
+    per (text, font, width, align, line_spacing).
+    """
+    key = (text, font, width, align, line_spacing)
+    layout = _layouts.get(key)
+    if layout is not None:
+        _layouts.move_to_end(key)
+        return layout
+
+    lines = wrap_text(text, font, width)
+    sizes = [font.size(line) for line in lines]
+    block_width = width if width is not None else max((w for w, _ in sizes), default=0)
+    words = tuple(
+        tuple((m.start(), m.end(), font.size(line[:m.start()])[0]) for m in _WORD_RE.finditer(line))
+        for line in lines
+    )
+    positions = []
+    y = 0
+    for line_width, line_height in sizes:
+        if align == "right":
+            x = block_width - line_width
+        elif align == "center":
+            x = (block_width - line_width) // 2
+        else:
+            x = 0
+        positions.append((x, y))
+        y += line_height + line_spacing
+    height = max(0, y - line_spacing)
+    layout = TextLayout(tuple(lines), tuple(positions), words, (block_width, height))
+
+    _layouts[key] = layout
+    if len(_layouts) > LAYOUT_CACHE_SIZE:
+        _layouts.popitem(last=False)
+    return layout
+
+
+class TypewriterText:
+    """
+    A paragraph revealed a few characters at a time onto one surface.
+
+    The layout comes from `layout_text`, so it is computed once per text.
+    Each `reveal_to()` renders only the words that gained characters since
+    the last call and blits them onto the surface kept from earlier frames;
+    the growing string is never rendered again. Words are always drawn
+    whole-so-far at their cached offsets, so kerning inside a word is kept
+    and revealed text never shifts. `glyphs_rasterised` is how many
+    characters the last call rendered, `total_rasterised` the count for the
+    whole paragraph.
+    """
+
+    def __init__(
+        self,
+        font: pygame.font.Font,
+        color: Color = (255, 255, 255),
+        width: Optional[int] = None,
+        align: str = "left",
+        line_spacing: int = 2,
+        chars_per_second: float = TYPEWRITER_CHARS_PER_SECOND,
+    ) -> None:
+        self.font = font
+        self.color = color
+        self.width = width
+        self.align = align
+        self.line_spacing = line_spacing
+        self.chars_per_second = chars_per_second
+
+        self.text = ""
+        self.layout = layout_text("", font, width, align, line_spacing)
+        self.surface = pygame.Surface((1, 1), pygame.SRCALPHA)
+        self.revealed = 0
+        self.glyphs_rasterised = 0
+        self.total_rasterised = 0
+        self._started = time.perf_counter()
+
+    def set_text(self, text: str, width: Optional[int] = None) -> None:
+        """
+        Start revealing `text` from the beginning. Setting the same text again
+        at a new width keeps the reveal's progress and redraws it rewrapped.
+        """
+        width = self.width if width is None else width
+        if text == self.text and width == self.width:
+            return
+        revealed = self.revealed if text == self.text else 0
+        if text != self.text:
+            self._started = time.perf_counter()
+        self.text = text
+        self.width = width
+        self.layout = layout_text(text, self.font, width, self.align, self.line_spacing)
+        self.surface = pygame.Surface((max(1, self.layout.size[0]), max(1, self.layout.size[1])), pygame.SRCALPHA)
+        self.revealed = 0
+        self.total_rasterised = 0
+        self.reveal_to(revealed)
+
+    @property
+    def done(self) -> bool:
+        return self.revealed >= self.layout.glyph_count
+
+    def update(self) -> List[pygame.Rect]:
+        """Reveal whatever is due by now; returns the surface areas drawn into."""
+        due = int((time.perf_counter() - self._started) * self.chars_per_second)
+        return self.reveal_to(due)
+
+    def finish(self) -> List[pygame.Rect]:
+        """Reveal the rest of the text at once."""
+        return self.reveal_to(self.layout.glyph_count)
+
+    def reveal_to(self, count: int) -> List[pygame.Rect]:
+        """
+        Show the first `count` characters, rendering only the new ones.
+
+        Returns:
+            The areas of `surface` that changed.
+        """
+        count = min(count, self.layout.glyph_count)
+        self.glyphs_rasterised = 0
+        if count <= self.revealed:
+            return []
+
+        dirty = []
+        line_start = 0
+        for line, (x, y), words in zip(self.layout.lines, self.layout.positions, self.layout.words):
+            line_end = line_start + len(line)
+            first = self.revealed - line_start
+            last = count - line_start
+            for word_start, word_end, offset in words:
+                if word_end <= first or word_start >= last:
+                    continue
+                word = line[word_start:min(word_end, last)]
+                rendered = self.font.render(word, True, self.color)
+                area = rendered.get_rect(topleft=(x + offset, y))
+                if word_start < first:
+                    # Partly drawn last time; the longer render covers it
+                    self.surface.fill((0, 0, 0, 0), area)
+                self.surface.blit(rendered, area.topleft)
+                dirty.append(area)
+                self.glyphs_rasterised += len(word)
+            if line_end >= count:
+                break
+            line_start = line_end
+
+        self.revealed = count
+        self.total_rasterised += self.glyphs_rasterised
+        return dirty